@@ -0,0 +1,65 @@
+"""Utilitários compartilhados pelos benchmarks (rodar a partir da raiz do projeto)"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_path=None, keepdb=False):
+    """
+    Configura o Django com um banco de teste em arquivo.
+
+    O banco em arquivo mantém os dados fora da memória do processo, para que
+    as medições de RSS reflitam apenas o código da aplicação. Com ``keepdb``
+    um banco já populado por outro processo é reaproveitado.
+    """
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'escola_project.settings')
+
+    import django
+
+    django.setup()
+    from django.db import connections
+
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='escola-bench-'), 'bench.sqlite3')
+    connections['default'].settings_dict['TEST']['NAME'] = db_path
+
+    from django.test.utils import setup_databases, setup_test_environment
+
+    setup_test_environment()
+    setup_databases(verbosity=0, interactive=False, keepdb=keepdb)
+    return db_path
+
+
+def _status_kb(field):
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def rss_kb():
+    return _status_kb('VmRSS:')
+
+
+def peak_rss_kb():
+    return _status_kb('VmHWM:')
+
+
+def reset_peak_rss():
+    """Zera o pico de RSS do processo (Linux >= 4.0); retorna False se não suportado"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
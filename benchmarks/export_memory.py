@@ -0,0 +1,71 @@
+"""
+Mede o pico de RSS da exportação de alunos conforme o número de linhas cresce.
+
+    python benchmarks/export_memory.py --sizes 10000 100000 500000 --format csv
+
+Imprime uma linha JSON por tamanho; ``rss_growth_kb`` deve ficar estável.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import peak_rss_kb, reset_peak_rss, rss_kb, setup_django  # noqa: E402
+
+
+def grow(target):
+    from people.models import Aluno, Curso
+    from people.seed import gerar_alunos, gerar_cursos
+
+    cursos = list(Curso.objects.values_list('pk', flat=True)) or gerar_cursos(20)
+    faltam = target - Aluno.objects.count()
+    if faltam > 0:
+        gerar_alunos(faltam, cursos)
+
+
+def measure(client, fmt):
+    gc.collect()
+    supported = reset_peak_rss()
+    base = rss_kb()
+    started = time.perf_counter()
+    response = client.get('/alunos/exportar/', {'format': fmt})
+    size = lines = 0
+    for chunk in response.streaming_content:
+        size += len(chunk)
+        lines += chunk.count(b'\n')
+    elapsed = time.perf_counter() - started
+    peak = peak_rss_kb()
+    return {
+        'bytes': size,
+        'lines': lines,
+        'seconds': round(elapsed, 3),
+        'rss_base_kb': base,
+        'rss_peak_kb': peak,
+        'rss_growth_kb': peak - base if supported else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10_000, 100_000, 500_000])
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    parser.add_argument('--db', help='Arquivo SQLite a usar (padrão: temporário).')
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from django.test import Client
+
+    client = Client()
+    for size in sorted(args.sizes):
+        grow(size)
+        result = {'rows': size, 'format': args.format}
+        result.update(measure(client, args.format))
+        print(json.dumps(result), flush=True)
+
+
+if __name__ == '__main__':
+    main()
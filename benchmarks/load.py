@@ -0,0 +1,240 @@
+"""
+Teste de carga local: WSGI síncrono contra ASGI com as views assíncronas.
+
+    python benchmarks/load.py --alunos 100000 --concurrency 200 --requests 4000
+    python benchmarks/load.py --db-latency 5 --threads 8 --output load.json
+
+Cada modo roda em um subprocesso (``ESCOLA_ASYNC_VIEWS`` só é lido ao
+carregar as settings) sobre o mesmo banco de teste em arquivo. Os requests
+vão direto para o ``WSGIHandler``/``ASGIHandler`` do Django, sem servidor
+HTTP: ``--concurrency`` clientes fazem requests em sequência, em rodízio
+entre as páginas de leitura. No WSGI eles disputam um pool de ``--threads``
+threads, como um servidor com threads; no ASGI cada request é uma
+corrotina no event loop.
+
+``--db-latency`` acrescenta uma espera a cada consulta, simulando um banco
+acessado pela rede; com o SQLite local as consultas quase não esperam I/O.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import BASE_DIR, setup_django  # noqa: E402
+
+MODES = ('wsgi', 'asgi')
+
+
+def routes():
+    """Páginas que têm versão assíncrona, com argumentos reais"""
+    from django.urls import reverse
+
+    from people.models import Aluno, Curso
+
+    curso = Curso.objects.filter(ativo=True).order_by('-total_alunos_ativos').first()
+    aluno = Aluno.objects.filter(ativo=True).order_by('id').first()
+    return [
+        reverse('home'),
+        reverse('curso_list'),
+        reverse('curso_detail', args=[curso.pk]),
+        reverse('aluno_list'),
+        f'{reverse("aluno_list")}?curso={curso.pk}&status=ativo',
+        reverse('aluno_detail', args=[aluno.pk]),
+    ]
+
+
+def add_db_latency(ms):
+    """Espera ``ms`` milissegundos em cada consulta, em todas as conexões abertas"""
+    from django.db.backends.signals import connection_created
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(ms / 1000)
+        return execute(sql, params, many, context)
+
+    def on_connect(sender, connection, **kwargs):
+        connection.execute_wrappers.append(delay)
+
+    connection_created.connect(on_connect, weak=False)
+
+
+def wsgi_caller(threads):
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    pool = ThreadPoolExecutor(max_workers=threads)
+
+    def call(url):
+        path, _, query = url.partition('?')
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+            'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'HTTP_HOST': 'testserver',
+            'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+        }
+        status = []
+        body = application(environ, lambda line, headers, exc_info=None: status.append(line))
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        return int(status[0].split()[0])
+
+    async def caller(url):
+        return await asyncio.get_running_loop().run_in_executor(pool, call, url)
+    return caller
+
+
+def asgi_caller():
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+
+    async def caller(url):
+        path, _, query = url.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'root_path': '', 'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+        }
+        pending = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+        status = []
+
+        async def receive():
+            if pending:
+                return pending.pop()
+            # Cliente nunca desconecta; o Django cancela esta espera ao responder
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        await application(scope, receive, send)
+        return status[0]
+    return caller
+
+
+async def load(caller, urls, total, concurrency):
+    queue = iter(range(total))
+    latencies, errors = [], 0
+
+    async def client(offset):
+        nonlocal errors
+        for n in queue:
+            url = urls[(n + offset) % len(urls)]
+            started = time.perf_counter()
+            if await caller(url) != 200:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 2),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+    }
+
+
+def run_mode(args):
+    """Executado no subprocesso de cada modo; imprime o resultado em JSON"""
+    setup_django(args.db, keepdb=True)
+    from django.conf import settings
+
+    if args.db_latency:
+        add_db_latency(args.db_latency)
+    urls = routes()
+    caller = wsgi_caller(args.threads) if args.mode == 'wsgi' else asgi_caller()
+
+    async def main():
+        await load(caller, urls, len(urls) * 2, min(args.concurrency, len(urls)))  # aquecimento
+        return await load(caller, urls, args.requests, args.concurrency)
+
+    result = {'mode': args.mode, 'async_views': settings.ASYNC_VIEWS}
+    result.update(asyncio.run(main()))
+    print(json.dumps(result))
+
+
+def prepare(args):
+    """Cria (ou completa) o banco de teste compartilhado pelos modos"""
+    db_path = setup_django(args.db)
+    from people.models import Aluno, Curso
+    from people.seed import gerar_alunos, gerar_cursos
+
+    rng = random.Random(args.seed)
+    curso_ids = list(Curso.objects.values_list('id', flat=True)) or gerar_cursos(args.cursos, rng)
+    faltam = args.alunos - Aluno.objects.count()
+    if faltam > 0:
+        gerar_alunos(faltam, curso_ids, rng)
+    return db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--alunos', type=int, default=10_000, help='Alunos gerados (padrão: 10000).')
+    parser.add_argument('--cursos', type=int, default=40, help='Cursos gerados (padrão: 40).')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests por modo (padrão: 2000).')
+    parser.add_argument('--concurrency', type=int, default=200, help='Clientes simultâneos (padrão: 200).')
+    parser.add_argument('--threads', type=int, default=8, help='Threads do servidor WSGI (padrão: 8).')
+    parser.add_argument('--db-latency', type=float, default=0, help='Espera por consulta, em ms (padrão: 0).')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--db', help='Arquivo SQLite a usar (padrão: temporário).')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: saída padrão).')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    started = time.perf_counter()
+    args.db = prepare(args)
+    print(f'{args.alunos} alunos prontos em {time.perf_counter() - started:.1f}s', file=sys.stderr)
+
+    results = []
+    for mode in args.modes:
+        env = dict(os.environ, ESCOLA_ASYNC_VIEWS='1' if mode == 'asgi' else '0')
+        command = [
+            sys.executable, os.path.abspath(__file__), '--mode', mode, '--db', args.db,
+            '--requests', str(args.requests), '--concurrency', str(args.concurrency),
+            '--threads', str(args.threads), '--db-latency', str(args.db_latency),
+        ]
+        output = subprocess.run(command, env=env, cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        results.append(result)
+        print(json.dumps(result), file=sys.stderr)
+
+    report = {
+        'config': {
+            'alunos': args.alunos, 'requests': args.requests, 'concurrency': args.concurrency,
+            'threads': args.threads, 'db_latency_ms': args.db_latency,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Renderização das páginas grandes: tempo até o primeiro byte e bytes enviados.
+
+    python benchmarks/render.py --alunos 5000 --repeat 50
+    python benchmarks/render.py --no-fragment-cache --output render.json
+
+Cada modo roda em um subprocesso (``ESCOLA_RENDER_PERFORMANCE`` só é lido ao
+carregar as settings) sobre o mesmo banco de teste em arquivo:
+
+- ``default``: sem o modo de desempenho (respostas sem compressão);
+- ``performance``: ``RENDER_PERFORMANCE`` ligado (loader com cache
+  explícito, gzip, context processors mínimos).
+
+Os requests vão direto para o ``WSGIHandler``, com ``Accept-Encoding: gzip,
+br`` como um navegador. O primeiro byte é medido quando o handler entrega a
+primeira parte não vazia do corpo; nas exportações em streaming isso
+acontece antes do fim da consulta.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import BASE_DIR, setup_django  # noqa: E402
+
+MODES = ('default', 'performance')
+
+
+def routes():
+    from django.urls import reverse
+
+    from people.models import Curso
+
+    curso = Curso.objects.filter(ativo=True).order_by('-total_alunos_ativos').first()
+    return {
+        'aluno_list': reverse('aluno_list'),
+        'curso_list': reverse('curso_list'),
+        'curso_detail': reverse('curso_detail', args=[curso.pk]),
+        'aluno_export': reverse('aluno_export'),
+    }
+
+
+def wsgi_get(application, url):
+    """``(status, ms até o primeiro byte, ms total, bytes, Content-Encoding)``"""
+    path, _, query = url.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'HTTP_HOST': 'testserver',
+        'HTTP_ACCEPT_ENCODING': 'gzip, br',
+        'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+    }
+    started = time.perf_counter()
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split()[0])
+        response['encoding'] = dict(headers).get('Content-Encoding')
+
+    body = application(environ, start_response)
+    first_byte, size = None, 0
+    try:
+        for chunk in body:
+            if chunk and first_byte is None:
+                first_byte = time.perf_counter()
+            size += len(chunk)
+    finally:
+        body.close()
+    finished = time.perf_counter()
+    first_byte = first_byte or finished
+    return (
+        response['status'], (first_byte - started) * 1000, (finished - started) * 1000,
+        size, response['encoding'],
+    )
+
+
+def run_mode(args):
+    """Executado no subprocesso de cada modo; imprime o resultado em JSON"""
+    setup_django(args.db, keepdb=True)
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+
+    settings.ALLOWED_HOSTS = ['testserver']
+    settings.FRAGMENT_CACHE_ENABLED = not args.no_fragment_cache
+    application = get_wsgi_application()
+
+    result = {'mode': args.mode, 'render_performance': settings.RENDER_PERFORMANCE, 'routes': {}}
+    for name, url in routes().items():
+        repeat = max(1, args.repeat // 10) if name == 'aluno_export' else args.repeat
+        wsgi_get(application, url)  # aquecimento (templates, cache de fragmentos)
+        samples = [wsgi_get(application, url) for _ in range(repeat)]
+        status, _, _, size, encoding = samples[-1]
+        result['routes'][name] = {
+            'status': status,
+            'encoding': encoding,
+            'bytes': size,
+            'ttfb_p50_ms': round(statistics.median(s[1] for s in samples), 2),
+            'total_p50_ms': round(statistics.median(s[2] for s in samples), 2),
+        }
+    print(json.dumps(result))
+
+
+def prepare(args):
+    """Cria (ou completa) o banco de teste compartilhado pelos modos"""
+    db_path = setup_django(args.db)
+    from people.models import Aluno, Curso
+    from people.seed import gerar_alunos, gerar_cursos
+
+    rng = random.Random(args.seed)
+    curso_ids = list(Curso.objects.values_list('id', flat=True)) or gerar_cursos(args.cursos, rng)
+    faltam = args.alunos - Aluno.objects.count()
+    if faltam > 0:
+        gerar_alunos(faltam, curso_ids, rng)
+    return db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--alunos', type=int, default=5000, help='Alunos gerados (padrão: 5000).')
+    parser.add_argument('--cursos', type=int, default=10, help='Cursos gerados (padrão: 10).')
+    parser.add_argument('--repeat', type=int, default=50, help='Requests por rota (padrão: 50).')
+    parser.add_argument('--no-fragment-cache', action='store_true', help='Renderiza todas as linhas a cada request.')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--db', help='Arquivo SQLite a usar (padrão: temporário).')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: saída padrão).')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    started = time.perf_counter()
+    args.db = prepare(args)
+    print(f'{args.alunos} alunos prontos em {time.perf_counter() - started:.1f}s', file=sys.stderr)
+
+    results = []
+    for mode in args.modes:
+        command = [
+            sys.executable, os.path.abspath(__file__), '--mode', mode, '--db', args.db,
+            '--repeat', str(args.repeat), '--seed', str(args.seed),
+        ]
+        if args.no_fragment_cache:
+            command.append('--no-fragment-cache')
+        env = dict(os.environ, ESCOLA_RENDER_PERFORMANCE='1' if mode == 'performance' else '0')
+        output = subprocess.run(command, cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        results.append(result)
+        print(json.dumps(result), file=sys.stderr)
+
+    report = {
+        'config': {'alunos': args.alunos, 'repeat': args.repeat, 'fragment_cache': not args.no_fragment_cache},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""
+Benchmark por rota: latência p50/p95, número de consultas SQL e pico de memória.
+
+    python benchmarks/run.py --sizes 1000 100000 1000000 --output bench.json
+    python benchmarks/run.py --sizes 1000 --compare bench.json
+
+Cada tamanho é alcançado incrementalmente sobre o mesmo banco de teste (em
+arquivo), com os dados gerados por ``people.seed``. O resultado é um JSON
+com os metadados do commit, para comparar execuções entre versões.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import BASE_DIR, setup_django  # noqa: E402
+
+ROUTE_REPEAT = {
+    # A exportação percorre a tabela inteira; poucas repetições bastam
+    'aluno_export': 3,
+}
+
+
+def grow(total_alunos, cursos, rng):
+    from people.models import Aluno, Curso
+    from people.seed import gerar_alunos, gerar_cursos
+
+    curso_ids = list(Curso.objects.values_list('id', flat=True)) or gerar_cursos(cursos, rng)
+    faltam = total_alunos - Aluno.objects.count()
+    if faltam > 0:
+        gerar_alunos(faltam, curso_ids, rng)
+
+
+def routes():
+    """Rotas de core/urls.py e changelists do admin, com argumentos reais"""
+    from django.urls import reverse
+
+    from people.models import Aluno, Curso
+
+    curso = Curso.objects.filter(ativo=True).order_by('-total_alunos_ativos').first()
+    aluno = Aluno.objects.filter(ativo=True).order_by('id').first()
+    meio = Aluno.objects.filter(ativo=True).order_by('nome', 'id').values_list('nome', flat=True)
+    meio = meio[Aluno.objects.count() // 2] if aluno else ''
+    sobrenome = aluno.nome.split()[-1] if aluno else 'Silva'
+    return [
+        ('home', reverse('home')),
+        ('curso_list', reverse('curso_list')),
+        ('curso_detail', reverse('curso_detail', args=[curso.pk])),
+        ('curso_create', reverse('curso_create')),
+        ('curso_edit', reverse('curso_edit', args=[curso.pk])),
+        ('curso_delete', reverse('curso_delete', args=[curso.pk])),
+        ('aluno_list', reverse('aluno_list')),
+        ('aluno_list_curso', f'{reverse("aluno_list")}?curso={curso.pk}&status=ativo'),
+        ('aluno_list_busca', f'{reverse("aluno_list")}?search={sobrenome}'),
+        ('aluno_list_matricula', f'{reverse("aluno_list")}?search={aluno.matricula}'),
+        ('aluno_list_meio', f'{reverse("aluno_list")}?after=' + _cursor(meio, 0)),
+        ('aluno_export', f'{reverse("aluno_export")}?curso={curso.pk}'),
+        ('aluno_detail', reverse('aluno_detail', args=[aluno.pk])),
+        ('aluno_create', reverse('aluno_create')),
+        ('aluno_edit', reverse('aluno_edit', args=[aluno.pk])),
+        ('aluno_delete', reverse('aluno_delete', args=[aluno.pk])),
+        ('api_curso_list', reverse('api_curso_list')),
+        ('api_aluno_list', f'{reverse("api_aluno_list")}?curso={curso.pk}&limit=200'),
+        ('api_aluno_detail', reverse('api_aluno_detail', args=[aluno.pk])),
+        ('admin_curso_changelist', reverse('admin:people_curso_changelist')),
+        ('admin_aluno_changelist', reverse('admin:people_aluno_changelist')),
+        ('admin_aluno_changelist_busca', f'{reverse("admin:people_aluno_changelist")}?q={sobrenome}'),
+        (
+            'admin_aluno_changelist_filtro',
+            f'{reverse("admin:people_aluno_changelist")}?curso__id__exact={curso.pk}&status__exact=ativo',
+        ),
+        ('admin_aluno_changelist_ultima', f'{reverse("admin:people_aluno_changelist")}?p=399'),
+    ]
+
+
+def _cursor(nome, pk):
+    from core.pagination import encode_cursor
+
+    return encode_cursor([nome, pk])
+
+
+def _get(client, url):
+    response = client.get(url)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def measure(client, name, url, repeat):
+    from django.db import connection
+
+    _get(client, url)  # aquecimento (caches de template, conexões)
+
+    # Passada instrumentada: consultas e pico de memória Python. As consultas
+    # são contadas por um execute_wrapper porque o sinal request_started
+    # zera connection.queries no meio da requisição.
+    queries = []
+    tracemalloc.start()
+    with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+        response = _get(client, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(ROUTE_REPEAT.get(name, repeat)):
+        started = time.perf_counter()
+        _get(client, url)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'route': name,
+        'url': url,
+        'status': response.status_code,
+        'samples': len(timings),
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        'queries': len(queries),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def metadata():
+    import sqlite3
+
+    import django
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+    }
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['size'], r['route']): r for r in json.load(f)['results']}
+    print(f'{"tamanho":>9} {"rota":<24} {"p50 ms":>16} {"consultas":>12}', file=sys.stderr)
+    for result in current:
+        old = baseline.get((result['size'], result['route']))
+        if not old:
+            continue
+        ratio = result['p50_ms'] / old['p50_ms'] if old['p50_ms'] else float('inf')
+        print(
+            f'{result["size"]:>9} {result["route"]:<24} '
+            f'{old["p50_ms"]:>7} → {result["p50_ms"]:<7} {old["queries"]:>4} → {result["queries"]:<4}'
+            + ('  <-- regressão' if ratio > 1.2 or result['queries'] > old['queries'] else ''),
+            file=sys.stderr,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--cursos', type=int, default=40, help='Cursos gerados (padrão: 40).')
+    parser.add_argument('--repeat', type=int, default=20, help='Repetições por rota (padrão: 20).')
+    parser.add_argument('--routes', help='Expressão regular para filtrar as rotas medidas.')
+    parser.add_argument('--db', help='Arquivo SQLite a reutilizar entre execuções.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: saída padrão).')
+    parser.add_argument('--compare', help='JSON de uma execução anterior para comparar.')
+    args = parser.parse_args()
+
+    setup_django(args.db)
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    admin = get_user_model().objects.filter(username='bench').first() or \
+        get_user_model().objects.create_superuser('bench', 'bench@escola.test', 'bench')
+    client = Client()
+    client.force_login(admin)
+    rng = random.Random(args.seed)
+    selected = re.compile(args.routes) if args.routes else None
+
+    results = []
+    for size in sorted(args.sizes):
+        started = time.perf_counter()
+        grow(size, args.cursos, rng)
+        print(f'{size} alunos prontos em {time.perf_counter() - started:.1f}s', file=sys.stderr)
+        for name, url in routes():
+            if selected and not selected.search(name):
+                continue
+            result = {'size': size}
+            result.update(measure(client, name, url, args.repeat))
+            results.append(result)
+            print(json.dumps(result), file=sys.stderr)
+
+    report = {'meta': metadata(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
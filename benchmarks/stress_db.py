@@ -0,0 +1,202 @@
+"""
+Teste de estresse do SQLite: escritores concorrentes contra leitores.
+
+    python benchmarks/stress_db.py --writers 4 --readers 8 --seconds 10
+    python benchmarks/stress_db.py --modes default tuned --output stress.json
+
+Cada modo roda em um subprocesso sobre o mesmo banco em arquivo:
+
+- ``default``: SQLite como o Django configura sem opções (journal em
+  rollback, ``BEGIN`` adiado, espera padrão de 5s pela trava);
+- ``tuned``: a configuração de ``escola_project.database`` (WAL,
+  ``synchronous=NORMAL``, ``BEGIN IMMEDIATE``, mmap/cache).
+
+Os escritores repetem o que os formulários e ações do admin fazem: uma
+transação que lê um aluno, grava e segura a trava por ``--hold`` ms (o resto
+do request), e de vez em quando uma ação em lote. Os leitores leem a página
+da lista de alunos. O resultado mostra latência e erros ("database is
+locked") de cada lado.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import BASE_DIR, setup_django  # noqa: E402
+
+MODES = ('default', 'tuned')
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * fraction))], 2)
+
+
+def summary(latencies, errors, elapsed):
+    return {
+        'ops': len(latencies),
+        'ops_per_s': round(len(latencies) / elapsed, 1),
+        'errors': errors,
+        'p50_ms': round(statistics.median(latencies), 2) if latencies else None,
+        'p95_ms': percentile(latencies, 0.95),
+        'max_ms': round(max(latencies), 2) if latencies else None,
+    }
+
+
+def worker(operation, stop, latencies, errors, lock):
+    from django.db import OperationalError, connection
+
+    try:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                operation()
+            except OperationalError:
+                with lock:
+                    errors.append(1)
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+    finally:
+        connection.close()
+
+
+def run_mode(args):
+    """Executado no subprocesso de cada modo; imprime o resultado em JSON"""
+    setup_django(args.db, keepdb=True)
+    from django.db import connection, transaction
+
+    from people.bulk import AlunoBulkUpdate
+    from people.models import Aluno
+
+    # Falhas das ações em lote já entram na contagem de erros
+    logging.getLogger('people.bulk').disabled = True
+    if args.mode == 'default':
+        # Mesmo dicionário usado pelas conexões de todas as threads
+        connection.settings_dict['OPTIONS'] = {'init_command': 'PRAGMA journal_mode = DELETE'}
+    connection.close()
+
+    ids = list(Aluno.objects.values_list('pk', flat=True))
+    connection.close()
+    rng = random.Random(args.seed)
+
+    def escrever():
+        if rng.random() < 0.05:
+            pks = rng.sample(ids, 200)
+            AlunoBulkUpdate(Aluno.objects.filter(pk__in=pks), {'semestre': rng.randint(1, 10)}).run()
+            return
+        with transaction.atomic():
+            aluno = Aluno.objects.get(pk=rng.choice(ids))
+            aluno.semestre = aluno.semestre % 10 + 1
+            aluno.save()
+            time.sleep(args.hold / 1000)
+
+    def ler():
+        list(Aluno.objects.filter(ativo=True).select_related('curso').order_by('nome', 'id')[:25])
+        Aluno.objects.filter(ativo=True, pk=rng.choice(ids)).first()
+
+    stop, lock = threading.Event(), threading.Lock()
+    results = {'write': ([], []), 'read': ([], [])}
+    threads = [
+        threading.Thread(target=worker, args=(escrever, stop, *results['write'], lock))
+        for _ in range(args.writers)
+    ] + [
+        threading.Thread(target=worker, args=(ler, stop, *results['read'], lock))
+        for _ in range(args.readers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with connection.cursor() as cursor:
+        journal_mode = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+    result = {'mode': args.mode, 'journal_mode': journal_mode}
+    for kind, (latencies, errors) in results.items():
+        result[kind] = summary(latencies, len(errors), elapsed)
+    print(json.dumps(result))
+
+
+def prepare(args):
+    """Cria (ou completa) o banco de teste compartilhado pelos modos"""
+    db_path = setup_django(args.db)
+    from django.db import connection
+
+    from people.models import Aluno, Curso
+    from people.seed import gerar_alunos, gerar_cursos
+
+    rng = random.Random(args.seed)
+    curso_ids = list(Curso.objects.values_list('id', flat=True)) or gerar_cursos(args.cursos, rng)
+    faltam = args.alunos - Aluno.objects.count()
+    if faltam > 0:
+        gerar_alunos(faltam, curso_ids, rng)
+    # Trocar o modo de journal nos subprocessos exige o banco sem outras conexões
+    connection.close()
+    return db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--alunos', type=int, default=20_000, help='Alunos gerados (padrão: 20000).')
+    parser.add_argument('--cursos', type=int, default=40, help='Cursos gerados (padrão: 40).')
+    parser.add_argument('--writers', type=int, default=4, help='Threads escritoras (padrão: 4).')
+    parser.add_argument('--readers', type=int, default=8, help='Threads leitoras (padrão: 8).')
+    parser.add_argument('--seconds', type=float, default=10, help='Duração de cada modo (padrão: 10).')
+    parser.add_argument('--hold', type=float, default=5, help='Ms com a trava de escrita por transação (padrão: 5).')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--db', help='Arquivo SQLite a usar (padrão: temporário).')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: saída padrão).')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    started = time.perf_counter()
+    args.db = prepare(args)
+    print(f'{args.alunos} alunos prontos em {time.perf_counter() - started:.1f}s', file=sys.stderr)
+
+    results = []
+    for mode in args.modes:
+        command = [
+            sys.executable, os.path.abspath(__file__), '--mode', mode, '--db', args.db,
+            '--writers', str(args.writers), '--readers', str(args.readers),
+            '--seconds', str(args.seconds), '--hold', str(args.hold), '--seed', str(args.seed),
+        ]
+        output = subprocess.run(command, cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        results.append(result)
+        print(json.dumps(result), file=sys.stderr)
+
+    report = {
+        'config': {
+            'alunos': args.alunos, 'writers': args.writers, 'readers': args.readers,
+            'seconds': args.seconds, 'hold_ms': args.hold,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""
+API JSON somente leitura de cursos e alunos.
+
+    GET /api/alunos/?fields=nome,matricula&curso=3&status=ativo&limit=100
+    GET /api/alunos/<id>/
+    GET /api/cursos/?search=engenharia
+    GET /api/cursos/<id>/
+    GET /api/alunos/mudancas/?since=2024-01-01T00:00:00&limit=1000
+
+As listas são paginadas por cursor (``next``/``previous``) e serializadas a
+partir de ``.values()``, sem instanciar modelos. As respostas levam ``ETag``
+e ``Last-Modified``; nas listas ambos vêm da versão da coleção (ver
+``core.conditional``), então um 304 é respondido sem consultar a página.
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
+
+from people.models import Aluno, Curso
+
+from .conditional import estado_alunos, estado_cursos, make_etag
+from .feed import changes, parse_since, stream_jsonl
+from .fields import ALUNO_FIELDS, CURSO_FIELDS, CURSO_VOLATILE_FIELDS
+from .mixins import AlunoFiltersMixin, CursoFiltersMixin
+from .pagination import InvalidCursor, KeysetPaginator
+from .streaming import in_batches
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiMixin:
+    """Base das views da API: campos, serialização e GET condicional"""
+    model = None
+    # Nome público -> lookup do ORM
+    fields = {}
+    default_fields = None
+    # Campos que mudam sem atualizar updated_at: com eles, só a ETag vale
+    volatile_fields = ()
+    ordering = ('nome', 'id')
+
+    def get_fields(self):
+        requested = self.request.GET.get('fields', '')
+        if not requested:
+            return self.default_fields or list(self.fields)
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f'Campo(s) desconhecido(s): {", ".join(unknown)}.')
+        return names
+
+    def get_queryset(self):
+        return self.model._default_manager.filter(ativo=True)
+
+    def related_timestamps(self, fields):
+        """``updated_at`` dos modelos relacionados cujos campos foram pedidos (JOINs)"""
+        return sorted({
+            f'{self.fields[name].rsplit("__", 1)[0]}__updated_at' for name in fields if '__' in self.fields[name]
+        })
+
+    def values(self, queryset, fields):
+        # id, updated_at e a chave de ordenação são sempre lidos (ETag e cursor),
+        # e o updated_at dos relacionados quando algum campo deles é pedido
+        lookups = {self.fields[name] for name in fields}
+        lookups.update(('id', 'updated_at'), self.ordering, self.related_timestamps(fields))
+        return queryset.values(*lookups)
+
+    def serialize(self, row, fields):
+        return {name: row[self.fields[name]] for name in fields}
+
+    def conditional(self, etag, last_modified, fields, build):
+        """Responde 304 se o cliente já tem a versão atual; senão chama ``build``"""
+        if any(name in self.volatile_fields for name in fields):
+            last_modified = None
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(self.request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = JsonResponse(build(), encoder=DjangoJSONEncoder, json_dumps_params={'ensure_ascii': False})
+        response.headers['ETag'] = etag
+        if timestamp is not None:
+            response.headers['Last-Modified'] = http_date(timestamp)
+        # Permite guardar a resposta, mas sempre revalidando
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as e:
+            return JsonResponse({'detail': str(e)}, status=e.status)
+
+
+class ApiListView(ApiMixin, View):
+    paginate_by = 50
+    max_paginate_by = 500
+
+    def get_state(self, fields):
+        """``(última alteração, versão)`` da coleção inteira, para os campos pedidos"""
+        raise NotImplementedError
+
+    def get_page_size(self):
+        try:
+            limit = int(self.request.GET.get('limit', self.paginate_by))
+        except ValueError:
+            raise ApiError('limit deve ser um número inteiro.')
+        return max(1, min(limit, self.max_paginate_by))
+
+    def page_url(self, **cursor):
+        params = self.request.GET.copy()
+        params.pop('after', None)
+        params.pop('before', None)
+        params.update(cursor)
+        return self.request.build_absolute_uri(f'{self.request.path}?{params.urlencode()}')
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        page_size = self.get_page_size()
+        last_modified, version = self.get_state(fields)
+        etag = make_etag(version, sorted(request.GET.lists()))
+
+        def build():
+            queryset = self.values(self.get_queryset(), fields)
+            paginator = KeysetPaginator(queryset, page_size, ordering=self.ordering, count=0)
+            try:
+                page = paginator.page(after=request.GET.get('after'), before=request.GET.get('before'))
+            except InvalidCursor as e:
+                raise ApiError(str(e))
+            return {
+                'results': [self.serialize(row, fields) for row in page.object_list],
+                'next': self.page_url(after=page.next_cursor) if page.next_cursor else None,
+                'previous': self.page_url(before=page.previous_cursor) if page.previous_cursor else None,
+            }
+
+        return self.conditional(etag, last_modified, fields, build)
+
+
+class ApiDetailView(ApiMixin, View):
+    def get(self, request, pk, *args, **kwargs):
+        fields = self.get_fields()
+        row = self.values(self.get_queryset().filter(pk=pk), fields).first()
+        if row is None:
+            raise ApiError('Não encontrado.', status=404)
+        data = self.serialize(row, fields)
+        timestamps = [row['updated_at'], *(row[lookup] for lookup in self.related_timestamps(fields))]
+        etag = make_etag(row['id'], timestamps, sorted(data.items()))
+        return self.conditional(etag, max(timestamps), fields, lambda: data)
+
+
+class CursoApiMixin(CursoFiltersMixin):
+    model = Curso
+    fields = CURSO_FIELDS
+    volatile_fields = CURSO_VOLATILE_FIELDS
+
+
+class AlunoApiMixin(AlunoFiltersMixin):
+    model = Aluno
+    fields = ALUNO_FIELDS
+    # curso_codigo exige um JOIN; só é lido quando pedido em ?fields=
+    default_fields = [name for name in fields if name != 'curso_codigo']
+
+
+class CursoApiListView(CursoApiMixin, ApiListView):
+    def get_state(self, fields):
+        return estado_cursos()
+
+    def get_queryset(self):
+        return self.filter_cursos(super().get_queryset())
+
+
+class CursoApiDetailView(CursoApiMixin, ApiDetailView):
+    pass
+
+
+class AlunoApiListView(AlunoApiMixin, ApiListView):
+    def get_state(self, fields):
+        # curso_codigo muda com o curso, sem tocar no updated_at do aluno
+        return estado_alunos(cursos=bool(self.related_timestamps(fields)))
+
+    def get_queryset(self):
+        try:
+            return self.filter_alunos(super().get_queryset())
+        except ValueError:
+            raise ApiError('Filtro inválido.')
+
+
+class AlunoApiDetailView(AlunoApiMixin, ApiDetailView):
+    pass
+
+
+class ChangeFeedView(View):
+    """Mudanças de cursos ou alunos desde um watermark, em JSONL e em streaming"""
+    resource = None
+    default_limit = 10000
+    max_limit = 100000
+
+    def get(self, request, *args, **kwargs):
+        try:
+            since = request.GET.get('since')
+            limit = int(request.GET.get('limit', self.default_limit))
+            rows = changes(
+                self.resource,
+                since=parse_since(since) if since else None,
+                cursor=request.GET.get('cursor'),
+                limit=max(1, min(limit, self.max_limit)),
+            )
+        except (ValueError, InvalidCursor) as e:
+            return JsonResponse({'detail': str(e)}, status=400)
+        return StreamingHttpResponse(
+            in_batches(stream_jsonl(self.resource, rows)), content_type='application/x-ndjson; charset=utf-8',
+        )
+
+
+curso_list = CursoApiListView.as_view()
+curso_detail = CursoApiDetailView.as_view()
+aluno_list = AlunoApiListView.as_view()
+aluno_detail = AlunoApiDetailView.as_view()
+curso_changes = ChangeFeedView.as_view(resource='cursos')
+aluno_changes = ChangeFeedView.as_view(resource='alunos')
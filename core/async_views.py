@@ -0,0 +1,163 @@
+"""
+Versões assíncronas das páginas de leitura: início, listas e detalhes.
+
+Usadas no modo ASGI (``ASYNC_VIEWS``), nas mesmas URLs, templates e contexto
+das views de ``core.views``. As consultas passam pelo ORM assíncrono
+(``aget``, ``acount``, ``aaggregate``, ``async for``) e o request não prende
+uma thread do servidor enquanto espera o banco; só a renderização do
+template, feita pelo handler do Django, roda em thread.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.db.models import Count, Max, Sum
+from django.http import Http404
+from django.utils.cache import patch_cache_control
+
+from people.models import Curso
+from people.reference import aget_cursos_ativos
+
+from . import views
+from .conditional import aestado_cursos
+from .mixins import ConditionalGetMixin
+from .stats import aget_dashboard_stats
+
+
+class AsyncConditionalGetMixin(ConditionalGetMixin):
+    """``ConditionalGetMixin`` com validadores e página montados de forma assíncrona"""
+
+    async def aget_validators(self):
+        return None
+
+    async def render_page(self):
+        raise NotImplementedError
+
+    async def load_session(self):
+        # Lida pela API assíncrona, a sessão fica em cache para os acessos
+        # síncronos seguintes (mensagens, usuário no template).
+        session = getattr(self.request, 'session', None)
+        if session is not None:
+            await session.akeys()
+
+    async def get(self, request, *args, **kwargs):
+        await self.load_session()
+        if len(messages.get_messages(request)):
+            response = await self.render_page()
+            patch_cache_control(response, private=True, no_store=True)
+            return response
+
+        validators = await self.aget_validators()
+        if validators is None:
+            return await self.render_page()
+        etag, timestamp, response = self.conditional_response(validators)
+        if response is None:
+            response = await self.render_page()
+        return self.patch_conditional(response, etag, timestamp)
+
+
+class AsyncKeysetMixin:
+    """Faz a paginação das views síncronas usar a página já lida de forma assíncrona"""
+    _paginated = None
+
+    async def aget_queryset(self):
+        # A busca consulta o banco ao montar o queryset (correspondência exata)
+        if self.request.GET.get('search', ''):
+            return await sync_to_async(self.get_queryset)()
+        return self.get_queryset()
+
+    async def aget_pagination_count(self):
+        return None
+
+    async def apaginate(self, queryset):
+        count = await self.aget_pagination_count()
+        self._paginated = await self.apaginate_keyset(queryset, self.paginate_by, count=count)
+
+    def paginate_keyset(self, queryset, page_size, count=None):
+        return self._paginated
+
+
+class AsyncDetailMixin:
+    async def aget_object(self):
+        try:
+            return await self.get_queryset().aget(pk=self.kwargs['pk'])
+        except self.model.DoesNotExist:
+            raise Http404(f'Nenhum {self.model._meta.verbose_name} encontrado.')
+
+    async def aget_validators(self):
+        return self.make_validators(await self.get_validators_queryset().afirst())
+
+
+class HomeView(views.HomeView):
+    """Página inicial com as estatísticas lidas pelo cache assíncrono"""
+    stats = None
+
+    def get_stats(self):
+        return self.stats
+
+    async def get(self, request, *args, **kwargs):
+        self.stats = await aget_dashboard_stats()
+        return self.render_to_response(self.get_context_data(**kwargs))
+
+
+class CursoListView(AsyncKeysetMixin, AsyncConditionalGetMixin, views.CursoListView):
+    async def aget_validators(self):
+        return await aestado_cursos()
+
+    async def render_page(self):
+        self.object_list = await self.aget_queryset()
+        await self.apaginate(self.object_list)
+        return self.render_to_response(self.get_context_data())
+
+
+class CursoDetailView(AsyncDetailMixin, AsyncKeysetMixin, AsyncConditionalGetMixin, views.CursoDetailView):
+    async def render_page(self):
+        self.object = await self.aget_object()
+        await self.apaginate(self.object.alunos.filter(ativo=True))
+        return self.render_to_response(self.get_context_data(object=self.object))
+
+    async def aget_pagination_count(self):
+        return self.object.total_alunos_matriculados
+
+
+class AlunoListView(AsyncKeysetMixin, AsyncConditionalGetMixin, views.AlunoListView):
+    async def aget_validators(self):
+        queryset = await self.aget_queryset()
+        # O ORM assíncrono roda cada consulta na mesma thread do banco: elas
+        # são feitas em sequência, como na versão síncrona.
+        ultima = await self.get_ultima_alteracao().aaggregate(ultima=Max('updated_at'))
+        total = await self.aget_pagination_count()
+        cursos = await Curso.objects.aaggregate(ultima=Max('updated_at'), total=Count('id'))
+        if total is None:
+            total = await queryset.acount()
+        self._total = total  # reaproveitado pelo paginador
+        return self.make_validators(ultima['ultima'], total, cursos)
+
+    async def aget_pagination_count(self):
+        if getattr(self, '_total', None) is not None:
+            return self._total
+        counters = self.get_counters_total()
+        if counters is None:
+            return None
+        cursos, total = counters
+        return (await cursos.aaggregate(total=Sum(total)))['total'] or 0
+
+    def get_cursos(self):
+        return self.cursos
+
+    async def render_page(self):
+        self.object_list = await self.aget_queryset()
+        await self.apaginate(self.object_list)
+        self.cursos = await aget_cursos_ativos()
+        return self.render_to_response(self.get_context_data())
+
+
+class AlunoDetailView(AsyncDetailMixin, AsyncConditionalGetMixin, views.AlunoDetailView):
+    async def render_page(self):
+        self.object = await self.aget_object()
+        return self.render_to_response(self.get_context_data(object=self.object))
+
+
+home = HomeView.as_view()
+curso_list = CursoListView.as_view()
+curso_detail = CursoDetailView.as_view()
+aluno_list = AlunoListView.as_view()
+aluno_detail = AlunoDetailView.as_view()
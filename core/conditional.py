@@ -0,0 +1,65 @@
+"""
+Versões baratas das coleções de cursos e alunos, para GET condicional.
+
+A versão de uma coleção combina a última alteração (``updated_at``) entre
+todos os registros, inativos inclusive, com o total dos ativos. Uma edição
+ou exclusão lógica move o máximo (que também é o ``Last-Modified``); uma
+exclusão definitiva muda o total, que vem dos contadores desnormalizados de
+Curso em vez de um ``COUNT(*)``.
+"""
+import hashlib
+
+from django.db.models import Count, F, Max, Q, Sum
+
+from people.models import Aluno, Curso
+
+
+def _total_contadores():
+    fields = list(Curso.CONTADORES_ALUNOS.values())
+    return sum((F(field) for field in fields[1:]), F(fields[0]))
+
+
+def _estado_cursos_aggregates():
+    ativos = Q(ativo=True)
+    return {
+        'ultima': Max('updated_at'),
+        'total': Count('id', filter=ativos),
+        'alunos': Sum(_total_contadores(), filter=ativos),
+    }
+
+
+def _versao_cursos(estado):
+    # Os contadores mudam sem tocar em Curso.updated_at, então entram na versão
+    return estado['ultima'], f'{estado["ultima"]}:{estado["total"]}:{estado["alunos"]}'
+
+
+def estado_cursos():
+    """``(última alteração, versão)`` da coleção de cursos ativos"""
+    return _versao_cursos(Curso._base_manager.aggregate(**_estado_cursos_aggregates()))
+
+
+async def aestado_cursos():
+    """Versão assíncrona de ``estado_cursos``"""
+    return _versao_cursos(await Curso._base_manager.aaggregate(**_estado_cursos_aggregates()))
+
+
+def estado_alunos(cursos=False):
+    """
+    ``(última alteração, versão)`` da coleção de alunos ativos. Com
+    ``cursos``, para respostas que incluem campos do curso, a última
+    alteração entre os cursos também entra.
+    """
+    ultima = Aluno._base_manager.aggregate(ultima=Max('updated_at'))['ultima']
+    aggregates = {'total': Sum(_total_contadores())}
+    if cursos:
+        aggregates['cursos'] = Max('updated_at')
+    estado = Curso._base_manager.aggregate(**aggregates)
+    if not cursos:
+        return ultima, f'{ultima}:{estado["total"]}'
+    datas = [data for data in (ultima, estado['cursos']) if data]
+    return max(datas, default=None), f'{ultima}:{estado["total"]}:{estado["cursos"]}'
+
+
+def make_etag(*parts):
+    """ETag forte a partir das partes que determinam o conteúdo da resposta"""
+    return '"%s"' % hashlib.md5('|'.join(map(str, parts)).encode(), usedforsecurity=False).hexdigest()
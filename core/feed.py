@@ -0,0 +1,99 @@
+"""
+Feed de mudanças de cursos e alunos para sincronização incremental.
+
+Cada linha criada, alterada ou desativada aparece em ordem ``(updated_at,
+id)``, lida pelo índice ``*_updated_id_idx``: buscar as N mudanças depois de
+um cursor custa o mesmo qualquer que seja o tamanho da tabela. Cada linha
+leva o cursor que retoma o feed logo depois dela.
+
+Linhas alteradas há menos de ``CHANGE_FEED_DELAY`` segundos ainda não são
+entregues: ``updated_at`` é calculado antes do commit, e uma transação mais
+lenta poderia gravar um valor anterior a um cursor já entregue.
+"""
+import datetime
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from people.models import Aluno, Curso
+
+from .fields import ALUNO_FIELDS, CURSO_FIELDS, CURSO_VOLATILE_FIELDS
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+
+ORDERING = ('updated_at', 'id')
+
+
+def _fields(fields, *extra, volatile=()):
+    fields = {
+        name: lookup for name, lookup in fields.items()
+        if '__' not in lookup and name not in volatile
+    }
+    fields.update((name, name) for name in extra)
+    return fields
+
+
+# Recurso -> (modelo, campos). Os campos são os da API, sem JOINs e sem os
+# contadores (que mudam sem tocar updated_at), mais ``ativo`` para que o
+# consumidor veja as desativações.
+FEEDS = {
+    'cursos': (Curso, _fields(CURSO_FIELDS, 'ativo', volatile=CURSO_VOLATILE_FIELDS)),
+    'alunos': (Aluno, _fields(ALUNO_FIELDS, 'ativo')),
+}
+
+
+def get_delay():
+    return getattr(settings, 'CHANGE_FEED_DELAY', 2)
+
+
+def parse_since(value):
+    """Converte o watermark ISO 8601 (data ou data e hora) em datetime"""
+    since = parse_datetime(value)
+    if since is None:
+        try:
+            since = datetime.datetime.combine(datetime.date.fromisoformat(value), datetime.time())
+        except ValueError:
+            raise ValueError(f'Watermark inválido: "{value}".')
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def changes(resource, since=None, cursor=None, limit=None, using=None):
+    """
+    Queryset de dicionários com as mudanças de ``resource`` depois do
+    watermark ``since`` (inclusive) ou do ``cursor`` (exclusive).
+    """
+    model, fields = FEEDS[resource]
+    queryset = model._base_manager.db_manager(using).all()
+    if cursor:
+        updated_at, pk = decode_cursor(cursor, len(ORDERING))
+        updated_at = parse_datetime(updated_at) if isinstance(updated_at, str) else None
+        if updated_at is None or not isinstance(pk, int):
+            raise InvalidCursor('Cursor inválido.')
+        queryset = queryset.filter(
+            Q(updated_at__gte=updated_at) & (Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+        )
+    elif since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    queryset = queryset.filter(updated_at__lte=timezone.now() - datetime.timedelta(seconds=get_delay()))
+    queryset = queryset.order_by(*ORDERING).values(*fields.values())
+    return queryset[:limit] if limit else queryset
+
+
+def serialize(resource, row):
+    _, fields = FEEDS[resource]
+    data = {name: row[lookup] for name, lookup in fields.items()}
+    # isoformat() completo: o DjangoJSONEncoder truncaria os microssegundos
+    data['cursor'] = encode_cursor([row['updated_at'].isoformat(), row['id']])
+    return data
+
+
+def stream_jsonl(resource, rows, chunk_size=2000):
+    """Gera uma linha JSON por mudança, sem carregar o resultado inteiro"""
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield json.dumps(serialize(resource, row), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
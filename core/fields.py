@@ -0,0 +1,40 @@
+"""
+Campos de cursos e alunos expostos pela API (``core.api``) e pelo feed de
+mudanças (``core.feed``): nome público -> lookup usado em ``.values()``.
+"""
+from people.models import Curso
+
+CURSO_FIELDS = {
+    'id': 'id',
+    'uuid': 'uuid',
+    'nome': 'nome',
+    'codigo': 'codigo',
+    'coordenador': 'coordenador',
+    'descricao': 'descricao',
+    'carga_horaria': 'carga_horaria',
+    'total_alunos_ativos': 'total_alunos_ativos',
+    'total_alunos_inativos': 'total_alunos_inativos',
+    'total_alunos_desvinculados': 'total_alunos_desvinculados',
+    'total_alunos_formados': 'total_alunos_formados',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+# Contadores mudam sem tocar updated_at
+CURSO_VOLATILE_FIELDS = tuple(Curso.CONTADORES_ALUNOS.values())
+
+ALUNO_FIELDS = {
+    'id': 'id',
+    'uuid': 'uuid',
+    'nome': 'nome',
+    'matricula': 'matricula',
+    'email': 'email',
+    'telefone': 'telefone',
+    'data_nascimento': 'data_nascimento',
+    'semestre': 'semestre',
+    'status': 'status',
+    'curso': 'curso_id',
+    'curso_codigo': 'curso__codigo',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
@@ -0,0 +1,86 @@
+"""
+Cache de fragmentos de template por objeto (cards de curso, linhas de aluno).
+
+Cada objeto ocupa uma entrada ``(carimbo, html)``. O carimbo combina
+``updated_at``, os atributos de que o fragmento depende e o código do
+template, então uma entrada desatualizada nunca é servida, mesmo que a
+invalidação por sinal se perca. A página inteira é lida com um único
+``get_many`` e os fragmentos que faltarem são gravados com um ``set_many``.
+"""
+import hashlib
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+
+@dataclass(frozen=True)
+class Fragment:
+    template_name: str
+    # Nome do objeto no contexto do template
+    context_name: str
+    # Atributos exibidos que podem mudar sem alterar updated_at
+    depends: tuple = ()
+
+
+FRAGMENTS = {
+    'curso_card': Fragment('core/includes/curso_card.html', 'curso', depends=('total_alunos_ativos',)),
+    'aluno_row': Fragment('core/includes/aluno_row.html', 'aluno', depends=('curso.nome',)),
+}
+
+
+def is_enabled():
+    return getattr(settings, 'FRAGMENT_CACHE_ENABLED', True)
+
+
+def get_cache():
+    return caches[getattr(settings, 'FRAGMENT_CACHE_ALIAS', 'default')]
+
+
+def fragment_key(name, pk):
+    return f'fragment:{name}:{pk}'
+
+
+def _resolve(obj, path):
+    for attr in path.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _stamp(fragment, obj, source_hash):
+    values = [obj.updated_at.isoformat()] + [str(_resolve(obj, path)) for path in fragment.depends]
+    return f'{source_hash}:' + '|'.join(values)
+
+
+def render_fragments(name, objects):
+    """Renderiza ``objects`` com o fragmento ``name``, usando o cache quando ligado"""
+    fragment = FRAGMENTS[name]
+    template = get_template(fragment.template_name)
+    render = lambda obj: template.render({fragment.context_name: obj})  # noqa: E731
+    if not is_enabled():
+        return mark_safe(''.join(render(obj) for obj in objects))
+
+    cache = get_cache()
+    source_hash = hashlib.md5(template.template.source.encode(), usedforsecurity=False).hexdigest()[:8]
+    entries = [(obj, fragment_key(name, obj.pk), _stamp(fragment, obj, source_hash)) for obj in objects]
+    cached = cache.get_many([key for _, key, _ in entries])
+
+    html, missing = [], {}
+    for obj, key, stamp in entries:
+        entry = cached.get(key)
+        if entry is not None and entry[0] == stamp:
+            html.append(entry[1])
+        else:
+            rendered = render(obj)
+            missing[key] = (stamp, rendered)
+            html.append(rendered)
+    if missing:
+        cache.set_many(missing)
+    return mark_safe(''.join(html))
+
+
+def invalidate_fragments(name, pks):
+    if is_enabled():
+        get_cache().delete_many([fragment_key(name, pk) for pk in pks if pk is not None])
@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+
+from core.feed import FEEDS, changes, parse_since, serialize
+from core.pagination import InvalidCursor
+
+
+class Command(BaseCommand):
+    help = (
+        'Escreve em JSONL os cursos ou alunos criados, alterados ou desativados desde um '
+        'watermark; o cursor para a próxima execução vai para a saída de erro'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(FEEDS), help='Coleção do feed.')
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--since', help='Data/hora ISO 8601 a partir da qual listar (inclusive).')
+        group.add_argument('--cursor', help='Cursor devolvido por uma execução anterior.')
+        parser.add_argument('--limit', type=int, help='Máximo de mudanças a listar (padrão: todas).')
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Banco de dados a ser usado (padrão: "default").',
+        )
+
+    def handle(self, *args, **options):
+        resource = options['resource']
+        try:
+            rows = changes(
+                resource,
+                since=parse_since(options['since']) if options['since'] else None,
+                cursor=options['cursor'],
+                limit=options['limit'],
+                using=options['database'],
+            )
+        except (ValueError, InvalidCursor) as e:
+            raise CommandError(str(e))
+
+        total, cursor = 0, options['cursor']
+        for row in rows.iterator(chunk_size=2000):
+            data = serialize(resource, row)
+            self.stdout.write(json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False))
+            total += 1
+            cursor = data['cursor']
+        self.stderr.write(f'{total} mudança(s). Cursor: {cursor or "-"}')
@@ -0,0 +1,40 @@
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Remove as sessões expiradas do banco em lotes, uma transação por lote '
+        '(o clearsessions do Django apaga todas em um único DELETE)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Sessões removidas por transação (padrão: 1000).',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Apenas conta as sessões que seriam removidas.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Banco de dados a ser usado (padrão: "default").',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        expiradas = Session.objects.using(using).filter(expire_date__lt=timezone.now())
+
+        if options['dry_run']:
+            self.stdout.write(f'{expiradas.count()} sessão(ões) expirada(s) seriam removidas.')
+            return
+        removidas = 0
+        # Cópias no cache (sessões cached_db) expiram sozinhas com a sessão
+        while keys := list(expiradas.order_by('pk').values_list('pk', flat=True)[:options['batch_size']]):
+            with transaction.atomic(using=using):
+                Session.objects.using(using).filter(pk__in=keys).delete()
+            removidas += len(keys)
+        self.stdout.write(self.style.SUCCESS(f'{removidas} sessão(ões) expirada(s) removida(s).'))
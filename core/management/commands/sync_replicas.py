@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Copia o banco principal SQLite para as réplicas de DATABASE_REPLICAS: replicação '
+        'local, para desenvolvimento, no lugar da replicação do servidor de banco'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Repete a cópia a cada N segundos (padrão: copia uma vez).',
+        )
+
+    def sync(self, replicas):
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        for alias in replicas:
+            target = connections[alias]
+            target.ensure_connection()
+            # API de backup do SQLite: cópia consistente, sem travar o principal até o fim
+            source.connection.backup(target.connection)
+
+    def handle(self, *args, **options):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            raise CommandError('Nenhuma réplica configurada (ESCOLA_DATABASE_REPLICA_URLS).')
+        vendors = {connections[alias].vendor for alias in [DEFAULT_DB_ALIAS, *replicas]}
+        if vendors != {'sqlite'}:
+            raise CommandError('A cópia local só funciona com SQLite; use a replicação do servidor de banco.')
+
+        while True:
+            started = time.perf_counter()
+            self.sync(replicas)
+            self.stdout.write(
+                f'{len(replicas)} réplica(s) atualizada(s) em {(time.perf_counter() - started) * 1000:.0f}ms.'
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,366 @@
+"""
+Instrumentação por request: consultas SQL, tempo de banco, de view e de template.
+
+Os tempos são medidos diretamente (``execute_wrapper`` nas conexões e
+callbacks do ``TemplateResponse``), sem depender de ``connection.queries``,
+então funcionam com ``DEBUG = False``. O resultado vai no cabeçalho
+``Server-Timing`` e requests acima de ``SLOW_REQUEST_MS`` são registrados
+no log junto com suas consultas mais lentas.
+
+Funciona nos dois modos: sob ASGI não força as views assíncronas a rodar em
+thread; os wrappers são instalados na thread que executa o ORM do request.
+"""
+import heapq
+import logging
+import mimetypes
+import os
+import re
+import time
+from contextlib import ExitStack
+from itertools import count
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import HttpResponse, HttpResponseNotModified
+from django.middleware.gzip import GZipMiddleware
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from . import routers
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetrics:
+    """Métricas acumuladas ao longo de um request"""
+
+    def __init__(self, keep_slowest):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.view_started = None
+        self.view_time = None
+        self.template_started = None
+        self.template_time = 0.0
+        self.keep_slowest = keep_slowest
+        self.slowest = []
+        self._seq = count()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            if self.keep_slowest:
+                # Heap limitado: guarda só as N consultas mais lentas
+                item = (elapsed, next(self._seq), sql)
+                if len(self.slowest) < self.keep_slowest:
+                    heapq.heappush(self.slowest, item)
+                else:
+                    heapq.heappushpop(self.slowest, item)
+
+    def view_called(self):
+        self.view_started = time.perf_counter()
+
+    def view_returned(self, response):
+        now = time.perf_counter()
+        if self.view_started is not None:
+            self.view_time = now - self.view_started
+        self.template_started = now
+        response.add_post_render_callback(self.template_rendered)
+        return response
+
+    def template_rendered(self, response):
+        self.template_time += time.perf_counter() - self.template_started
+        return response
+
+    def server_timing(self, total, name=None):
+        entries = [
+            f'route;desc="{name}"' if name else None,
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'view;dur={self.view_time * 1000:.1f}' if self.view_time is not None else None,
+            f'tpl;dur={self.template_time * 1000:.1f}' if self.template_started else None,
+            f'total;dur={total * 1000:.1f}',
+        ]
+        return ', '.join(entry for entry in entries if entry)
+
+
+class RequestTimingMiddleware:
+    """
+    Mede cada request e publica o resultado no cabeçalho ``Server-Timing``.
+
+    Deve vir no início de ``MIDDLEWARE`` (logo após ``StaticFilesMiddleware``)
+    para cobrir todo o request.
+    Controlado por ``REQUEST_TIMING``, ``SLOW_REQUEST_MS`` e
+    ``SLOW_REQUEST_QUERIES`` nas settings.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_TIMING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+        self.slow_queries = getattr(settings, 'SLOW_REQUEST_QUERIES', 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Ganchos sem I/O: as versões assíncronas evitam trocas de thread
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = request._timing = RequestMetrics(self.slow_queries)
+        with ExitStack() as stack:
+            self.wrap_connections(stack, metrics)
+            response = self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = request._timing = RequestMetrics(self.slow_queries)
+        # As conexões são por thread: os wrappers vão para a thread em que o
+        # ORM assíncrono executa as consultas deste request.
+        stack = ExitStack()
+        await sync_to_async(self.wrap_connections)(stack, metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, metrics)
+
+    def wrap_connections(self, stack, metrics):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+
+    def finish(self, request, response, metrics):
+        # Respostas em streaming só consultam o banco depois deste ponto;
+        # o cabeçalho cobre apenas a montagem da resposta.
+        total = time.perf_counter() - metrics.started
+        if metrics.view_started is not None and metrics.view_time is None:
+            metrics.view_time = time.perf_counter() - metrics.view_started
+        match = request.resolver_match
+        name = match.view_name if match else None
+        response.headers['Server-Timing'] = metrics.server_timing(total, name)
+
+        if total * 1000 >= self.slow_ms:
+            self.log_slow_request(request, response, metrics, total, name)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._timing.view_called()
+
+    def process_template_response(self, request, response):
+        # Chamado logo após a view e antes da renderização do template
+        return request._timing.view_returned(response)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        request._timing.view_called()
+
+    async def aprocess_template_response(self, request, response):
+        return request._timing.view_returned(response)
+
+    def log_slow_request(self, request, response, metrics, total, name):
+        slowest = '\n'.join(
+            f'  {elapsed * 1000:.1f}ms {sql}'
+            for elapsed, _, sql in sorted(metrics.slowest, reverse=True)
+        )
+        logger.warning(
+            'Request lento: %s %s (%s) %d em %.0fms, %d consultas em %.0fms\n%s',
+            request.method, request.path, name or '-', response.status_code,
+            total * 1000, metrics.queries, metrics.db_time * 1000, slowest,
+            extra={
+                'url_name': name,
+                'duration_ms': total * 1000,
+                'queries': metrics.queries,
+                'db_ms': metrics.db_time * 1000,
+            },
+        )
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Comprime as respostas com gzip no modo ``RENDER_PERFORMANCE``.
+
+    Respostas em streaming (exportações) são comprimidas parte a parte, sem
+    esperar o fim. Fica logo após ``RequestTimingMiddleware``, cujo total
+    inclui a compressão; as ETags das páginas passam a fracas, o que a
+    comparação do ``If-None-Match`` já aceita.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'RENDER_PERFORMANCE', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Define o banco de leitura de cada request (``core.routers``) e grava o
+    cookie de leia-o-que-escreveu quando o request escreveu no banco.
+
+    Deve vir antes de qualquer middleware que consulte o banco (sessão,
+    autenticação), para que também essas escritas marquem o request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = routers.RoutingState(routers.sticky_cookie() in request.COOKIES)
+        token = routers.start(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.finish(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        state = routers.RoutingState(routers.sticky_cookie() in request.COOKIES)
+        token = routers.start(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.finish(token)
+        return self.finish(response, state)
+
+    def finish(self, response, state):
+        if state.wrote and routers.get_replicas():
+            response.set_cookie(
+                routers.sticky_cookie(), '1',
+                max_age=getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 10),
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routers.route_reads(request, view_func)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        routers.route_reads(request, view_func)
+
+
+# Nome gravado pelo ManifestStaticFilesStorage: "nome.<12 hex do md5>.ext"
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}(\.[^./]+)?$')
+
+# Em ordem de preferência: (Content-Encoding, sufixo do arquivo)
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def accepted_encodings(header):
+    """Codificações aceitas em um ``Accept-Encoding`` (ignora as com q=0)"""
+    accepted = set()
+    for item in header.split(','):
+        encoding, _, params = item.partition(';')
+        name, _, value = params.partition('=')
+        if name.strip() == 'q':
+            try:
+                if float(value) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(encoding.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """
+    Serve ``STATIC_ROOT`` (gerado por ``collectstatic``) no próprio servidor
+    da aplicação, antes do restante da pilha de middlewares.
+
+    Arquivos com hash no nome vão com ``Cache-Control`` imutável por
+    ``STATIC_MAX_AGE``; os demais são revalidados por ``Last-Modified``.
+    Quando existe uma variante ``.br``/``.gz`` (``core.storage``) aceita
+    pelo cliente, ela é enviada com ``Content-Encoding``. Caminhos ausentes
+    de ``STATIC_ROOT`` seguem para as URLs normalmente.
+
+    Com ``DEBUG`` fica desligado: ``STATIC_ROOT`` guarda o resultado do
+    último ``collectstatic`` e serviria cópias antigas dos arquivos em
+    edição; o ``runserver`` do staticfiles os lê direto de ``static/``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.DEBUG or not settings.STATIC_ROOT or not settings.STATIC_URL.startswith('/'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.max_age = getattr(settings, 'STATIC_MAX_AGE', 365 * 24 * 60 * 60)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.is_static(request):
+            response = self.serve(request)
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.is_static(request):
+            # Leitura de disco fora do event loop; os demais requests não pagam a troca de thread
+            response = await sync_to_async(self.serve, thread_sensitive=False)(request)
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def is_static(self, request):
+        return request.method in ('GET', 'HEAD') and request.path_info.startswith(settings.STATIC_URL)
+
+    def serve(self, request):
+        name = request.path_info[len(settings.STATIC_URL):]
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        variants = [(encoding, path + suffix) for encoding, suffix in STATIC_ENCODINGS if os.path.isfile(path + suffix)]
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        encoding, file_path = next(((e, p) for e, p in variants if e in accepted), (None, path))
+
+        stat = os.stat(file_path)
+        immutable = bool(HASHED_NAME.search(name))
+        if not immutable and not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+            return HttpResponseNotModified()
+
+        content_type, _ = mimetypes.guess_type(path)
+        if request.method == 'HEAD':
+            body = b''
+        else:
+            with open(file_path, 'rb') as f:
+                body = f.read()
+        response = HttpResponse(body, content_type=content_type or 'application/octet-stream')
+        response.headers['Content-Length'] = stat.st_size
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        # Respostas daqui não passam pelo SecurityMiddleware
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        if immutable:
+            response.headers['Cache-Control'] = f'public, max-age={self.max_age}, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if variants:
+            response.headers['Vary'] = 'Accept-Encoding'
+        return response
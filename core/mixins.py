@@ -1,5 +1,15 @@
 from django.contrib import messages
+from django.core.exceptions import BadRequest
+from django.http import HttpResponseRedirect
 from django.urls import reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from people.reference import get_cursos_ativos
+from people.search import search_alunos, search_cursos
+
+from .conditional import make_etag
+from .pagination import InvalidCursor, KeysetPaginator
 
 
 class TitleMixin:
@@ -47,13 +57,11 @@ class UserTrackingMixin:
 
 
 class SoftDeleteMixin:
-    """Mixin para soft delete"""
-    def delete(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        self.object.ativo = False
-        self.object.updated_by = request.user if request.user.is_authenticated else None
-        self.object.save()
-        return super().delete(request, *args, **kwargs)
+    """Mixin para soft delete: ``soft_delete()`` no lugar de apagar a linha (e a cascata)"""
+    def form_valid(self, form):
+        user = self.request.user if self.request.user.is_authenticated else None
+        type(self.object)._default_manager.filter(pk=self.object.pk).soft_delete(user)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class BreadcrumbMixin:
@@ -66,4 +74,131 @@ class BreadcrumbMixin:
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['breadcrumbs'] = self.get_breadcrumbs()
-        return context
\ No newline at end of file
+        return context
+
+
+class CursoChoicesMixin:
+    """Mixin que adiciona os cursos ativos (do cache de referência) ao contexto"""
+    def get_cursos(self):
+        return get_cursos_ativos()
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursos'] = self.get_cursos()
+        return context
+
+
+class KeysetPaginationMixin:
+    """Mixin para paginação por cursor (keyset) ordenada por (nome, id)"""
+    paginate_by = 25
+    keyset_ordering = ('nome', 'id')
+    after_kwarg = 'after'
+    before_kwarg = 'before'
+
+    def paginate_keyset(self, queryset, page_size, count=None):
+        paginator = KeysetPaginator(
+            queryset, page_size, ordering=self.keyset_ordering, count=count
+        )
+        try:
+            page = paginator.page(
+                after=self.request.GET.get(self.after_kwarg),
+                before=self.request.GET.get(self.before_kwarg),
+            )
+        except InvalidCursor as e:
+            raise BadRequest(str(e))
+        return paginator, page
+
+    async def apaginate_keyset(self, queryset, page_size, count=None):
+        """Versão assíncrona de ``paginate_keyset``"""
+        paginator = KeysetPaginator(
+            queryset, page_size, ordering=self.keyset_ordering, count=count
+        )
+        try:
+            page = await paginator.apage(
+                after=self.request.GET.get(self.after_kwarg),
+                before=self.request.GET.get(self.before_kwarg),
+            )
+        except InvalidCursor as e:
+            raise BadRequest(str(e))
+        await paginator.acount()
+        return paginator, page
+
+    def get_pagination_count(self):
+        """Total já conhecido da lista; ``None`` faz o paginador usar COUNT(*)"""
+        return None
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page = self.paginate_keyset(queryset, page_size, count=self.get_pagination_count())
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CursoFiltersMixin:
+    """Mixin com o filtro da lista de cursos (busca)"""
+    def filter_cursos(self, queryset):
+        search = self.request.GET.get('search', '')
+        if search:
+            queryset = search_cursos(queryset, search)
+        return queryset
+
+
+class AlunoFiltersMixin:
+    """Mixin com os filtros da lista de alunos (busca, curso e status)"""
+    def filter_alunos(self, queryset):
+        search = self.request.GET.get('search', '')
+        curso_id = self.request.GET.get('curso', '')
+        status = self.request.GET.get('status', '')
+        
+        if search:
+            queryset = search_alunos(queryset, search)
+        
+        if curso_id:
+            queryset = queryset.filter(curso_id=curso_id)
+        
+        if status:
+            queryset = queryset.filter(status=status)
+        
+        return queryset
+
+
+class ConditionalGetMixin:
+    """
+    Mixin para responder 304 quando a página não mudou desde a última visita.
+
+    ``get_validators`` deve ser barato: roda antes das consultas da página.
+    As respostas podem ser guardadas por proxies compartilhados, sempre
+    revalidando com a ETag.
+    """
+    def get_validators(self):
+        """``(última alteração, versão)`` do conteúdo; ``None`` desliga a validação"""
+        return None
+    
+    def get(self, request, *args, **kwargs):
+        # Mensagens pendentes tornam a página única para este visitante
+        if len(messages.get_messages(request)):
+            response = super().get(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_store=True)
+            return response
+        
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        etag, timestamp, response = self.conditional_response(validators)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return self.patch_conditional(response, etag, timestamp)
+    
+    def conditional_response(self, validators):
+        """``(etag, timestamp, resposta 304/412 ou None)`` para os validadores"""
+        last_modified, version = validators
+        etag = make_etag(version, self.request.get_full_path())
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(self.request, etag=etag, last_modified=timestamp)
+        return etag, timestamp, response
+    
+    def patch_conditional(self, response, etag, timestamp):
+        response.headers['ETag'] = etag
+        if timestamp is not None:
+            response.headers['Last-Modified'] = http_date(timestamp)
+        patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+        patch_vary_headers(response, ['Cookie'])
+        return response
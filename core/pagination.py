@@ -0,0 +1,156 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(values):
+    """Codifica os valores da chave de ordenação em um token seguro para URL"""
+    raw = json.dumps(list(values), cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, size):
+    """Decodifica um token gerado por ``encode_cursor``"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Cursor inválido.')
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Cursor inválido.')
+    return values
+
+
+class KeysetPage:
+    """Página de resultados produzida por ``KeysetPaginator``"""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<KeysetPage ({len(self.object_list)} itens)>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @cached_property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return self.paginator.cursor_for(self.object_list[-1])
+
+    @cached_property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return self.paginator.cursor_for(self.object_list[0])
+
+
+class KeysetPaginator:
+    """
+    Paginação por cursor (keyset) sobre uma chave de ordenação única.
+
+    Em vez de ``OFFSET``, cada página filtra a partir do último registro
+    visto, então o custo de uma página não depende da profundidade na lista.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('nome', 'id'), count=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        if count is not None:
+            self.count = count
+
+    @cached_property
+    def count(self):
+        """Total de registros, calculado uma única vez por paginador"""
+        return self.queryset.count()
+
+    def cursor_for(self, obj):
+        # Aceita instâncias de modelo e dicionários de ``.values()``
+        if isinstance(obj, dict):
+            return encode_cursor(obj[field] for field in self.ordering)
+        return encode_cursor(getattr(obj, field) for field in self.ordering)
+
+    def _seek(self, values, lookup):
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        # O limite redundante sobre o primeiro campo (a >= x) permite ao banco
+        # iniciar a leitura do índice no cursor em vez de percorrê-lo desde o início.
+        first = {f'{self.ordering[0]}__{lookup}e': values[0]}
+        return Q(**first) & condition
+
+    def _filter_seek(self, queryset, cursor, lookup):
+        values = decode_cursor(cursor, len(self.ordering))
+        try:
+            return queryset.filter(self._seek(values, lookup))
+        except (ValueError, TypeError, ValidationError):
+            # Cursor decodificável, mas com valores que não servem aos campos
+            raise InvalidCursor('Cursor inválido.')
+
+    def _page_queryset(self, after, before):
+        queryset = self.queryset
+        if before:
+            queryset = self._filter_seek(queryset, before, 'lt')
+            queryset = queryset.order_by(*(f'-{field}' for field in self.ordering))
+        else:
+            if after:
+                queryset = self._filter_seek(queryset, after, 'gt')
+            queryset = queryset.order_by(*self.ordering)
+        # Um registro a mais indica se existe a página seguinte
+        return queryset[:self.per_page + 1]
+
+    def _make_page(self, object_list, after, before):
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if before:
+            object_list.reverse()
+            return KeysetPage(object_list, self, has_next=True, has_previous=has_more)
+        return KeysetPage(object_list, self, has_next=has_more, has_previous=bool(after))
+
+    def page(self, after=None, before=None):
+        object_list = list(self._page_queryset(after, before))
+        return self._make_page(object_list, after, before)
+
+    async def apage(self, after=None, before=None):
+        """Versão assíncrona de ``page``"""
+        object_list = [obj async for obj in self._page_queryset(after, before)]
+        return self._make_page(object_list, after, before)
+
+    async def acount(self):
+        """Versão assíncrona de ``count``; o resultado fica memorizado"""
+        if 'count' not in self.__dict__:
+            self.count = await self.queryset.acount()
+        return self.count
@@ -0,0 +1,85 @@
+"""
+Leituras das páginas nas réplicas; escritas e todo o resto no banco principal.
+
+``core.middleware.ReplicaRoutingMiddleware`` marca os GET/HEAD atendidos
+por ``core.views`` (e ``core.async_views``) para ler de uma das réplicas de
+``DATABASE_REPLICAS``, escolhida uma vez por request. Admin, API, comandos
+e tarefas de fundo não passam por essa marcação e leem do principal.
+
+Leia-o-que-escreveu: um request que grava no banco recebe o cookie
+``DATABASE_REPLICA_STICKY_COOKIE`` por ``DATABASE_REPLICA_STICKY_SECONDS``;
+enquanto ele existir as leituras ficam no principal, e o redirect após um
+formulário não mostra dados atrasados da réplica.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+READ_VIEW_MODULES = ('core.views', 'core.async_views')
+
+_state = ContextVar('db_routing', default=None)
+
+
+class RoutingState:
+    """Estado de roteamento de um request (mutável: as threads do ORM veem as mudanças)"""
+
+    def __init__(self, sticky):
+        self.sticky = sticky
+        self.replica = None
+        self.wrote = False
+
+
+def start(state):
+    return _state.set(state)
+
+
+def finish(token):
+    _state.reset(token)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def route_reads(request, view_func):
+    """Leituras deste request nas réplicas, se for uma página de leitura fora da janela do cookie"""
+    state = _state.get()
+    replicas = get_replicas()
+    if (
+        replicas and state is not None and not state.sticky
+        and request.method in ('GET', 'HEAD')
+        and view_func.__module__ in READ_VIEW_MODULES
+    ):
+        state.replica = random.choice(replicas)
+
+
+def sticky_cookie():
+    return getattr(settings, 'DATABASE_REPLICA_STICKY_COOKIE', 'escola_primary')
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is not None and state.replica:
+            return state.replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # As réplicas recebem o esquema pela replicação
+        if db in get_replicas():
+            return False
+        return None
@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from people.models import Aluno, Curso
+from people.signals import bulk_change
+
+from .fragments import invalidate_fragments
+from .stats import invalidate_dashboard_stats
+
+
+@receiver(post_save, sender=Curso)
+@receiver(post_delete, sender=Curso)
+@receiver(post_save, sender=Aluno)
+@receiver(post_delete, sender=Aluno)
+@receiver(bulk_change, sender=Curso)
+@receiver(bulk_change, sender=Aluno)
+def invalidar_estatisticas(sender, **kwargs):
+    """Invalida as estatísticas da página inicial após o commit da escrita"""
+    transaction.on_commit(invalidate_dashboard_stats, using=kwargs.get('using'))
+
+
+@receiver(post_save, sender=Curso)
+@receiver(post_delete, sender=Curso)
+def invalidar_fragmentos_curso(sender, instance, **kwargs):
+    """Remove o card do curso do cache de fragmentos após o commit"""
+    pk = instance.pk  # delete() zera o pk antes do commit
+    transaction.on_commit(lambda: invalidate_fragments('curso_card', [pk]), using=kwargs.get('using'))
+
+
+@receiver(post_save, sender=Aluno)
+@receiver(post_delete, sender=Aluno)
+def invalidar_fragmentos_aluno(sender, instance, **kwargs):
+    """Remove a linha do aluno e o card do curso (cujo contador mudou) após o commit"""
+    pk, curso_id = instance.pk, instance.curso_id
+
+    def invalidar():
+        invalidate_fragments('aluno_row', [pk])
+        invalidate_fragments('curso_card', [curso_id])
+    transaction.on_commit(invalidar, using=kwargs.get('using'))
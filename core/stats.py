@@ -0,0 +1,194 @@
+"""
+Estatísticas da página inicial servidas a partir do cache.
+
+O valor guardado carrega o instante em que deixa de ser "fresco". Depois
+disso um único processo (o que conseguir o lock via ``cache.add``) recalcula
+enquanto os demais continuam servindo o valor antigo, evitando que vários
+requests disparem as mesmas agregações ao mesmo tempo.
+
+Cada escrita incrementa a geração (``GENERATION_KEY``) com ``cache.incr``,
+que é atômico. O valor guardado leva a geração em que o cálculo começou e só
+é fresco enquanto ela for a atual: um recálculo que leu o banco antes de uma
+escrita não grava, ou grava já vencido, mesmo que termine depois da
+invalidação.
+
+O cache é o de ``DASHBOARD_STATS_CACHE_ALIAS``: com um cache compartilhado
+a geração nova vale para todos os processos na hora; com um cache por
+processo só o da escrita a vê, e os demais recalculam ao fim do prazo.
+
+``aget_dashboard_stats`` é a versão para as views assíncronas: o cache é
+lido com a API assíncrona e o recálculo usa o ORM assíncrono. As consultas
+são feitas em sequência: o ORM assíncrono executa todas na mesma thread do
+banco, e dispará-las juntas não as tornaria concorrentes.
+"""
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Sum
+
+from people.models import Aluno, Curso
+
+CACHE_KEY = 'core:dashboard-stats'
+LOCK_KEY = f'{CACHE_KEY}:lock'
+GENERATION_KEY = f'{CACHE_KEY}:generation'
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 0.05
+LOCK_RETRIES = 10
+
+
+def get_cache():
+    return caches[getattr(settings, 'DASHBOARD_STATS_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'DASHBOARD_STATS_TIMEOUT', 300)
+
+
+def _totais_aggregates():
+    # Os contadores por curso já têm o total por status; somá-los varre só
+    # a tabela de cursos.
+    return {status: Sum(field) for status, field in Curso.CONTADORES_ALUNOS.items()}
+
+
+# As estatísticas ficam em cache até a próxima escrita: são lidas do banco
+# principal, e não de uma réplica que pode ainda não ter essa escrita.
+def _cursos():
+    return Curso.objects.using(DEFAULT_DB_ALIAS)
+
+
+def _semestres_queryset():
+    return Aluno.objects.using(DEFAULT_DB_ALIAS).filter(ativo=True).order_by().values_list('semestre').annotate(total=Count('id'))
+
+
+def _montar_stats(totais, semestres, total_cursos):
+    por_status = [
+        {'status': status, 'label': label, 'total': totais.get(status) or 0}
+        for status, label in Aluno.STATUS_CHOICES
+    ]
+    por_semestre = [
+        {'semestre': semestre, 'label': label, 'total': semestres.get(semestre, 0)}
+        for semestre, label in Aluno.SEMESTRE_CHOICES
+    ]
+    return {
+        'total_cursos': total_cursos,
+        'total_alunos': sum(item['total'] for item in por_status),
+        'total_formados': totais.get('formado') or 0,
+        'alunos_por_status': por_status,
+        'alunos_por_semestre': por_semestre,
+    }
+
+
+def compute_dashboard_stats():
+    """Calcula as estatísticas direto no banco"""
+    return _montar_stats(
+        _cursos().aggregate(**_totais_aggregates()),
+        dict(_semestres_queryset()),
+        _cursos().filter(ativo=True).count(),
+    )
+
+
+async def acompute_dashboard_stats():
+    """Versão assíncrona de ``compute_dashboard_stats``"""
+    return _montar_stats(
+        await _cursos().aaggregate(**_totais_aggregates()),
+        {semestre: total async for semestre, total in _semestres_queryset()},
+        await _cursos().filter(ativo=True).acount(),
+    )
+
+
+def _entry(data, generation):
+    # O valor fica no cache além do prazo para ser servido enquanto
+    # outro processo recalcula.
+    return {'data': data, 'generation': generation, 'fresh_until': time.time() + get_timeout()}
+
+
+def _fresh(entry, generation):
+    return bool(entry) and entry['generation'] == generation and entry['fresh_until'] > time.time()
+
+
+def _read():
+    """``(valor guardado, geração atual)`` com uma única ida ao cache"""
+    values = get_cache().get_many([CACHE_KEY, GENERATION_KEY])
+    return values.get(CACHE_KEY), values.get(GENERATION_KEY, 0)
+
+
+async def _aread():
+    values = await get_cache().aget_many([CACHE_KEY, GENERATION_KEY])
+    return values.get(CACHE_KEY), values.get(GENERATION_KEY, 0)
+
+
+def _store(data, generation):
+    # Uma escrita invalidou durante o cálculo: o valor já nasce vencido
+    cache = get_cache()
+    if cache.get(GENERATION_KEY, 0) == generation:
+        cache.set(CACHE_KEY, _entry(data, generation), get_timeout() * 10)
+
+
+async def _astore(data, generation):
+    cache = get_cache()
+    if await cache.aget(GENERATION_KEY, 0) == generation:
+        await cache.aset(CACHE_KEY, _entry(data, generation), get_timeout() * 10)
+
+
+def get_dashboard_stats():
+    """Retorna as estatísticas do cache, recalculando-as quando necessário"""
+    entry, generation = _read()
+    if _fresh(entry, generation):
+        return entry['data']
+
+    cache = get_cache()
+    for _ in range(LOCK_RETRIES):
+        if cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+            try:
+                data = compute_dashboard_stats()
+                _store(data, generation)
+                return data
+            finally:
+                cache.delete(LOCK_KEY)
+        if entry:
+            return entry['data']
+        # Cache vazio e outro processo já está calculando: espera um pouco
+        time.sleep(LOCK_WAIT)
+        entry = cache.get(CACHE_KEY)
+        if entry:
+            return entry['data']
+    return compute_dashboard_stats()
+
+
+async def aget_dashboard_stats():
+    """Versão assíncrona de ``get_dashboard_stats``"""
+    entry, generation = await _aread()
+    if _fresh(entry, generation):
+        return entry['data']
+
+    cache = get_cache()
+    for _ in range(LOCK_RETRIES):
+        if await cache.aadd(LOCK_KEY, True, LOCK_TIMEOUT):
+            try:
+                data = await acompute_dashboard_stats()
+                await _astore(data, generation)
+                return data
+            finally:
+                await cache.adelete(LOCK_KEY)
+        if entry:
+            return entry['data']
+        await asyncio.sleep(LOCK_WAIT)
+        entry = await cache.aget(CACHE_KEY)
+        if entry:
+            return entry['data']
+    return await acompute_dashboard_stats()
+
+
+def invalidate_dashboard_stats():
+    """Passa à geração seguinte; o valor guardado continua servindo até o recálculo"""
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Geração ainda não criada (ou despejada): qualquer valor diferente de
+        # 0 já vence o que foi calculado sem ela
+        if not cache.add(GENERATION_KEY, 1, None):
+            cache.incr(GENERATION_KEY)
@@ -0,0 +1,69 @@
+"""
+Arquivos estáticos com hash no nome e versões pré-comprimidas.
+
+``collectstatic`` grava em ``STATIC_ROOT`` cada arquivo com o hash do
+conteúdo no nome (``escola.3f2a9c81d0b4.css``) e o manifesto que o
+``{% static %}`` consulta. Os arquivos de texto ganham ainda as variantes
+``.gz`` e, se o pacote ``brotli`` estiver instalado, ``.br``, servidas por
+``core.middleware.StaticFilesMiddleware`` conforme o ``Accept-Encoding``.
+
+Como no ``ManifestStaticFilesStorage``, fora do DEBUG um arquivo ausente do
+manifesto (ou a falta de ``collectstatic``) é um erro, e não uma URL sem
+hash que os navegadores precisam revalidar a cada página.
+"""
+import gzip
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.xml', '.html', '.map')
+
+
+def compressors():
+    """Pares (extensão, função de compressão) disponíveis"""
+    available = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        available.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    return available
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # Abaixo disso o cabeçalho da compressão come o ganho
+    min_compress_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            self.compress_files(self.hashed_files.values())
+
+    def compress_files(self, names):
+        for name in set(names):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(name) as f:
+                data = f.read()
+            if len(data) < self.min_compress_size:
+                continue
+            for extension, compress in compressors():
+                compressed = compress(data)
+                # Só vale a pena servir a variante se ela for bem menor
+                if len(compressed) < len(data) * 0.95:
+                    self.save_compressed(name + extension, compressed)
+
+    def save_compressed(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(content))
+
+    def stored_name(self, name):
+        # Num checkout novo, sem collectstatic, o DEBUG usa os nomes sem hash
+        # (o manifesto é lido uma vez, ao criar o storage)
+        if settings.DEBUG and not self.hashed_files:
+            return name
+        return super().stored_name(name)
@@ -0,0 +1,11 @@
+from django import template
+
+from core.fragments import render_fragments
+
+register = template.Library()
+
+
+@register.simple_tag
+def cached_fragments(objects, name):
+    """Renderiza um fragmento cacheado por objeto: ``{% cached_fragments cursos 'curso_card' %}``"""
+    return render_fragments(name, objects)
@@ -1,20 +1,34 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, async_views, views
+
+# No modo ASGI as páginas de leitura usam as views assíncronas
+pages = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('', views.home, name='home'),
+    path('', pages.home, name='home'),
+    path('relatorios/', views.relatorio, name='relatorio'),
     
     # URLs para Curso
-    path('cursos/', views.curso_list, name='curso_list'),
-    path('cursos/<int:pk>/', views.curso_detail, name='curso_detail'),
+    path('cursos/', pages.curso_list, name='curso_list'),
+    path('cursos/<int:pk>/', pages.curso_detail, name='curso_detail'),
     path('cursos/criar/', views.curso_create, name='curso_create'),
     path('cursos/<int:pk>/editar/', views.curso_edit, name='curso_edit'),
     path('cursos/<int:pk>/deletar/', views.curso_delete, name='curso_delete'),
     
     # URLs para Aluno
-    path('alunos/', views.aluno_list, name='aluno_list'),
-    path('alunos/<int:pk>/', views.aluno_detail, name='aluno_detail'),
+    path('alunos/', pages.aluno_list, name='aluno_list'),
+    path('alunos/exportar/', views.aluno_export, name='aluno_export'),
+    path('alunos/<int:pk>/', pages.aluno_detail, name='aluno_detail'),
     path('alunos/criar/', views.aluno_create, name='aluno_create'),
     path('alunos/<int:pk>/editar/', views.aluno_edit, name='aluno_edit'),
     path('alunos/<int:pk>/deletar/', views.aluno_delete, name='aluno_delete'),
+    
+    # API JSON somente leitura
+    path('api/cursos/', api.curso_list, name='api_curso_list'),
+    path('api/cursos/<int:pk>/', api.curso_detail, name='api_curso_detail'),
+    path('api/cursos/mudancas/', api.curso_changes, name='api_curso_changes'),
+    path('api/alunos/', api.aluno_list, name='api_aluno_list'),
+    path('api/alunos/<int:pk>/', api.aluno_detail, name='api_aluno_detail'),
+    path('api/alunos/mudancas/', api.aluno_changes, name='api_aluno_changes'),
 ]
\ No newline at end of file
@@ -1,14 +1,25 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
 from django.views.generic import (
     ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 )
-from django.db.models import Q
-from people.models import Curso, Aluno
+from people import analytics
+from people.models import Curso, Aluno, EstadoAnalise
+from people.reference import get_cursos, get_version
 from .mixins import (
     TitleMixin, SuccessMessageMixin, ActiveObjectsMixin, 
-    UserTrackingMixin, SoftDeleteMixin, BreadcrumbMixin
+    UserTrackingMixin, SoftDeleteMixin, BreadcrumbMixin, KeysetPaginationMixin,
+    CursoFiltersMixin, AlunoFiltersMixin, ConditionalGetMixin, CursoChoicesMixin
 )
+from .conditional import estado_cursos
+from .stats import get_dashboard_stats
+from .streaming import in_batches
 
 
 class HomeView(TitleMixin, BreadcrumbMixin, TemplateView):
@@ -19,15 +30,102 @@ class HomeView(TitleMixin, BreadcrumbMixin, TemplateView):
         {'name': 'Início', 'url': 'home', 'active': True}
     ]
     
+    def get_stats(self):
+        return get_dashboard_stats()
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_stats())
+        return context
+
+
+class RelatorioView(TitleMixin, BreadcrumbMixin, ConditionalGetMixin, TemplateView):
+    """
+    Relatórios de matrículas, lidos só dos recortes pré-calculados
+    (``people.analytics``; atualizados por ``manage.py refresh_analytics``).
+    """
+    template_name = 'core/relatorio.html'
+    title = 'Relatórios - Sistema Escolar'
+    breadcrumbs = [
+        {'name': 'Início', 'url': 'home', 'active': False},
+        {'name': 'Relatórios', 'url': 'relatorio', 'active': True}
+    ]
+    meses = 24
+    
+    def get_curso_id(self):
+        try:
+            return int(self.request.GET.get('curso', ''))
+        except ValueError:
+            return None
+    
+    def get_atualizado_em(self):
+        """Última atualização dos recortes (memorizada: validadores e contexto)"""
+        if not hasattr(self, '_atualizado_em'):
+            self._atualizado_em = (
+                EstadoAnalise.objects.filter(pk=1).values_list('atualizado_em', flat=True).first()
+            )
+        return self._atualizado_em
+    
+    def get_validators(self):
+        # Os nomes dos cursos vêm do cache de referência, cuja versão entra na ETag
+        atualizado_em = self.get_atualizado_em()
+        return atualizado_em, (atualizado_em, get_version())
+    
+    def pivot(self, linhas, chave):
+        """Linhas ``{'chave', 'valores' (um por status), 'total'}`` somando os recortes por ``chave``"""
+        status = [value for value, _ in Aluno.STATUS_CHOICES]
+        totais = {}
+        for linha in linhas:
+            valores = totais.setdefault(getattr(linha, chave), dict.fromkeys(status, 0))
+            if linha.status in valores:
+                valores[linha.status] += linha.total
+        return [
+            {'chave': key, 'valores': list(valores.values()), 'total': sum(valores.values())}
+            for key, valores in totais.items()
+        ]
+    
+    def somar(self, linhas, chave):
+        totais = {}
+        for linha in linhas:
+            totais[getattr(linha, chave)] = totais.get(getattr(linha, chave), 0) + linha.total
+        return totais
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_cursos'] = Curso.objects.filter(ativo=True).count()
-        context['total_alunos'] = Aluno.objects.filter(ativo=True).count()
+        curso_id = self.get_curso_id()
+        recortes = analytics.ler_recortes(curso_id)
+        nomes = {curso.pk: curso.nome for curso in get_cursos()}
+        
+        por_curso = self.pivot(recortes['curso_status_semestre'], 'curso_id')
+        for row in por_curso:
+            row['nome'] = nomes.get(row['chave'], row['chave'])
+        por_curso.sort(key=lambda row: row['nome'])
+        
+        semestres = dict(Aluno.SEMESTRE_CHOICES)
+        por_semestre = sorted(self.pivot(recortes['curso_status_semestre'], 'semestre'), key=lambda row: row['chave'])
+        for row in por_semestre:
+            row['nome'] = semestres.get(row['chave'], row['chave'])
+        
+        faixas = self.somar(recortes['curso_faixa_etaria'], 'faixa_etaria')
+        meses = self.somar(recortes['curso_mes'], 'mes')
+        context.update({
+            'cursos': [curso for curso in get_cursos() if curso.ativo],
+            'selected_curso': curso_id,
+            'status_choices': Aluno.STATUS_CHOICES,
+            'por_curso': por_curso,
+            'por_semestre': por_semestre,
+            'por_faixa': [
+                {'nome': nome, 'total': faixas.get(codigo, 0)} for codigo, nome, _ in analytics.FAIXAS_ETARIAS
+            ],
+            'por_mes': sorted(meses.items(), reverse=True)[:self.meses],
+            'total': sum(row['total'] for row in por_curso),
+            'atualizado_em': self.get_atualizado_em(),
+        })
         return context
 
 
 # Views para Curso
-class CursoListView(TitleMixin, BreadcrumbMixin, ActiveObjectsMixin, ListView):
+class CursoListView(TitleMixin, BreadcrumbMixin, ConditionalGetMixin, ActiveObjectsMixin, KeysetPaginationMixin, CursoFiltersMixin, ListView):
     """Lista todos os cursos"""
     model = Curso
     template_name = 'core/curso_list.html'
@@ -39,15 +137,11 @@ class CursoListView(TitleMixin, BreadcrumbMixin, ActiveObjectsMixin, ListView):
     ]
     
     def get_queryset(self):
-        queryset = super().get_queryset()
-        search = self.request.GET.get('search', '')
-        
-        if search:
-            queryset = queryset.filter(
-                Q(nome__icontains=search) | Q(descricao__icontains=search)
-            )
-        
-        return queryset.order_by('nome')
+        return self.filter_cursos(super().get_queryset()).order_by('nome', 'id')
+    
+    def get_validators(self):
+        # A coleção inteira de cursos é pequena e cobre qualquer filtro
+        return estado_cursos()
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -55,7 +149,7 @@ class CursoListView(TitleMixin, BreadcrumbMixin, ActiveObjectsMixin, ListView):
         return context
 
 
-class CursoDetailView(TitleMixin, BreadcrumbMixin, ActiveObjectsMixin, DetailView):
+class CursoDetailView(TitleMixin, BreadcrumbMixin, ConditionalGetMixin, ActiveObjectsMixin, KeysetPaginationMixin, DetailView):
     """Detalhes de um curso"""
     model = Curso
     template_name = 'core/curso_detail.html'
@@ -71,9 +165,37 @@ class CursoDetailView(TitleMixin, BreadcrumbMixin, ActiveObjectsMixin, DetailVie
             {'name': self.object.nome, 'url': None, 'active': True}
         ]
     
+    def get_validators_queryset(self):
+        """Curso.updated_at, contadores e a última alteração entre os alunos do curso"""
+        # Inativos inclusive: a exclusão lógica de um aluno também move o máximo
+        ultimo_aluno = (
+            Aluno._base_manager.filter(curso=OuterRef('pk'))
+            .order_by('-updated_at').values('updated_at')[:1]
+        )
+        return (
+            self.get_queryset().filter(pk=self.kwargs['pk'])
+            .annotate(ultimo_aluno=Subquery(ultimo_aluno))
+            .values('updated_at', 'ultimo_aluno', *Curso.CONTADORES_ALUNOS.values())
+        )
+    
+    def make_validators(self, row):
+        if row is None:
+            return None
+        ultima = max(filter(None, [row['updated_at'], row['ultimo_aluno']]))
+        return ultima, sorted(row.items())
+    
+    def get_validators(self):
+        return self.make_validators(self.get_validators_queryset().first())
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['alunos'] = self.object.alunos.filter(ativo=True)
+        paginator, page = self.paginate_keyset(
+            self.object.alunos.filter(ativo=True), self.paginate_by,
+            count=self.object.total_alunos_matriculados,
+        )
+        context['alunos'] = page.object_list
+        context['alunos_page'] = page
+        context['alunos_paginator'] = paginator
         return context
 
 
@@ -137,7 +259,7 @@ class CursoDeleteView(TitleMixin, BreadcrumbMixin, SuccessMessageMixin, SoftDele
 
 
 # Views para Aluno
-class AlunoListView(TitleMixin, BreadcrumbMixin, ActiveObjectsMixin, ListView):
+class AlunoListView(TitleMixin, BreadcrumbMixin, CursoChoicesMixin, ConditionalGetMixin, ActiveObjectsMixin, KeysetPaginationMixin, AlunoFiltersMixin, ListView):
     """Lista todos os alunos"""
     model = Aluno
     template_name = 'core/aluno_list.html'
@@ -149,27 +271,63 @@ class AlunoListView(TitleMixin, BreadcrumbMixin, ActiveObjectsMixin, ListView):
     ]
     
     def get_queryset(self):
-        queryset = super().get_queryset().select_related('curso')
-        search = self.request.GET.get('search', '')
-        curso_id = self.request.GET.get('curso', '')
+        # Memorizado: a busca faz uma consulta de correspondência exata ao montar o queryset
+        if getattr(self, '_alunos', None) is None:
+            queryset = super().get_queryset().select_related('curso')
+            self._alunos = self.filter_alunos(queryset).order_by('nome', 'id')
+        return self._alunos
+    
+    def get_validators(self):
+        """Última alteração entre os alunos e total do conjunto filtrado, mais a versão dos cursos exibidos"""
+        queryset = self.get_queryset()
+        ultima = self.get_ultima_alteracao().aggregate(ultima=Max('updated_at'))['ultima']
+        total = self.get_pagination_count()
+        if total is None:
+            total = queryset.count()
+        self._total = total  # reaproveitado pelo paginador
+        cursos = Curso.objects.aggregate(ultima=Max('updated_at'), total=Count('id'))
+        return self.make_validators(ultima, total, cursos)
+    
+    def get_ultima_alteracao(self):
+        # Todos os alunos, inativos inclusive: um aluno que sai da lista
+        # (exclusão lógica, troca de curso ou de status) também move o
+        # máximo, que assim vale para qualquer filtro.
+        return Aluno._base_manager.order_by()
+
+    def make_validators(self, ultima, total, cursos):
+        datas = [data for data in (ultima, cursos['ultima']) if data]
+        return max(datas, default=None), (ultima, total, cursos['ultima'], cursos['total'])
+    
+    def get_counters_total(self):
+        """``(cursos, expressão)`` cuja soma é o total da lista; ``None`` em buscas"""
+        if self.request.GET.get('search', ''):
+            return None
         status = self.request.GET.get('status', '')
-        
-        if search:
-            queryset = queryset.filter(
-                Q(nome__icontains=search) | Q(email__icontains=search) | Q(matricula__icontains=search)
-            )
-        
-        if curso_id:
-            queryset = queryset.filter(curso_id=curso_id)
-        
+        curso_id = self.request.GET.get('curso', '')
+        cursos = Curso.objects.all()
+        fields = list(Curso.CONTADORES_ALUNOS.values())
         if status:
-            queryset = queryset.filter(status=status)
-        
-        return queryset.order_by('nome')
+            if status not in Curso.CONTADORES_ALUNOS:
+                # Status desconhecido: total zero, sem consultar o banco
+                cursos = cursos.none()
+            else:
+                fields = [Curso.CONTADORES_ALUNOS[status]]
+        if curso_id:
+            cursos = cursos.filter(pk=curso_id)
+        return cursos, sum((F(field) for field in fields[1:]), F(fields[0]))
+    
+    def get_pagination_count(self):
+        """Soma os contadores dos cursos em vez de contar people_aluno (exceto em buscas)"""
+        if getattr(self, '_total', None) is not None:
+            return self._total
+        counters = self.get_counters_total()
+        if counters is None:
+            return None
+        cursos, total = counters
+        return cursos.aggregate(total=Sum(total))['total'] or 0
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['cursos'] = Curso.objects.filter(ativo=True).order_by('nome')
         context['search'] = self.request.GET.get('search', '')
         context['selected_curso'] = self.request.GET.get('curso', '')
         context['selected_status'] = self.request.GET.get('status', '')
@@ -177,12 +335,82 @@ class AlunoListView(TitleMixin, BreadcrumbMixin, ActiveObjectsMixin, ListView):
         return context
 
 
-class AlunoDetailView(TitleMixin, BreadcrumbMixin, ActiveObjectsMixin, DetailView):
+class Echo:
+    """Buffer falso: ``csv.writer`` escreve e o valor é devolvido ao gerador"""
+    def write(self, value):
+        return value
+
+
+class AlunoExportView(AlunoListView):
+    """Exporta a lista filtrada de alunos em CSV ou JSONL, em streaming"""
+    export_fields = [
+        ('nome', 'nome'),
+        ('matricula', 'matricula'),
+        ('email', 'email'),
+        ('telefone', 'telefone'),
+        ('data_nascimento', 'data_nascimento'),
+        ('semestre', 'semestre'),
+        ('status', 'status'),
+        ('curso', 'curso__codigo'),
+        ('curso_nome', 'curso__nome'),
+    ]
+    chunk_size = 2000
+    formats = {
+        'csv': 'text/csv; charset=utf-8',
+        'jsonl': 'application/x-ndjson; charset=utf-8',
+    }
+
+    def get_rows(self):
+        # values_list + iterator: sem instâncias de modelo e sem cache do
+        # queryset, então a memória não cresce com o número de linhas.
+        return (
+            self.get_queryset()
+            .values_list(*(lookup for _, lookup in self.export_fields))
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+    def stream_csv(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow([name for name, _ in self.export_fields])
+        for row in rows:
+            yield writer.writerow(row)
+
+    def stream_jsonl(self, rows):
+        names = [name for name, _ in self.export_fields]
+        for row in rows:
+            yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+    def get(self, request, *args, **kwargs):
+        fmt = request.GET.get('format', 'csv')
+        if fmt not in self.formats:
+            raise Http404(f'Formato de exportação desconhecido: {fmt}')
+        stream = in_batches(getattr(self, f'stream_{fmt}')(self.get_rows()))
+        response = StreamingHttpResponse(stream, content_type=self.formats[fmt])
+        response['Content-Disposition'] = f'attachment; filename="alunos.{fmt}"'
+        return response
+
+
+class AlunoDetailView(TitleMixin, BreadcrumbMixin, ConditionalGetMixin, ActiveObjectsMixin, DetailView):
     """Detalhes de um aluno"""
     model = Aluno
     template_name = 'core/aluno_detail.html'
     context_object_name = 'aluno'
     
+    def get_queryset(self):
+        return super().get_queryset().select_related('curso')
+    
+    def get_validators_queryset(self):
+        """Aluno.updated_at e o do curso exibido na página"""
+        return self.get_queryset().filter(pk=self.kwargs['pk']).values('updated_at', 'curso__updated_at')
+    
+    def make_validators(self, row):
+        if row is None:
+            return None
+        return max(row['updated_at'], row['curso__updated_at']), sorted(row.items())
+    
+    def get_validators(self):
+        return self.make_validators(self.get_validators_queryset().first())
+    
     def get_title(self):
         return f'{self.object.nome} - Sistema Escolar'
     
@@ -194,7 +422,7 @@ class AlunoDetailView(TitleMixin, BreadcrumbMixin, ActiveObjectsMixin, DetailVie
         ]
 
 
-class AlunoCreateView(TitleMixin, BreadcrumbMixin, SuccessMessageMixin, UserTrackingMixin, CreateView):
+class AlunoCreateView(TitleMixin, BreadcrumbMixin, CursoChoicesMixin, SuccessMessageMixin, UserTrackingMixin, CreateView):
     """Criar novo aluno"""
     model = Aluno
     template_name = 'core/aluno_form.html'
@@ -209,7 +437,6 @@ class AlunoCreateView(TitleMixin, BreadcrumbMixin, SuccessMessageMixin, UserTrac
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['cursos'] = Curso.objects.filter(ativo=True).order_by('nome')
         # Adicionar as choices para o template
         context['semestre_choices'] = Aluno.SEMESTRE_CHOICES
         context['status_choices'] = Aluno.STATUS_CHOICES
@@ -219,7 +446,7 @@ class AlunoCreateView(TitleMixin, BreadcrumbMixin, SuccessMessageMixin, UserTrac
         return reverse_lazy('aluno_detail', kwargs={'pk': self.object.pk})
 
 
-class AlunoUpdateView(TitleMixin, BreadcrumbMixin, SuccessMessageMixin, UserTrackingMixin, ActiveObjectsMixin, UpdateView):
+class AlunoUpdateView(TitleMixin, BreadcrumbMixin, CursoChoicesMixin, SuccessMessageMixin, UserTrackingMixin, ActiveObjectsMixin, UpdateView):
     """Editar aluno"""
     model = Aluno
     template_name = 'core/aluno_form.html'
@@ -239,7 +466,6 @@ class AlunoUpdateView(TitleMixin, BreadcrumbMixin, SuccessMessageMixin, UserTrac
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['cursos'] = Curso.objects.filter(ativo=True).order_by('nome')
         # Adicionar as choices para o template
         context['semestre_choices'] = Aluno.SEMESTRE_CHOICES
         context['status_choices'] = Aluno.STATUS_CHOICES
@@ -257,6 +483,9 @@ class AlunoDeleteView(TitleMixin, BreadcrumbMixin, SuccessMessageMixin, SoftDele
     success_url = reverse_lazy('aluno_list')
     success_message = 'Aluno removido com sucesso!'
     
+    def get_queryset(self):
+        return super().get_queryset().select_related('curso')
+    
     def get_title(self):
         return f'Excluir {self.object.nome} - Sistema Escolar'
     
@@ -271,13 +500,15 @@ class AlunoDeleteView(TitleMixin, BreadcrumbMixin, SuccessMessageMixin, SoftDele
 
 # Mapeamento das views antigas para as novas (para compatibilidade)
 home = HomeView.as_view()
+relatorio = RelatorioView.as_view()
 curso_list = CursoListView.as_view()
 curso_detail = CursoDetailView.as_view()
 curso_create = CursoCreateView.as_view()
 curso_edit = CursoUpdateView.as_view()
 curso_delete = CursoDeleteView.as_view()
 aluno_list = AlunoListView.as_view()
+aluno_export = AlunoExportView.as_view()
 aluno_detail = AlunoDetailView.as_view()
 aluno_create = AlunoCreateView.as_view()
 aluno_edit = AlunoUpdateView.as_view()
-aluno_delete = AlunoDeleteView.as_view()
\ No newline at end of file
+aluno_delete = AlunoDeleteView.as_view()
@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'escola_project.settings')
+# Páginas de leitura assíncronas (settings.ASYNC_VIEWS); ESCOLA_ASYNC_VIEWS=0 desliga
+os.environ.setdefault('ESCOLA_ASYNC_VIEWS', '1')
+# Sob ASGI as threads de cada request não são reaproveitadas: conexões
+# persistentes ficariam abertas; use ESCOLA_DB_POOL com o PostgreSQL
+os.environ.setdefault('ESCOLA_DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
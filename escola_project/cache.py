@@ -0,0 +1,54 @@
+"""
+Cache compartilhado entre os processos a partir de variáveis de ambiente.
+
+``ESCOLA_CACHE_URL`` configura o alias ``shared`` de ``CACHES``:
+
+    redis://localhost:6379/0
+    memcached://localhost:11211
+    file:///var/tmp/escola-cache    (só processos da mesma máquina)
+
+Sem a variável o alias é um ``LocMemCache``: cada processo tem sua cópia, e
+o que uma escrita apaga nele não é apagado nos demais. O que precisa de
+invalidação visível em todos os processos (sessões em cache, por exemplo)
+consulta ``is_shared`` e recorre ao banco quando o cache é local.
+"""
+import os
+from urllib.parse import unquote, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_config(url=None, environ=os.environ):
+    """Monta um item de ``CACHES`` para a URL (padrão: ``ESCOLA_CACHE_URL``)"""
+    url = url or environ.get('ESCOLA_CACHE_URL', '')
+    if not url:
+        return {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'escola-shared'}
+    parts = urlsplit(url)
+    if parts.scheme in ('redis', 'rediss'):
+        return {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': url}
+    if parts.scheme == 'memcached':
+        return {'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache', 'LOCATION': parts.netloc}
+    if parts.scheme == 'file':
+        return {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': unquote(parts.path)}
+    raise ImproperlyConfigured(f'Cache não suportado em ESCOLA_CACHE_URL: "{parts.scheme}".')
+
+
+def is_shared(config):
+    """Se todos os processos enxergam as mesmas entradas (e as mesmas remoções)"""
+    return config['BACKEND'] not in LOCAL_BACKENDS
+
+
+def session_engine(config, lightweight=True):
+    """
+    Sessões lidas do cache só com um cache compartilhado: com um cache por
+    processo, um logout apagaria a cópia de um processo só, e a sessão
+    continuaria válida nos outros até expirar.
+    """
+    if lightweight and is_shared(config):
+        return 'django.contrib.sessions.backends.cached_db'
+    return 'django.contrib.sessions.backends.db'
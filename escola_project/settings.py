@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .cache import cache_config, session_engine
+from .database import database_config, replica_configs
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,7 +46,19 @@ INSTALLED_APPS = [
     'widget_tweaks',
 ]
 
+# Modo de desempenho da renderização (ESCOLA_RENDER_PERFORMANCE=0 desliga):
+# templates compilados uma vez por processo (loader com cache explícito),
+# respostas comprimidas com gzip (inclusive as exportações em streaming) e
+# apenas os context processors que as páginas e o admin usam.
+
+RENDER_PERFORMANCE = os.environ.get('ESCOLA_RENDER_PERFORMANCE', '1') != '0'
+
 MIDDLEWARE = [
+    # Estáticos respondem antes do resto da pilha (sem medição, sessão ou banco)
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.RequestTimingMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,19 +86,127 @@ TEMPLATES = [
     },
 ]
 
+if RENDER_PERFORMANCE:
+    # O Django já usa o loader com cache quando 'loaders' é omitido; explícito,
+    # ele continua valendo se outro loader for acrescentado aqui.
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+    # Só preenche algo com DEBUG e INTERNAL_IPS. Os demais ficam: auth e
+    # messages já são preguiçosos (request.user só consulta a sessão e a
+    # tabela de usuários se o template usar user/perms) e o admin os exige.
+    TEMPLATES[0]['OPTIONS']['context_processors'].remove('django.template.context_processors.debug')
+
 WSGI_APPLICATION = 'escola_project.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+# Configurado por variáveis de ambiente (ESCOLA_DATABASE_URL, ...): ver
+# escola_project/database.py. Padrão: db.sqlite3 em WAL, conexões persistentes.
 
 DATABASES = {
+    'default': database_config(base_dir=BASE_DIR),
+    **replica_configs(base_dir=BASE_DIR),
+}
+
+# Páginas de leitura nas réplicas (core/routers.py); escritas no principal.
+# Após uma escrita, o navegador lê do principal por STICKY_SECONDS.
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_REPLICA_STICKY_SECONDS = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'escola',
+    },
+    # Fragmentos de template por objeto (uma entrada por curso/aluno exibido)
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'escola-fragments',
+        'TIMEOUT': 3600,
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    },
+    # Compartilhado entre os processos (ESCOLA_CACHE_URL: Redis, Memcached
+    # ou arquivos); sem a variável, um LocMemCache por processo. Ver
+    # escola_project/cache.py.
+    'shared': cache_config(),
 }
 
+# Segundos em que as estatísticas da página inicial são consideradas atuais, e
+# o cache onde ficam (core/stats.py): com o LocMemCache uma escrita só invalida
+# as do próprio processo, e os demais as recalculam ao fim desse prazo
+DASHBOARD_STATS_TIMEOUT = 300
+DASHBOARD_STATS_CACHE_ALIAS = 'shared'
+
+# Cache de fragmentos (cards de curso, linhas de aluno); desligado em
+# desenvolvimento para que alterações nos templates apareçam na hora
+FRAGMENT_CACHE_ENABLED = not DEBUG
+FRAGMENT_CACHE_ALIAS = 'fragments'
+
+# Sessões e mensagens leves (ESCOLA_LIGHTWEIGHT_SESSIONS=0 volta ao padrão do
+# Django): as mensagens vão de um request ao outro em um cookie assinado, sem
+# nunca gravar na sessão, e, se o cache "shared" for compartilhado, as sessões
+# são lidas dele, com o banco como reserva (com um cache por processo ficam só
+# no banco, para que um logout valha em todos os processos). Páginas de
+# leitura de visitantes anônimos não tocam na sessão.
+# Sessões expiradas: python manage.py cleanup_sessions
+
+LIGHTWEIGHT_SESSIONS = os.environ.get('ESCOLA_LIGHTWEIGHT_SESSIONS', '1') != '0'
+
+SESSION_ENGINE = session_engine(CACHES['shared'], LIGHTWEIGHT_SESSIONS)
+SESSION_CACHE_ALIAS = 'shared'
+
+if LIGHTWEIGHT_SESSIONS:
+    MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Cache onde fica a versão da lista de cursos (people/reference.py). Com um
+# cache compartilhado a invalidação chega a todos os processos na hora; com o
+# LocMemCache, cada processo recarrega a lista a cada REFERENCE_LOCAL_TIMEOUT
+# segundos.
+REFERENCE_CACHE_ALIAS = 'shared'
+REFERENCE_LOCAL_TIMEOUT = 30
+
+# Admin para tabelas grandes (people/admin.py): contagem estimada, busca pelo
+# índice textual e sem facetas, hierarquia de datas e filtros que varrem a tabela
+ADMIN_PERFORMANCE_MODE = True
+
+# Ações em lote do admin (people/bulk.py): linhas alteradas por transação,
+# fila de execução (InlineQueue no próprio request, ThreadQueue em segundo
+# plano, que exige ESCOLA_CACHE_URL) e cache do progresso
+BULK_ACTION_CHUNK_SIZE = 1000
+BULK_ACTION_QUEUE = 'people.bulk.InlineQueue'
+BULK_ACTION_CACHE_ALIAS = 'shared'
+
+
+# Instrumentação de requests (cabeçalho Server-Timing e log de requests lentos)
+
+REQUEST_TIMING = True
+
+# Requests acima deste tempo (ms) são registrados no log "core.middleware"
+SLOW_REQUEST_MS = 500
+
+# Quantidade de consultas SQL mais lentas incluídas no log de um request lento
+SLOW_REQUEST_QUERIES = 5
+
+
+# Modo ASGI: as páginas de leitura (início, listas e detalhes) usam as views
+# assíncronas de core/async_views.py, nas mesmas URLs. Ligado por
+# escola_project/asgi.py; sob WSGI continuam as views síncronas.
+
+ASYNC_VIEWS = os.environ.get('ESCOLA_ASYNC_VIEWS', '') == '1'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -119,10 +243,29 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
 STATIC_URL = '/static/'
+STATIC_ROOT = os.environ.get('ESCOLA_STATIC_ROOT') or BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+# collectstatic grava nomes com hash e variantes .gz/.br (core.storage),
+# servidas por core.middleware.StaticFilesMiddleware
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Cache dos arquivos com hash no nome: o conteúdo de um nome nunca muda
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
+# Nos testes os estáticos ficam sem hash, sem exigir collectstatic
+# (escola_project/test_runner.py)
+TEST_RUNNER = 'escola_project.test_runner.EscolaTestRunner'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
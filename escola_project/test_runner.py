@@ -0,0 +1,27 @@
+"""
+Runner dos testes (``TEST_RUNNER``).
+
+Os testes rodam com ``DEBUG = False`` e sem ``collectstatic``: sem o
+manifesto, o storage com hash recusaria cada ``{% static %}``. Como o
+Django faz com o backend de email, o runner troca o storage dos estáticos
+pelo ``StaticFilesStorage`` simples; os testes dos arquivos com hash voltam
+a ``core.storage`` com ``override_settings``.
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class EscolaTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        storages = {
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        }
+        self._static_storage = override_settings(STORAGES=storages)
+        self._static_storage.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._static_storage.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,14 +1,167 @@
-from django.contrib import admin
+import uuid
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import ShowFacets
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import Max
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.urls import path
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from .bulk import AlunoBulkUpdate, BulkUpdate, get_queue, job_status
+from .forms import CursoChoiceField
 from .models import Curso, Aluno
+from .reference import get_cursos
+from .search import search_alunos, search_cursos
+
+
+def performance_mode():
+    return getattr(settings, 'ADMIN_PERFORMANCE_MODE', False)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator que conta no máximo ``exact_limit`` linhas.
+
+    Acima do limite a contagem é estimada (``estimated``): a listagem sem
+    filtros usa ``MAX(id)`` (lido do índice da chave primária) e as
+    filtradas só sabem que passam do limite, o que a página mostra como
+    "10000+". Páginas além da estimativa continuam acessíveis pelo ``?p=``
+    (vazias depois do fim real).
+    """
+    exact_limit = 10000
+
+    @cached_property
+    def counted(self):
+        """Linhas contadas, no máximo ``exact_limit + 1``"""
+        return self.object_list.order_by().values('pk')[:self.exact_limit + 1].count()
+
+    @property
+    def estimated(self):
+        return self.counted > self.exact_limit
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        if not self.estimated or queryset.query.has_filters():
+            return self.counted
+        return max(self.counted, queryset.aggregate(estimate=Max('pk'))['estimate'] or 0)
+
+    @property
+    def display_count(self):
+        """Contagem como exibida na página: exata, aproximada (~) ou limite inferior (+)"""
+        if not self.estimated:
+            return str(self.count)
+        if self.object_list.query.has_filters():
+            return f'{self.exact_limit}+'
+        return f'~{self.count}'
+
+    def validate_number(self, number):
+        if not self.estimated:
+            return super().validate_number(number)
+        # A contagem é só uma estimativa: não limita o número da página
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('O número da página não é um inteiro.')
+        if number < 1:
+            raise EmptyPage('O número da página é menor que 1.')
+        return number
+
+    def page(self, number):
+        if not self.estimated:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+def buscar_alunos(queryset, term):
+    """Busca do admin: índice textual (nome, email, matrícula, telefone) ou nome do curso"""
+    return search_alunos(queryset, term, cursos=get_cursos())
+
+
+class CursoListFilter(admin.RelatedFieldListFilter):
+    """Filtro por curso com as opções do cache de cursos"""
+    def field_choices(self, field, request, model_admin):
+        return [(curso.pk, str(curso)) for curso in get_cursos()]
+
+
+class CursoValuesListFilter(admin.AllValuesFieldListFilter):
+    """Valores distintos de um campo de Curso, lidos do cache de cursos (sem DISTINCT)"""
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.lookup_choices = sorted({getattr(curso, field.attname) for curso in get_cursos()})
 
 
 class BaseModelAdmin(admin.ModelAdmin):
-    """Admin base para modelos que herdam de BaseModel"""
+    """
+    Admin base para modelos que herdam de BaseModel.
+
+    Com ``ADMIN_PERFORMANCE_MODE`` a listagem não faz COUNT(*) da tabela
+    inteira, não calcula facetas nem a hierarquia de datas, omite os
+    ``slow_list_filters`` e busca pelo índice textual (``indexed_search``).
+    """
     readonly_fields = ['uuid', 'created_at', 'updated_at', 'created_by', 'updated_by']
     list_filter = ['ativo', 'created_at', 'updated_at']
+    # Filtros que varrem a tabela, omitidos no modo de desempenho
+    slow_list_filters = ()
+    # Função (queryset, termo) que substitui search_fields no modo de desempenho
+    indexed_search = None
+    bulk_update_class = BulkUpdate
+    
+    @property
+    def show_full_result_count(self):
+        return not performance_mode()
+    
+    @property
+    def show_facets(self):
+        return ShowFacets.NEVER if performance_mode() else ShowFacets.ALLOW
+    
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if performance_mode():
+            return EstimatedCountPaginator(queryset, per_page, orphans, allow_empty_first_page)
+        return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+    
+    def get_list_filter(self, request):
+        list_filter = super().get_list_filter(request)
+        if performance_mode():
+            list_filter = [item for item in list_filter if item not in self.slow_list_filters]
+        return list_filter
+    
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        if performance_mode():
+            # A hierarquia de datas faz SELECT DISTINCT sobre a data truncada de cada linha
+            changelist.date_hierarchy = None
+        return changelist
+    
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not performance_mode() or self.indexed_search is None or not term:
+            return super().get_search_results(request, queryset, search_term)
+        try:
+            return queryset.filter(uuid=uuid.UUID(term)), False
+        except ValueError:
+            return self.indexed_search(queryset, term), False
+    
+    def response_action(self, request, queryset):
+        # "Selecionar todos" age sobre todas as linhas filtradas, mas com a
+        # contagem estimada a página não diz quantas são: só a seleção
+        # explícita de linhas é aceita.
+        if performance_mode() and request.POST.get('select_across') == '1':
+            paginator = self.get_paginator(request, queryset, self.list_per_page)
+            if paginator.estimated:
+                self.message_user(request, (
+                    f'A lista tem mais de {paginator.exact_limit} registros e não pode ser selecionada '
+                    'inteira. Filtre a lista ou selecione os registros da página.'
+                ), messages.WARNING)
+                return HttpResponseRedirect(request.get_full_path())
+        return super().response_action(request, queryset)
     
     def get_readonly_fields(self, request, obj=None):
         """Torna campos de auditoria somente leitura"""
@@ -24,6 +177,54 @@ class BaseModelAdmin(admin.ModelAdmin):
         else:  # Objeto existente
             obj.updated_by = request.user
         super().save_model(request, obj, form, change)
+    
+    def delete_model(self, request, obj):
+        """Exclusão lógica; ``manage.py purge_inactive`` remove as linhas depois"""
+        type(obj)._default_manager.filter(pk=obj.pk).soft_delete(request.user)
+    
+    def delete_queryset(self, request, queryset):
+        queryset.soft_delete(request.user)
+    
+    def get_deleted_objects(self, objs, request):
+        """Só os objetos selecionados: a exclusão lógica não percorre as relações em cascata"""
+        objs = list(objs)
+        perms_needed = set() if self.has_delete_permission(request) else {self.opts.verbose_name}
+        return [str(obj) for obj in objs], {self.opts.verbose_name_plural: len(objs)}, perms_needed, []
+    
+    def bulk_update(self, request, queryset, message, **values):
+        """
+        Aplica ``values`` à seleção em partes (``people.bulk``), registrando
+        updated_at/updated_by. Com uma fila de fundo o request só agenda a
+        tarefa; ``message`` recebe o número de linhas alteradas.
+        """
+        job = self.bulk_update_class(queryset, values, user=request.user)
+        fila = get_queue()
+        fila.enqueue(job)
+        if fila.background:
+            url = reverse(f'admin:{self.opts.app_label}_{self.opts.model_name}_bulk_status', args=[job.id])
+            self.message_user(request, format_html(
+                'Alteração em lote agendada. <a href="{}">Acompanhar o progresso</a>.', url,
+            ))
+        else:
+            self.message_user(request, message.format(job.done))
+    
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path(
+                'bulk/<str:job_id>/', self.admin_site.admin_view(self.bulk_status_view),
+                name='%s_%s_bulk_status' % info,
+            ),
+        ] + super().get_urls()
+    
+    def bulk_status_view(self, request, job_id):
+        """Progresso de uma alteração em lote, em JSON"""
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        status = job_status(job_id)
+        if status is None:
+            raise Http404
+        return JsonResponse(status)
 
 
 @admin.register(Curso)
@@ -33,8 +234,12 @@ class CursoAdmin(BaseModelAdmin):
         'nome', 'codigo', 'coordenador', 'carga_horaria_display', 'total_alunos', 
         'ativo_display', 'created_at_display'
     ]
-    list_filter = ['ativo', 'carga_horaria', 'coordenador', 'created_at', 'updated_at']
+    list_filter = [
+        'ativo', ('carga_horaria', CursoValuesListFilter), ('coordenador', CursoValuesListFilter),
+        'created_at', 'updated_at',
+    ]
     search_fields = ['nome', 'codigo', 'coordenador', 'descricao', 'uuid']
+    indexed_search = staticmethod(search_cursos)
     ordering = ['nome']
     list_per_page = 20
     
@@ -60,7 +265,7 @@ class CursoAdmin(BaseModelAdmin):
     
     def total_alunos(self, obj):
         """Exibe total de alunos matriculados"""
-        count = obj.alunos.filter(ativo=True, status='ativo').count()
+        count = obj.total_alunos_ativos
         if count > 0:
             url = reverse('admin:people_aluno_changelist') + f'?curso__id__exact={obj.id}&status__exact=ativo'
             return format_html(
@@ -68,6 +273,7 @@ class CursoAdmin(BaseModelAdmin):
                 url, count, 's' if count != 1 else ''
             )
         return format_html('<span style="color: #6c757d;">0 alunos</span>')
+    total_alunos.admin_order_field = 'total_alunos_ativos'
     
     def ativo_display(self, obj):
         """Exibe status ativo com ícone"""
@@ -91,20 +297,13 @@ class CursoAdmin(BaseModelAdmin):
     
     def ativar_cursos(self, request, queryset):
         """Ação para ativar cursos selecionados"""
-        updated = queryset.update(ativo=True)
-        self.message_user(
-            request,
-            f'{updated} curso(s) ativado(s) com sucesso.'
-        )
+        self.bulk_update(request, queryset, '{} curso(s) ativado(s) com sucesso.', ativo=True)
     ativar_cursos.short_description = "Ativar cursos selecionados"
     
     def desativar_cursos(self, request, queryset):
-        """Ação para desativar cursos selecionados"""
-        updated = queryset.update(ativo=False)
-        self.message_user(
-            request,
-            f'{updated} curso(s) desativado(s) com sucesso.'
-        )
+        """Ação para desativar cursos selecionados; como na exclusão, os alunos deles também são desativados"""
+        total = queryset.soft_delete(request.user)
+        self.message_user(request, f'{total} curso(s) desativado(s) com sucesso.')
     desativar_cursos.short_description = "Desativar cursos selecionados"
 
 
@@ -115,10 +314,19 @@ class AlunoAdmin(BaseModelAdmin):
         'nome', 'matricula', 'email', 'curso_link', 'semestre_display', 'status_display',
         'telefone_display', 'ativo_display', 'created_at_display'
     ]
-    list_filter = ['ativo', 'status', 'semestre', 'curso', 'data_nascimento', 'created_at', 'updated_at']
+    list_filter = [
+        'ativo', 'status', 'semestre', ('curso', CursoListFilter), 'data_nascimento', 'created_at', 'updated_at'
+    ]
+    # No modo de desempenho os mesmos campos são buscados por buscar_alunos
     search_fields = ['nome', 'matricula', 'email', 'telefone', 'uuid', 'curso__nome']
-    ordering = ['nome']
+    indexed_search = staticmethod(buscar_alunos)
+    slow_list_filters = ['data_nascimento']
+    bulk_update_class = AlunoBulkUpdate
+    # Inclui a chave primária: sem ela o admin acrescenta "-pk" e a
+    # ordenação deixa de seguir o índice (nome, id)
+    ordering = ['nome', 'id']
     list_per_page = 25
+    list_select_related = ['curso']
     date_hierarchy = 'created_at'
     
     fieldsets = (
@@ -134,10 +342,16 @@ class AlunoAdmin(BaseModelAdmin):
         }),
     )
     
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """Select de curso com as opções do cache de cursos"""
+        if db_field.name == 'curso':
+            kwargs['form_class'] = CursoChoiceField
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+    
     def curso_link(self, obj):
         """Link para o curso do aluno"""
-        if obj.curso:
-            url = reverse('admin:people_curso_change', args=[obj.curso.pk])
+        if obj.curso_id:
+            url = reverse('admin:people_curso_change', args=[obj.curso_id])
             return format_html(
                 '<a href="{}" style="color: #007bff; text-decoration: none;">{}</a>',
                 url, obj.curso.nome
@@ -200,20 +414,12 @@ class AlunoAdmin(BaseModelAdmin):
     
     def ativar_alunos(self, request, queryset):
         """Ação para ativar alunos selecionados"""
-        updated = queryset.update(ativo=True)
-        self.message_user(
-            request,
-            f'{updated} aluno(s) ativado(s) com sucesso.'
-        )
+        self.bulk_update(request, queryset, '{} aluno(s) ativado(s) com sucesso.', ativo=True)
     ativar_alunos.short_description = "Ativar alunos selecionados"
     
     def desativar_alunos(self, request, queryset):
         """Ação para desativar alunos selecionados"""
-        updated = queryset.update(ativo=False)
-        self.message_user(
-            request,
-            f'{updated} aluno(s) desativado(s) com sucesso.'
-        )
+        self.bulk_update(request, queryset, '{} aluno(s) desativado(s) com sucesso.', ativo=False)
     desativar_alunos.short_description = "Desativar alunos selecionados"
     
     def enviar_email(self, request, queryset):
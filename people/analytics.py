@@ -0,0 +1,272 @@
+"""
+Análises de matrículas pré-calculadas em tabelas de recortes.
+
+Cada recorte (``RECORTES``) soma os alunos ativos por uma combinação de
+dimensões e fica em ``RecorteMatriculas``, uma linha por combinação. A
+página de relatórios lê só essas linhas: o custo não cresce com o número de
+alunos.
+
+``reconstruir`` refaz tudo: copia os alunos para ``AlunoAnalise`` e roda um
+GROUP BY por recorte. ``atualizar`` parte do watermark ``(updated_at, id)``
+de ``EstadoAnalise``: lê em partes os alunos alterados desde então, subtrai
+dos recortes a posição antiga de cada um (guardada em ``AlunoAnalise``) e
+soma a nova, uma transação por parte. Reprocessar um aluno não muda nada,
+então uma atualização interrompida pode ser repetida.
+
+As faixas etárias dependem do dia: na primeira atualização de cada dia o
+recorte por faixa é recalculado a partir de ``AlunoAnalise``.
+
+Alunos apagados definitivamente (e não desativados) não passam pelo
+watermark: continuam nos recortes até o próximo ``reconstruir``
+(``manage.py refresh_analytics --full``).
+"""
+import datetime
+from collections import Counter
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Case, Count, Q, Value, When
+from django.utils import timezone
+
+from .models import Aluno, AlunoAnalise, EstadoAnalise, RecorteMatriculas
+
+# Recorte -> dimensões, na ordem da chave
+RECORTES = {
+    'curso_status_semestre': ('curso_id', 'status', 'semestre'),
+    'curso_faixa_etaria': ('curso_id', 'faixa_etaria'),
+    'curso_mes': ('curso_id', 'mes'),
+}
+
+# (código, rótulo, idade mínima), em ordem crescente de idade
+FAIXAS_ETARIAS = [
+    ('ate_17', 'Até 17 anos', 0),
+    ('18_20', '18 a 20 anos', 18),
+    ('21_24', '21 a 24 anos', 21),
+    ('25_29', '25 a 29 anos', 25),
+    ('30_39', '30 a 39 anos', 30),
+    ('40_mais', '40 anos ou mais', 40),
+]
+
+CAMPOS_ALUNO = ('id', 'curso_id', 'status', 'semestre', 'data_nascimento', 'created_at', 'ativo')
+
+
+def get_delay():
+    # Mesma margem do feed de mudanças (core.feed): updated_at é calculado
+    # antes do commit e uma transação lenta pode gravar um valor já passado.
+    return getattr(settings, 'CHANGE_FEED_DELAY', 2)
+
+
+def _anos_antes(data, anos):
+    try:
+        return data.replace(year=data.year - anos)
+    except ValueError:
+        # 29 de fevereiro em ano não bissexto
+        return data.replace(year=data.year - anos, day=28)
+
+
+def faixa_etaria(data_nascimento, referencia):
+    """Código da faixa etária de quem nasceu em ``data_nascimento``, na data ``referencia``"""
+    for codigo, _, idade in reversed(FAIXAS_ETARIAS):
+        if data_nascimento <= _anos_antes(referencia, idade):
+            return codigo
+    return FAIXAS_ETARIAS[0][0]
+
+
+def faixa_etaria_sql(campo, referencia):
+    """Expressão equivalente a ``faixa_etaria`` para agrupar no banco"""
+    return Case(
+        *(
+            When(**{f'{campo}__lte': _anos_antes(referencia, idade)}, then=Value(codigo))
+            for codigo, _, idade in reversed(FAIXAS_ETARIAS[1:])
+        ),
+        default=Value(FAIXAS_ETARIAS[0][0]),
+    )
+
+
+def _mes(created_at):
+    return timezone.localtime(created_at).date().replace(day=1)
+
+
+def _espelho(row):
+    aluno_id, curso_id, status, semestre, data_nascimento, created_at, ativo = row
+    return AlunoAnalise(
+        aluno_id=aluno_id, curso_id=curso_id, status=status, semestre=semestre,
+        data_nascimento=data_nascimento, mes=_mes(created_at), ativo=ativo,
+    )
+
+
+def _chave(valores):
+    return '|'.join(str(valor) for valor in valores)
+
+
+def _posicoes(espelho, referencia):
+    """``(recorte, valores das dimensões)`` em que o aluno é contado"""
+    if espelho is None or not espelho.ativo:
+        return []
+    dimensoes = {
+        'curso_id': espelho.curso_id,
+        'status': espelho.status,
+        'semestre': espelho.semestre,
+        'faixa_etaria': faixa_etaria(espelho.data_nascimento, referencia),
+        'mes': espelho.mes,
+    }
+    return [(recorte, tuple(dimensoes[d] for d in campos)) for recorte, campos in RECORTES.items()]
+
+
+def _linha(recorte, valores, total):
+    return RecorteMatriculas(
+        recorte=recorte, chave=_chave(valores), total=total, **dict(zip(RECORTES[recorte], valores)),
+    )
+
+
+def _estado(using):
+    """Estado das análises, travado até o fim da transação"""
+    return EstadoAnalise.objects.using(using).select_for_update().get_or_create(pk=1)[0]
+
+
+def agrupar(recorte, referencia, using=DEFAULT_DB_ALIAS):
+    """Linhas do recorte calculadas com um único GROUP BY sobre ``AlunoAnalise``"""
+    campos = RECORTES[recorte]
+    alunos = AlunoAnalise.objects.using(using).filter(ativo=True)
+    if 'faixa_etaria' in campos:
+        alunos = alunos.annotate(faixa_etaria=faixa_etaria_sql('data_nascimento', referencia))
+    return [
+        _linha(recorte, tuple(row[campo] for campo in campos), row['total'])
+        for row in alunos.order_by().values(*campos).annotate(total=Count('pk'))
+    ]
+
+
+def _substituir_recorte(recorte, referencia, using):
+    RecorteMatriculas.objects.using(using).filter(recorte=recorte).delete()
+    RecorteMatriculas.objects.using(using).bulk_create(agrupar(recorte, referencia, using))
+
+
+def reconstruir(using=DEFAULT_DB_ALIAS, batch_size=1000):
+    """Recalcula o espelho e todos os recortes do zero; retorna o número de alunos lidos"""
+    with transaction.atomic(using=using):
+        estado = _estado(using)
+        # O watermark é tomado antes da leitura: o que mudar durante a
+        # reconstrução é relido pela próxima atualização, sem efeito se já
+        # estiver no espelho.
+        limite = timezone.now() - datetime.timedelta(seconds=get_delay())
+        referencia = timezone.localdate()
+
+        AlunoAnalise.objects.using(using).all().delete()
+        alunos = Aluno._base_manager.using(using).order_by('id').values_list(*CAMPOS_ALUNO)
+        total, ultimo = 0, 0
+        while rows := list(alunos.filter(id__gt=ultimo)[:batch_size]):
+            AlunoAnalise.objects.using(using).bulk_create([_espelho(row) for row in rows])
+            total += len(rows)
+            ultimo = rows[-1][0]
+
+        for recorte in RECORTES:
+            _substituir_recorte(recorte, referencia, using)
+
+        estado.ultima_alteracao, estado.ultimo_id = limite, 0
+        estado.data_referencia = referencia
+        estado.atualizado_em = timezone.now()
+        estado.save(using=using)
+    return total
+
+
+def _aplicar(deltas, using):
+    """Soma os deltas ``{(recorte, valores): n}`` às linhas dos recortes"""
+    deltas = {chave: delta for chave, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    recortes = RecorteMatriculas.objects.using(using)
+    filtro = Q()
+    for recorte, valores in deltas:
+        filtro |= Q(recorte=recorte, chave=_chave(valores))
+    existentes = {(linha.recorte, linha.chave): linha for linha in recortes.filter(filtro)}
+
+    alteradas, novas, vazias = [], [], []
+    for (recorte, valores), delta in deltas.items():
+        linha = existentes.get((recorte, _chave(valores)))
+        if linha is None:
+            if delta > 0:
+                novas.append(_linha(recorte, valores, delta))
+        elif linha.total + delta > 0:
+            linha.total += delta
+            alteradas.append(linha)
+        else:
+            vazias.append(linha.pk)
+    recortes.bulk_update(alteradas, ['total'])
+    recortes.bulk_create(novas)
+    recortes.filter(pk__in=vazias).delete()
+
+
+def _atualizar_faixas(using):
+    """Recalcula o recorte por faixa etária se ele foi calculado em outro dia"""
+    referencia = timezone.localdate()
+    with transaction.atomic(using=using):
+        estado = _estado(using)
+        if estado.data_referencia == referencia:
+            return False
+        _substituir_recorte('curso_faixa_etaria', referencia, using)
+        estado.data_referencia = referencia
+        estado.atualizado_em = timezone.now()
+        estado.save(using=using)
+    return True
+
+
+def _atualizar_parte(limite, batch_size, using):
+    """Processa a próxima parte de alunos alterados; retorna quantos foram lidos"""
+    with transaction.atomic(using=using):
+        estado = _estado(using)
+        desde, ultimo_id = estado.ultima_alteracao, estado.ultimo_id
+        rows = list(
+            Aluno._base_manager.using(using)
+            .filter(updated_at__lte=limite)
+            .filter(Q(updated_at__gt=desde) | Q(updated_at=desde, id__gt=ultimo_id))
+            .order_by('updated_at', 'id')
+            .values_list(*CAMPOS_ALUNO, 'updated_at')[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        espelhos = [_espelho(row[:-1]) for row in rows]
+        anteriores = AlunoAnalise.objects.using(using).in_bulk([e.aluno_id for e in espelhos])
+        deltas = Counter()
+        for espelho in espelhos:
+            for posicao in _posicoes(anteriores.get(espelho.aluno_id), estado.data_referencia):
+                deltas[posicao] -= 1
+            for posicao in _posicoes(espelho, estado.data_referencia):
+                deltas[posicao] += 1
+        _aplicar(deltas, using)
+        AlunoAnalise.objects.using(using).bulk_create(
+            espelhos, update_conflicts=True, unique_fields=['aluno_id'],
+            update_fields=['curso_id', 'status', 'semestre', 'data_nascimento', 'mes', 'ativo'],
+        )
+
+        estado.ultima_alteracao, estado.ultimo_id = rows[-1][-1], rows[-1][0]
+        estado.atualizado_em = timezone.now()
+        estado.save(using=using)
+    return len(rows)
+
+
+def atualizar(using=DEFAULT_DB_ALIAS, batch_size=1000):
+    """
+    Leva aos recortes as mudanças desde o watermark; sem análises ainda,
+    faz a reconstrução completa. Retorna o número de alunos lidos.
+    """
+    estado = EstadoAnalise.objects.using(using).filter(pk=1).first()
+    if estado is None or estado.ultima_alteracao is None:
+        return reconstruir(using, batch_size)
+    _atualizar_faixas(using)
+    limite = timezone.now() - datetime.timedelta(seconds=get_delay())
+    total = 0
+    while lidos := _atualizar_parte(limite, batch_size, using):
+        total += lidos
+    return total
+
+
+def ler_recortes(curso_id=None, using=None):
+    """Linhas dos recortes (opcionalmente de um curso), agrupadas por recorte"""
+    linhas = RecorteMatriculas.objects.db_manager(using).order_by('recorte', 'chave')
+    if curso_id is not None:
+        linhas = linhas.filter(curso_id=curso_id)
+    recortes = {recorte: [] for recorte in RECORTES}
+    for linha in linhas:
+        recortes[linha.recorte].append(linha)
+    return recortes
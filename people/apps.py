@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+def repair_search_index(sender, using, **kwargs):
+    from django.db import connections
+
+    from .search import repair
+
+    repair(connections[using])
 
 
 class PeopleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'people'
+
+    def ready(self):
+        post_migrate.connect(repair_search_index, sender=self)
+
+        from .models import Curso
+        from .reference import invalidar_cursos
+        from .signals import bulk_change
+
+        for signal in (post_save, post_delete, bulk_change):
+            signal.connect(invalidar_cursos, sender=Curso)
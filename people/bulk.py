@@ -0,0 +1,202 @@
+"""
+Atualizações em lote das ações do admin, aplicadas em partes.
+
+Um único ``queryset.update()`` sobre toda a seleção segura a trava de
+escrita do SQLite enquanto durar. ``BulkUpdate`` percorre a seleção em ordem
+de chave primária e altera ``BULK_ACTION_CHUNK_SIZE`` linhas por transação,
+registrando ``updated_at``/``updated_by``; entre uma parte e outra os demais
+requests conseguem escrever. O progresso fica no cache de
+``BULK_ACTION_CACHE_ALIAS`` (``job_status``).
+
+A execução passa pela fila de ``BULK_ACTION_QUEUE``: ``InlineQueue`` roda no
+próprio request, ``ThreadQueue`` em uma thread de fundo do processo e
+``LocalQueue`` guarda as tarefas até ``run_pending()`` (usada nos testes).
+Com ``ThreadQueue`` o link de progresso pode cair em outro processo, que só
+vê o status se o cache for compartilhado.
+"""
+import functools
+import logging
+import queue
+import threading
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .counters import ajustar_contadores_em_lote
+from .signals import bulk_change
+
+logger = logging.getLogger(__name__)
+
+STATUS_KEY = 'people:bulk:{}'
+STATUS_TIMEOUT = 24 * 60 * 60
+
+
+def get_cache():
+    return caches[getattr(settings, 'BULK_ACTION_CACHE_ALIAS', 'default')]
+
+
+def job_status(job_id):
+    """Progresso de uma tarefa: status, total e linhas já alteradas (ou None)"""
+    return get_cache().get(STATUS_KEY.format(job_id))
+
+
+class BulkUpdate:
+    """
+    Aplica ``values`` às linhas de um queryset, em partes.
+
+    Guarda apenas o rótulo do modelo, a consulta e o id do usuário, para
+    poder ser executada depois em outra thread. Só linhas que ainda não têm
+    os valores são alteradas.
+    """
+    # Campos lidos de cada parte antes da alteração, repassados a after_chunk
+    tracked_fields = ()
+
+    def __init__(self, queryset, values, user=None, chunk_size=None):
+        self.id = uuid.uuid4().hex
+        self.model_label = queryset.model._meta.label
+        self.query = queryset.query
+        self.using = queryset.db
+        self.values = values
+        self.user_id = user.pk if user else None
+        self.chunk_size = chunk_size or getattr(settings, 'BULK_ACTION_CHUNK_SIZE', 1000)
+        self.total = None
+        self.done = 0
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def get_queryset(self):
+        queryset = self.model._base_manager.using(self.using).all()
+        queryset.query = self.query
+        return queryset.exclude(**self.values).order_by('pk')
+
+    def after_chunk(self, rows):
+        """Chamado na transação de cada parte com as linhas ``(pk, *tracked_fields)``"""
+
+    def report(self, status):
+        get_cache().set(STATUS_KEY.format(self.id), {
+            'status': status, 'total': self.total, 'done': self.done,
+        }, STATUS_TIMEOUT)
+
+    def run(self):
+        """Executa a alteração; retorna o número de linhas alteradas"""
+        queryset = self.get_queryset()
+        self.total = queryset.count()
+        self.report('running')
+        last = None
+        try:
+            while True:
+                chunk = queryset if last is None else queryset.filter(pk__gt=last)
+                with transaction.atomic(using=self.using):
+                    rows = list(chunk.values_list('pk', *self.tracked_fields)[:self.chunk_size])
+                    if not rows:
+                        break
+                    pks = [row[0] for row in rows]
+                    self.model._base_manager.using(self.using).filter(pk__in=pks).update(
+                        updated_at=timezone.now(), updated_by_id=self.user_id, **self.values,
+                    )
+                    self.after_chunk(rows)
+                self.done += len(rows)
+                last = pks[-1]
+                self.report('running')
+        except Exception:
+            self.report('failed')
+            logger.exception('Ação em lote %s falhou após %d linha(s) de %s', self.id, self.done, self.model_label)
+            raise
+        finally:
+            if self.done:
+                bulk_change.send(sender=self.model, using=self.using)
+        self.report('done')
+        return self.done
+
+
+class AlunoBulkUpdate(BulkUpdate):
+    """Ajusta os contadores dos cursos na transação de cada parte"""
+    tracked_fields = ('curso_id', 'status', 'ativo')
+
+    def after_chunk(self, rows):
+        def depois(estado):
+            return tuple(self.values.get(field, value) for field, value in zip(self.tracked_fields, estado))
+        ajustar_contadores_em_lote(
+            ((tuple(estado), depois(estado)) for _, *estado in rows), using=self.using,
+        )
+
+
+class InlineQueue:
+    """Executa a tarefa imediatamente, no próprio request"""
+    background = False
+
+    def enqueue(self, job):
+        job.run()
+
+
+class LocalQueue:
+    """Fila em memória: as tarefas só rodam em ``run_pending()``"""
+    background = True
+
+    def __init__(self):
+        self.pending = []
+
+    def enqueue(self, job):
+        job.report('pending')
+        self.pending.append(job)
+
+    def run_pending(self):
+        while self.pending:
+            self.pending.pop(0).run()
+
+
+class ThreadQueue:
+    """
+    Uma thread de fundo por processo, que executa as tarefas em ordem.
+
+    Exige um cache compartilhado em ``BULK_ACTION_CACHE_ALIAS``: o status
+    gravado pela thread é consultado por qualquer processo.
+    """
+    background = True
+
+    def __init__(self):
+        if isinstance(get_cache(), (LocMemCache, DummyCache)):
+            raise ImproperlyConfigured(
+                'ThreadQueue exige um cache compartilhado em BULK_ACTION_CACHE_ALIAS (ESCOLA_CACHE_URL).'
+            )
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def enqueue(self, job):
+        job.report('pending')
+        self.jobs.put(job)
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.work, name='bulk-actions', daemon=True)
+                self.thread.start()
+
+    def work(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                job.run()
+            except Exception:
+                pass  # já registrado por run()
+            finally:
+                connections.close_all()
+                self.jobs.task_done()
+
+
+@functools.cache
+def _load_queue(path):
+    return import_string(path)()
+
+
+def get_queue():
+    return _load_queue(getattr(settings, 'BULK_ACTION_QUEUE', 'people.bulk.InlineQueue'))
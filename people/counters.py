@@ -0,0 +1,104 @@
+"""
+Contadores desnormalizados de alunos por curso.
+
+``Aluno.save``/``Aluno.delete`` ajustam os contadores na mesma transação da
+escrita. Operações em lote (``update()``, ``bulk_create``, ``delete()`` em
+querysets) não passam por esses métodos e devem chamar ``recontar`` para os
+cursos afetados; ``manage.py reconcile_counters`` corrige qualquer desvio.
+"""
+from collections import Counter, defaultdict
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from .models import Aluno, Curso
+
+
+def _contador(estado):
+    if estado is None:
+        return None
+    curso_id, status, ativo = estado
+    field = Curso.CONTADORES_ALUNOS.get(status)
+    if not ativo or field is None:
+        return None
+    return curso_id, field
+
+
+def ajustar_contadores(anterior, atual, using=DEFAULT_DB_ALIAS):
+    """
+    Move um aluno entre contadores.
+
+    ``anterior`` e ``atual`` são tuplas ``(curso_id, status, ativo)`` ou
+    ``None`` quando o aluno não existia / deixou de existir.
+    """
+    origem, destino = _contador(anterior), _contador(atual)
+    if origem == destino:
+        return
+    cursos = Curso._base_manager.using(using)
+    if origem:
+        curso_id, field = origem
+        cursos.filter(pk=curso_id).update(**{field: Greatest(F(field) - 1, Value(0))})
+    if destino:
+        curso_id, field = destino
+        cursos.filter(pk=curso_id).update(**{field: F(field) + 1})
+
+
+def ajustar_contadores_em_lote(mudancas, using=DEFAULT_DB_ALIAS):
+    """
+    Aplica de uma vez várias mudanças ``(anterior, atual)`` de alunos.
+
+    As diferenças são somadas por curso: um único UPDATE por curso afetado,
+    com todos os contadores que mudaram.
+    """
+    deltas = Counter()
+    for anterior, atual in mudancas:
+        origem, destino = _contador(anterior), _contador(atual)
+        if origem == destino:
+            continue
+        if origem:
+            deltas[origem] -= 1
+        if destino:
+            deltas[destino] += 1
+    por_curso = defaultdict(dict)
+    for (curso_id, field), delta in deltas.items():
+        if delta:
+            por_curso[curso_id][field] = Greatest(F(field) + delta, Value(0))
+    cursos = Curso._base_manager.using(using)
+    for curso_id, valores in sorted(por_curso.items()):
+        cursos.filter(pk=curso_id).update(**valores)
+
+
+def contar(curso_ids=None, using=DEFAULT_DB_ALIAS):
+    """Conta os alunos por curso e status com um único GROUP BY"""
+    alunos = Aluno._base_manager.using(using).filter(ativo=True)
+    if curso_ids is not None:
+        alunos = alunos.filter(curso_id__in=curso_ids)
+    totais = defaultdict(dict)
+    for row in alunos.order_by().values('curso_id', 'status').annotate(total=Count('id')):
+        field = Curso.CONTADORES_ALUNOS.get(row['status'])
+        if field:
+            totais[row['curso_id']][field] = row['total']
+    return totais
+
+
+def recontar(curso_ids=None, using=DEFAULT_DB_ALIAS):
+    """
+    Recalcula os contadores dos cursos informados (ou de todos).
+
+    Só os cursos com valores divergentes são atualizados. Retorna a lista de
+    ids corrigidos.
+    """
+    fields = list(Curso.CONTADORES_ALUNOS.values())
+    corrigidos = []
+    with transaction.atomic(using=using):
+        totais = contar(curso_ids, using)
+        cursos = Curso._base_manager.using(using)
+        if curso_ids is not None:
+            cursos = cursos.filter(pk__in=curso_ids)
+        for curso_id, *valores in list(cursos.order_by('pk').values_list('pk', *fields)):
+            esperado = {field: totais[curso_id].get(field, 0) for field in fields}
+            if dict(zip(fields, valores)) != esperado:
+                Curso._base_manager.using(using).filter(pk=curso_id).update(**esperado)
+                corrigidos.append(curso_id)
+    return corrigidos
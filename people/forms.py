@@ -0,0 +1,41 @@
+from django import forms
+from django.forms.models import ModelChoiceIterator
+
+from .models import Curso
+from .reference import get_cursos
+
+
+class CursoChoiceIterator(ModelChoiceIterator):
+    """Opções lidas do cache de cursos em vez de uma consulta por formulário"""
+
+    def cursos(self):
+        cursos = get_cursos()
+        if self.field.apenas_ativos:
+            cursos = [curso for curso in cursos if curso.ativo]
+        return cursos
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for curso in self.cursos():
+            yield self.choice(curso)
+
+    def __len__(self):
+        return len(self.cursos()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.cursos())
+
+
+class CursoChoiceField(forms.ModelChoiceField):
+    """
+    Campo de curso cujas opções vêm de ``people.reference``.
+
+    A validação continua consultando o queryset do campo, então um curso
+    criado em outro processo é aceito mesmo antes da lista local ser recarregada.
+    """
+    iterator = CursoChoiceIterator
+
+    def __init__(self, queryset=None, *, apenas_ativos=False, **kwargs):
+        self.apenas_ativos = apenas_ativos
+        super().__init__(Curso._default_manager.all() if queryset is None else queryset, **kwargs)
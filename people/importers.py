@@ -0,0 +1,313 @@
+"""
+Importação em lote de cursos e alunos a partir de CSV ou JSONL.
+
+As linhas são lidas em streaming e processadas em lotes: cada lote faz uma
+única consulta ``IN`` para detectar registros já existentes e um único
+``bulk_create`` (com upsert quando pedido). A memória usada depende apenas
+do tamanho do lote.
+"""
+import csv
+import datetime
+import json
+import sys
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+
+from .counters import ajustar_contadores_em_lote
+from .models import Aluno, Curso
+from .signals import bulk_change
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y')
+
+
+def read_rows(stream, fmt):
+    """Gera tuplas ``(linha, registro)`` a partir de um arquivo CSV ou JSONL"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key.strip(): (value or '').strip() for key, value in row.items() if key}
+    else:
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as e:
+                yield line, e
+                continue
+            yield line, row if isinstance(row, dict) else ValueError('esperado um objeto JSON')
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def parse_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(str(value), fmt).date()
+        except ValueError:
+            continue
+    raise ValidationError(f'Data inválida: "{value}".')
+
+
+def parse_bool(value, default=True):
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'sim', 's', 'yes')
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.errors = 0
+
+
+class Importer:
+    """Base para importadores; subclasses definem o modelo e a conversão das linhas"""
+    model = None
+    unique_field = None
+    # Campos que não podem se repetir dentro do próprio arquivo
+    file_unique_fields = []
+    update_fields = []
+    clean_exclude = ['created_by', 'updated_by']
+
+    def __init__(self, user=None, update=False, batch_size=1000, using=DEFAULT_DB_ALIAS, on_error=None):
+        self.user = user
+        self.update = update
+        self.batch_size = batch_size
+        self.using = using
+        self.on_error = on_error or (lambda line, message: None)
+
+    def prepare(self):
+        """Carrega dados de referência antes de processar as linhas"""
+
+    def build(self, row):
+        raise NotImplementedError
+
+    def load_existing(self, manager, objs):
+        """Busca, com uma única consulta, os registros do lote que já existem"""
+        keys = [getattr(obj, self.unique_field) for obj in objs]
+        return {
+            key: (key,) for key in
+            manager.filter(**{f'{self.unique_field}__in': keys}).values_list(self.unique_field, flat=True)
+        }
+
+    def check_conflicts(self, obj, existing):
+        """Retorna as mensagens de erro de um objeto frente aos registros existentes"""
+        return []
+
+    def after_chunk(self, objs, existing):
+        """Chamado dentro da transação de cada lote, após a escrita"""
+
+    def error(self, result, line, message):
+        result.errors += 1
+        self.on_error(line, message)
+
+    def _build(self, result, line, row):
+        if isinstance(row, Exception):
+            self.error(result, line, f'JSON inválido: {row}')
+            return None
+        try:
+            obj = self.build(row)
+            obj.full_clean(exclude=self.clean_exclude, validate_unique=False, validate_constraints=False)
+        except ValidationError as e:
+            messages = e.message_dict.items() if hasattr(e, 'error_dict') else [(None, e.messages)]
+            self.error(result, line, '; '.join(
+                f'{field}: {" ".join(msgs)}' if field else ' '.join(msgs) for field, msgs in messages
+            ))
+            return None
+        return obj
+
+    def run(self, rows):
+        result = ImportResult()
+        self.prepare()
+        manager = self.model._base_manager.db_manager(self.using)
+        for chunk in chunked(rows, self.batch_size):
+            objs, seen = [], set()
+            for line, row in chunk:
+                obj = self._build(result, line, row)
+                if obj is None:
+                    continue
+                keys = [(field, getattr(obj, field)) for field in self.file_unique_fields]
+                repeated = [f'{field} "{value}"' for field, value in keys if (field, value) in seen]
+                if repeated:
+                    self.error(result, line, f'{", ".join(repeated)} repetido no arquivo.')
+                    continue
+                seen.update(keys)
+                objs.append((line, obj))
+            if not objs:
+                continue
+
+            with transaction.atomic(using=self.using):
+                existing = self.load_existing(manager, [obj for _, obj in objs])
+                to_write = []
+                for line, obj in objs:
+                    messages = self.check_conflicts(obj, existing)
+                    key = getattr(obj, self.unique_field)
+                    if key in existing and not self.update:
+                        messages.insert(0, f'{self.unique_field} "{key}" já cadastrado.')
+                    if messages:
+                        self.error(result, line, ' '.join(messages))
+                        continue
+                    obj.created_by = self.user
+                    if key in existing:
+                        obj.updated_by = self.user
+                        result.updated += 1
+                    else:
+                        result.created += 1
+                    to_write.append(obj)
+
+                if self.update:
+                    manager.bulk_create(
+                        to_write, update_conflicts=True,
+                        unique_fields=[self.unique_field],
+                        update_fields=self.update_fields + ['updated_at', 'updated_by'],
+                    )
+                else:
+                    manager.bulk_create(to_write)
+                self.after_chunk(to_write, existing)
+
+        bulk_change.send(sender=self.model, using=self.using)
+        return result
+
+
+class CursoImporter(Importer):
+    model = Curso
+    unique_field = 'codigo'
+    file_unique_fields = ['codigo']
+    update_fields = ['nome', 'coordenador', 'descricao', 'carga_horaria', 'ativo']
+
+    def build(self, row):
+        return Curso(
+            nome=row.get('nome') or '',
+            codigo=row.get('codigo') or '',
+            coordenador=row.get('coordenador') or '',
+            descricao=row.get('descricao') or '',
+            carga_horaria=row.get('carga_horaria') or None,
+            ativo=parse_bool(row.get('ativo')),
+        )
+
+
+class AlunoImporter(Importer):
+    model = Aluno
+    unique_field = 'matricula'
+    file_unique_fields = ['matricula', 'email']
+    update_fields = [
+        'nome', 'email', 'telefone', 'data_nascimento', 'semestre', 'status', 'curso', 'ativo',
+    ]
+    clean_exclude = Importer.clean_exclude + ['curso']
+
+    def prepare(self):
+        # Um único SELECT resolve todos os códigos de curso do arquivo
+        self.cursos = dict(Curso._base_manager.using(self.using).values_list('codigo', 'id'))
+
+    def build(self, row):
+        codigo = row.get('curso') or ''
+        if codigo not in self.cursos:
+            raise ValidationError({'curso': [f'Curso com código "{codigo}" não encontrado.']})
+        data_nascimento = row.get('data_nascimento') or ''
+        return Aluno(
+            nome=row.get('nome') or '',
+            matricula=row.get('matricula') or '',
+            email=row.get('email') or '',
+            telefone=row.get('telefone') or '',
+            data_nascimento=parse_date(data_nascimento) if data_nascimento else None,
+            semestre=row.get('semestre') or 1,
+            status=row.get('status') or 'ativo',
+            curso_id=self.cursos[codigo],
+            ativo=parse_bool(row.get('ativo')),
+        )
+
+    def load_existing(self, manager, objs):
+        rows = manager.filter(
+            Q(matricula__in=[obj.matricula for obj in objs]) | Q(email__in=[obj.email for obj in objs])
+        ).values_list('matricula', 'email', 'curso_id', 'status', 'ativo')
+        existing = {row[0]: row for row in rows}
+        self.emails = {row[1]: matricula for matricula, row in existing.items()}
+        return existing
+
+    def check_conflicts(self, obj, existing):
+        # O upsert resolve conflitos de matrícula; um email já usado por
+        # outra matrícula precisa ser rejeitado antes do INSERT.
+        matricula = self.emails.get(obj.email)
+        if matricula is not None and matricula != obj.matricula:
+            return [f'email "{obj.email}" já cadastrado para a matrícula "{matricula}".']
+        return []
+
+    def after_chunk(self, objs, existing):
+        # bulk_create não passa por Aluno.save(); as diferenças do lote (com
+        # o estado anterior lido em load_existing, num upsert) são aplicadas
+        # aos contadores de uma vez.
+        def antes(obj):
+            row = existing.get(obj.matricula)
+            return row[2:] if row else None
+        ajustar_contadores_em_lote(
+            ((antes(obj), (obj.curso_id, obj.status, obj.ativo)) for obj in objs), using=self.using,
+        )
+
+
+class ImportCommand(BaseCommand):
+    """Comando base que lê o arquivo e delega a um ``Importer``"""
+    importer_class = None
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Arquivo CSV ou JSONL ("-" para ler da entrada padrão).')
+        parser.add_argument(
+            '--format', choices=['csv', 'jsonl'],
+            help='Formato do arquivo (padrão: deduzido pela extensão).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Quantidade de linhas por lote (padrão: 1000).',
+        )
+        parser.add_argument(
+            '--update', action='store_true',
+            help='Atualiza registros existentes em vez de rejeitá-los.',
+        )
+        parser.add_argument('--user', help='Usuário registrado como autor da importação.')
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Banco de dados a ser usado (padrão: "default").',
+        )
+
+    def get_user(self, username):
+        if not username:
+            return None
+        User = get_user_model()
+        try:
+            return User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            raise CommandError(f'Usuário "{username}" não encontrado.')
+
+    def handle(self, *args, **options):
+        path = options['arquivo']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        importer = self.importer_class(
+            user=self.get_user(options['user']),
+            update=options['update'],
+            batch_size=options['batch_size'],
+            using=options['database'],
+            on_error=lambda line, message: self.stderr.write(f'Linha {line}: {message}'),
+        )
+        if path == '-':
+            result = importer.run(read_rows(sys.stdin, fmt))
+        else:
+            with open(path, newline='', encoding='utf-8-sig') as stream:
+                result = importer.run(read_rows(stream, fmt))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.created} criado(s), {result.updated} atualizado(s), {result.errors} erro(s).'
+        ))
@@ -0,0 +1,9 @@
+from people.importers import AlunoImporter, ImportCommand
+
+
+class Command(ImportCommand):
+    help = (
+        'Importa alunos de um arquivo CSV ou JSONL. Colunas: nome, matricula, email, '
+        'telefone, data_nascimento, semestre, status, curso (código do curso) e ativo.'
+    )
+    importer_class = AlunoImporter
@@ -0,0 +1,9 @@
+from people.importers import CursoImporter, ImportCommand
+
+
+class Command(ImportCommand):
+    help = (
+        'Importa cursos de um arquivo CSV ou JSONL. Colunas: nome, codigo, coordenador, '
+        'descricao, carga_horaria e ativo.'
+    )
+    importer_class = CursoImporter
@@ -0,0 +1,59 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from people.models import Aluno, Curso
+
+
+class Command(BaseCommand):
+    help = 'Remove definitivamente, em lotes, os alunos e cursos desativados há mais de N dias'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=30,
+            help='Remove registros desativados há mais de N dias (padrão: 30).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Registros removidos por transação (padrão: 1000).',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Apenas conta os registros que seriam removidos.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Banco de dados a ser usado (padrão: "default").',
+        )
+
+    def purge(self, queryset, batch_size):
+        """Apaga o queryset em lotes ordenados pela chave primária, uma transação por lote"""
+        manager = queryset.model._base_manager.using(queryset.db)
+        removidos = 0
+        while pks := list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size]):
+            with transaction.atomic(using=queryset.db):
+                manager.filter(pk__in=pks).delete()
+            removidos += len(pks)
+        return removidos
+
+    def handle(self, *args, **options):
+        using = options['database']
+        limite = timezone.now() - datetime.timedelta(days=options['days'])
+        alunos = Aluno._base_manager.using(using).filter(ativo=False, updated_at__lt=limite)
+        # Cursos com alunos que ficam também ficam: apagá-los levaria os alunos em cascata
+        restantes = Aluno._base_manager.filter(curso=OuterRef('pk')).exclude(ativo=False, updated_at__lt=limite)
+        cursos = Curso._base_manager.using(using).filter(ativo=False, updated_at__lt=limite).filter(
+            ~Exists(restantes),
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f'{alunos.count()} aluno(s) e {cursos.count()} curso(s) seriam removidos.')
+            return
+        total_alunos = self.purge(alunos, options['batch_size'])
+        total_cursos = self.purge(cursos, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_alunos} aluno(s) e {total_cursos} curso(s) removidos definitivamente.'
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from people import search
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca textual de alunos e cursos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Banco de dados a ser reindexado (padrão: "default").',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not search.fts_enabled(connection):
+            raise CommandError(
+                f'O banco "{connection.alias}" não usa SQLite; a busca usa icontains '
+                'e não há índice para reconstruir.'
+            )
+        for fts in search.rebuild(connection):
+            self.stdout.write(self.style.SUCCESS(f'Índice {fts} reconstruído.'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from people.counters import recontar
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores de alunos armazenados em cada curso'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'curso_ids', nargs='*', type=int,
+            help='Ids dos cursos a recalcular (padrão: todos).',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Banco de dados a ser usado (padrão: "default").',
+        )
+
+    def handle(self, *args, **options):
+        corrigidos = recontar(options['curso_ids'] or None, using=options['database'])
+        if corrigidos:
+            self.stdout.write(self.style.WARNING(
+                f'{len(corrigidos)} curso(s) com contadores corrigidos: '
+                + ', '.join(str(pk) for pk in corrigidos)
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('Todos os contadores estão corretos.'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from people import analytics
+
+
+class Command(BaseCommand):
+    help = (
+        'Atualiza os recortes de matrículas da página de relatórios com os alunos '
+        'alterados desde a última execução (ou todos, com --full)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Recalcula tudo do zero (corrige alunos apagados definitivamente).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Alunos processados por transação (padrão: 1000).',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Banco de dados a ser usado (padrão: "default").',
+        )
+
+    def handle(self, *args, **options):
+        using, batch_size = options['database'], options['batch_size']
+        if options['full']:
+            total = analytics.reconstruir(using, batch_size)
+            self.stdout.write(self.style.SUCCESS(f'Recortes recalculados a partir de {total} aluno(s).'))
+        else:
+            total = analytics.atualizar(using, batch_size)
+            self.stdout.write(self.style.SUCCESS(f'{total} aluno(s) alterado(s) levado(s) aos recortes.'))
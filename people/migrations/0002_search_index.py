@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# Colunas e SQL congelados nesta migração: mudanças posteriores no índice
+# (people.search) vêm em migrações próprias.
+FTS_INDEXES = {
+    'people_aluno': ('people_aluno_fts', ('nome', 'email', 'matricula')),
+    'people_curso': ('people_curso_fts', ('nome', 'descricao')),
+}
+
+
+def create_statements(table, fts, columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{col}' for col in columns)
+    old = ', '.join(f'old.{col}' for col in columns)
+    insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+    delete = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, "
+        f"content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN {delete} {insert} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def drop_statements(fts):
+    return [
+        *(f'DROP TRIGGER IF EXISTS {fts}_{suffix}' for suffix in ('ai', 'ad', 'au')),
+        f'DROP TABLE IF EXISTS {fts}',
+    ]
+
+
+def install_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, (fts, columns) in FTS_INDEXES.items():
+        for sql in create_statements(table, fts, columns):
+            schema_editor.execute(sql)
+
+
+def uninstall_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for fts, _ in FTS_INDEXES.values():
+        for sql in drop_statements(fts):
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
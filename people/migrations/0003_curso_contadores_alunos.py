@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:36
+
+from django.db import migrations, models
+from django.db.models import Count
+
+CONTADORES_ALUNOS = {
+    'ativo': 'total_alunos_ativos',
+    'inativo': 'total_alunos_inativos',
+    'desvinculado': 'total_alunos_desvinculados',
+    'formado': 'total_alunos_formados',
+}
+
+
+def preencher_contadores(apps, schema_editor):
+    Aluno = apps.get_model('people', 'Aluno')
+    Curso = apps.get_model('people', 'Curso')
+    using = schema_editor.connection.alias
+    totais = {}
+    rows = (
+        Aluno.objects.using(using).filter(ativo=True)
+        .order_by().values('curso_id', 'status').annotate(total=Count('id'))
+    )
+    for row in rows:
+        field = CONTADORES_ALUNOS.get(row['status'])
+        if field:
+            totais.setdefault(row['curso_id'], {})[field] = row['total']
+    for curso_id, valores in totais.items():
+        Curso.objects.using(using).filter(pk=curso_id).update(**valores)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0002_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='total_alunos_ativos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Alunos ativos'),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='total_alunos_desvinculados',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Alunos desvinculados'),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='total_alunos_formados',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Alunos formados'),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='total_alunos_inativos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Alunos inativos'),
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
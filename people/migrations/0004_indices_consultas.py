@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0003_curso_contadores_alunos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['nome', 'id'], name='aluno_ativos_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['curso', 'nome', 'id'], name='aluno_ativos_curso_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['status', 'nome', 'id'], name='aluno_ativos_status_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['curso', 'status'], name='aluno_ativos_curso_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['semestre'], name='aluno_ativos_semestre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['updated_at'], name='aluno_ativos_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['nome', 'id'], name='curso_ativos_nome_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['updated_at'], name='curso_ativos_updated_idx'),
+        ),
+    ]
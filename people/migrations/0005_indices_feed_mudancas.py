@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0004_indices_consultas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(fields=['updated_at', 'id'], name='aluno_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='curso',
+            index=models.Index(fields=['updated_at', 'id'], name='curso_updated_id_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0005_indices_feed_mudancas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['curso', 'updated_at'], name='aluno_ativos_curso_updated_idx'),
+        ),
+    ]
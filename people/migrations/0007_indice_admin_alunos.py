@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0006_indice_ultima_alteracao_curso'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(fields=['nome', 'id'], name='aluno_nome_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(fields=['curso', 'nome', 'id'], name='aluno_curso_nome_id_idx'),
+        ),
+    ]
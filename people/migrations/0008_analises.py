@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0007_indice_admin_alunos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlunoAnalise',
+            fields=[
+                ('aluno_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('curso_id', models.BigIntegerField()),
+                ('status', models.CharField(max_length=20)),
+                ('semestre', models.PositiveIntegerField()),
+                ('data_nascimento', models.DateField()),
+                ('mes', models.DateField()),
+                ('ativo', models.BooleanField()),
+            ],
+            options={
+                'verbose_name': 'Aluno nas análises',
+                'verbose_name_plural': 'Alunos nas análises',
+            },
+        ),
+        migrations.CreateModel(
+            name='EstadoAnalise',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ultima_alteracao', models.DateTimeField(null=True, verbose_name='Última alteração processada')),
+                ('ultimo_id', models.BigIntegerField(default=0, verbose_name='Último aluno processado')),
+                ('data_referencia', models.DateField(null=True, verbose_name='Data de referência das faixas etárias')),
+                ('atualizado_em', models.DateTimeField(null=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Estado das análises',
+                'verbose_name_plural': 'Estado das análises',
+            },
+        ),
+        migrations.CreateModel(
+            name='RecorteMatriculas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorte', models.CharField(choices=[('curso_status_semestre', 'Curso × status × semestre'), ('curso_faixa_etaria', 'Curso × faixa etária'), ('curso_mes', 'Curso × mês de matrícula')], max_length=30, verbose_name='Recorte')),
+                ('chave', models.CharField(max_length=100, verbose_name='Chave')),
+                ('curso_id', models.BigIntegerField(verbose_name='Curso')),
+                ('status', models.CharField(blank=True, max_length=20, verbose_name='Status')),
+                ('semestre', models.PositiveIntegerField(null=True, verbose_name='Semestre')),
+                ('faixa_etaria', models.CharField(blank=True, max_length=10, verbose_name='Faixa etária')),
+                ('mes', models.DateField(null=True, verbose_name='Mês de matrícula')),
+                ('total', models.IntegerField(default=0, verbose_name='Total')),
+            ],
+            options={
+                'verbose_name': 'Recorte de matrículas',
+                'verbose_name_plural': 'Recortes de matrículas',
+                'constraints': [models.UniqueConstraint(fields=('recorte', 'chave'), name='recorte_matriculas_chave_unica')],
+            },
+        ),
+    ]
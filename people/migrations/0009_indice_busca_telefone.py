@@ -0,0 +1,47 @@
+from django.db import migrations
+
+# As colunas de uma tabela FTS5 não mudam: o índice de alunos é recriado e
+# reindexado com o conjunto de colunas de cada lado da migração.
+TABLE = 'people_aluno'
+FTS = 'people_aluno_fts'
+COLUMNS_ANTES = ('nome', 'email', 'matricula')
+COLUMNS_DEPOIS = ('nome', 'email', 'matricula', 'telefone')
+
+
+def recreate_statements(columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{col}' for col in columns)
+    old = ', '.join(f'old.{col}' for col in columns)
+    insert = f"INSERT INTO {FTS}(rowid, {cols}) VALUES (new.id, {new});"
+    delete = f"INSERT INTO {FTS}({FTS}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    return [
+        *(f'DROP TRIGGER IF EXISTS {FTS}_{suffix}' for suffix in ('ai', 'ad', 'au')),
+        f'DROP TABLE IF EXISTS {FTS}',
+        f"CREATE VIRTUAL TABLE {FTS} USING fts5({cols}, "
+        f"content='{TABLE}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER {FTS}_ai AFTER INSERT ON {TABLE} BEGIN {insert} END",
+        f"CREATE TRIGGER {FTS}_ad AFTER DELETE ON {TABLE} BEGIN {delete} END",
+        f"CREATE TRIGGER {FTS}_au AFTER UPDATE OF {cols} ON {TABLE} BEGIN {delete} {insert} END",
+        f"INSERT INTO {FTS}({FTS}) VALUES ('rebuild')",
+    ]
+
+
+def recreate(columns):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in recreate_statements(columns):
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0008_analises'),
+    ]
+
+    operations = [
+        migrations.RunPython(recreate(COLUMNS_DEPOIS), recreate(COLUMNS_ANTES)),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0009_indice_busca_telefone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='aluno',
+            name='aluno_ativos_curso_updated_idx',
+        ),
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(fields=['curso', 'updated_at'], name='aluno_curso_updated_idx'),
+        ),
+    ]
@@ -1,7 +1,7 @@
 import uuid
 
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, router, transaction
 from django.utils.translation import gettext_lazy as _
 
 # Create your models here.
@@ -61,6 +61,39 @@ class BaseModel(UUIDModel, TimestampedModel):
         abstract = True
 
 
+class SoftDeleteQuerySet(models.QuerySet):
+    """Queryset com exclusão lógica em lote, feita com UPDATEs em partes (``people.bulk``)"""
+
+    def get_bulk_update_class(self):
+        from .bulk import BulkUpdate
+
+        return BulkUpdate
+
+    def soft_delete(self, user=None):
+        """Marca ``ativo=False`` nas linhas ainda ativas, sem carregá-las; retorna quantas mudaram"""
+        return self.get_bulk_update_class()(self, {'ativo': False}, user=user).run()
+
+
+class CursoQuerySet(SoftDeleteQuerySet):
+    def soft_delete(self, user=None):
+        """
+        Desativa os alunos dos cursos, em partes, e depois os cursos.
+
+        O curso só é desativado ao final: uma exclusão interrompida pode ser
+        repetida (inclusive pela página do curso) e continua de onde parou.
+        """
+        curso_ids = list(self.values_list('pk', flat=True))
+        Aluno.objects.using(self.db).filter(curso_id__in=curso_ids).soft_delete(user)
+        return super().soft_delete(user)
+
+
+class AlunoQuerySet(SoftDeleteQuerySet):
+    def get_bulk_update_class(self):
+        from .bulk import AlunoBulkUpdate
+
+        return AlunoBulkUpdate
+
+
 class Curso(BaseModel):
     nome = models.CharField(_("Nome"), max_length=100)
     codigo = models.CharField(_("Código"), max_length=20, unique=True)
@@ -68,15 +101,52 @@ class Curso(BaseModel):
     descricao = models.TextField(_("Descrição"), blank=True)
     carga_horaria = models.PositiveIntegerField(_("Carga Horária"))
     ativo = models.BooleanField(_("Ativo"), default=True)
+    total_alunos_ativos = models.PositiveIntegerField(_("Alunos ativos"), default=0, editable=False)
+    total_alunos_inativos = models.PositiveIntegerField(_("Alunos inativos"), default=0, editable=False)
+    total_alunos_desvinculados = models.PositiveIntegerField(
+        _("Alunos desvinculados"), default=0, editable=False
+    )
+    total_alunos_formados = models.PositiveIntegerField(_("Alunos formados"), default=0, editable=False)
+
+    objects = CursoQuerySet.as_manager()
+
+    # Contador mantido para cada status de Aluno (apenas alunos com ativo=True)
+    CONTADORES_ALUNOS = {
+        'ativo': 'total_alunos_ativos',
+        'inativo': 'total_alunos_inativos',
+        'desvinculado': 'total_alunos_desvinculados',
+        'formado': 'total_alunos_formados',
+    }
 
     class Meta:
         verbose_name = _("Curso")
         verbose_name_plural = _("Cursos")
         ordering = ['nome']
+        indexes = [
+            models.Index(fields=['nome', 'id'], condition=models.Q(ativo=True), name='curso_ativos_nome_idx'),
+            models.Index(fields=['updated_at'], condition=models.Q(ativo=True), name='curso_ativos_updated_idx'),
+            # Feed de mudanças: todas as linhas (inclusive inativas) em ordem (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='curso_updated_id_idx'),
+        ]
 
     def __str__(self):
         return self.nome
 
+    def save(self, *args, **kwargs):
+        # Os contadores são alterados por UPDATEs atômicos; um save com a
+        # instância carregada antes não pode sobrescrevê-los com valores velhos.
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.CONTADORES_ALUNOS.values()
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def total_alunos_matriculados(self):
+        """Total de alunos não removidos, em qualquer status"""
+        return sum(getattr(self, field) for field in self.CONTADORES_ALUNOS.values())
+
 
 class Aluno(BaseModel):
     STATUS_CHOICES = [
@@ -114,10 +184,149 @@ class Aluno(BaseModel):
     )
     ativo = models.BooleanField(_("Ativo"), default=True)
 
+    objects = AlunoQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Aluno")
         verbose_name_plural = _("Alunos")
         ordering = ['nome']
+        # Índices alinhados às consultas das views: todas filtram ativo=True,
+        # opcionalmente curso e/ou status, e paginam por (nome, id). São
+        # parciais porque o Django gera ``WHERE ativo`` (e não ``ativo = 1``),
+        # que o SQLite não usa como prefixo de um índice composto.
+        indexes = [
+            models.Index(fields=['nome', 'id'], condition=models.Q(ativo=True), name='aluno_ativos_nome_idx'),
+            models.Index(
+                fields=['curso', 'nome', 'id'], condition=models.Q(ativo=True),
+                name='aluno_ativos_curso_nome_idx',
+            ),
+            models.Index(
+                fields=['status', 'nome', 'id'], condition=models.Q(ativo=True),
+                name='aluno_ativos_status_nome_idx',
+            ),
+            models.Index(
+                fields=['curso', 'status'], condition=models.Q(ativo=True),
+                name='aluno_ativos_curso_status_idx',
+            ),
+            models.Index(fields=['semestre'], condition=models.Q(ativo=True), name='aluno_ativos_semestre_idx'),
+            models.Index(fields=['updated_at'], condition=models.Q(ativo=True), name='aluno_ativos_updated_idx'),
+            # Validador (ETag) da página do curso: todas as linhas, para que
+            # a exclusão lógica também conte como alteração
+            models.Index(fields=['curso', 'updated_at'], name='aluno_curso_updated_idx'),
+            # Feed de mudanças: todas as linhas (inclusive inativas) em ordem (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='aluno_updated_id_idx'),
+            # Changelist do admin: todas as linhas em ordem (nome, id)
+            models.Index(fields=['nome', 'id'], name='aluno_nome_id_idx'),
+            # Changelist filtrado por curso, na mesma ordem
+            models.Index(fields=['curso', 'nome', 'id'], name='aluno_curso_nome_id_idx'),
+        ]
 
     def __str__(self):
-        return self.nome
\ No newline at end of file
+        return self.nome
+
+    # Os get_FOO_display gerados pelo Django montam dict(make_hashable(choices))
+    # a cada chamada, o que traduz todos os rótulos de novo; nas listas isso
+    # custava mais que o resto da linha. Os rótulos continuam preguiçosos
+    # (traduzidos no idioma ativo ao renderizar).
+    _STATUS_LABELS = dict(STATUS_CHOICES)
+    _SEMESTRE_LABELS = dict(SEMESTRE_CHOICES)
+
+    def get_status_display(self):
+        return self._STATUS_LABELS.get(self.status, self.status)
+
+    def get_semestre_display(self):
+        return self._SEMESTRE_LABELS.get(self.semestre, self.semestre)
+
+    def _estado_contador(self, using):
+        # Lido com a linha travada (dentro da transação do save/delete): uma
+        # escrita concorrente no mesmo aluno espera, e os dois ajustes dos
+        # contadores partem cada um do estado que o outro deixou.
+        if self.pk is None:
+            return None
+        return (
+            type(self)._base_manager.using(using)
+            .select_for_update()
+            .filter(pk=self.pk)
+            .values_list('curso_id', 'status', 'ativo')
+            .first()
+        )
+
+    def save(self, *args, **kwargs):
+        from .counters import ajustar_contadores
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            anterior = self._estado_contador(using)
+            super().save(*args, **kwargs)
+            ajustar_contadores(anterior, (self.curso_id, self.status, self.ativo), using)
+
+    def delete(self, using=None, keep_parents=False):
+        from .counters import ajustar_contadores
+
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            anterior = self._estado_contador(using)
+            result = super().delete(using=using, keep_parents=keep_parents)
+            ajustar_contadores(anterior, None, using)
+        return result
+
+
+class EstadoAnalise(models.Model):
+    """
+    Até onde os recortes de ``RecorteMatriculas`` estão atualizados
+    (``people.analytics``). Tabela de uma única linha.
+    """
+    # Watermark (updated_at, id) do último aluno já somado aos recortes
+    ultima_alteracao = models.DateTimeField(_("Última alteração processada"), null=True)
+    ultimo_id = models.BigIntegerField(_("Último aluno processado"), default=0)
+    data_referencia = models.DateField(_("Data de referência das faixas etárias"), null=True)
+    atualizado_em = models.DateTimeField(_("Atualizado em"), null=True)
+
+    class Meta:
+        verbose_name = _("Estado das análises")
+        verbose_name_plural = _("Estado das análises")
+
+
+class AlunoAnalise(models.Model):
+    """
+    Valores de cada aluno já contados nos recortes. A atualização incremental
+    compara com eles para subtrair a posição antiga e somar a nova.
+    """
+    aluno_id = models.BigIntegerField(primary_key=True)
+    curso_id = models.BigIntegerField()
+    status = models.CharField(max_length=20)
+    semestre = models.PositiveIntegerField()
+    data_nascimento = models.DateField()
+    # Mês de matrícula (created_at no fuso do projeto), sempre no dia 1º
+    mes = models.DateField()
+    ativo = models.BooleanField()
+
+    class Meta:
+        verbose_name = _("Aluno nas análises")
+        verbose_name_plural = _("Alunos nas análises")
+
+
+class RecorteMatriculas(models.Model):
+    """Total de alunos ativos de uma combinação de dimensões de um recorte"""
+    RECORTE_CHOICES = [
+        ('curso_status_semestre', _('Curso × status × semestre')),
+        ('curso_faixa_etaria', _('Curso × faixa etária')),
+        ('curso_mes', _('Curso × mês de matrícula')),
+    ]
+
+    recorte = models.CharField(_("Recorte"), max_length=30, choices=RECORTE_CHOICES)
+    # Valores das dimensões do recorte, unidos por "|"
+    chave = models.CharField(_("Chave"), max_length=100)
+    curso_id = models.BigIntegerField(_("Curso"))
+    status = models.CharField(_("Status"), max_length=20, blank=True)
+    semestre = models.PositiveIntegerField(_("Semestre"), null=True)
+    faixa_etaria = models.CharField(_("Faixa etária"), max_length=10, blank=True)
+    mes = models.DateField(_("Mês de matrícula"), null=True)
+    total = models.IntegerField(_("Total"), default=0)
+
+    class Meta:
+        verbose_name = _("Recorte de matrículas")
+        verbose_name_plural = _("Recortes de matrículas")
+        constraints = [
+            models.UniqueConstraint(fields=['recorte', 'chave'], name='recorte_matriculas_chave_unica'),
+        ]
@@ -0,0 +1,118 @@
+"""
+Cache local da lista de cursos usada em filtros, selects e formulários.
+
+Cada processo guarda os cursos em memória, marcados com a versão lida do
+cache compartilhado (``REFERENCE_CACHE_ALIAS``). Um save/delete de Curso
+descarta a cópia local e, após o commit, troca a versão: os demais processos
+recarregam a lista na leitura seguinte. Enquanto nada muda, ler os cursos
+custa um ``cache.get`` e nenhuma consulta.
+
+Com um cache por processo (``LocMemCache``) a troca de versão não chega aos
+outros processos: lá a versão expira após ``REFERENCE_LOCAL_TIMEOUT``
+segundos, e a lista é recarregada com esse atraso máximo.
+
+Os contadores de alunos não são carregados: mudam por UPDATEs que não
+passam pelos sinais e ficariam desatualizados na cópia local.
+"""
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import Curso
+
+VERSION_KEY = 'people:cursos:version'
+
+_lock = threading.Lock()
+# (versão, cursos) da cópia local
+_snapshot = (None, ())
+
+
+def get_cache():
+    return caches[getattr(settings, 'REFERENCE_CACHE_ALIAS', 'default')]
+
+
+def version_timeout():
+    """Validade da versão: sem limite num cache compartilhado, curta num cache por processo"""
+    if isinstance(get_cache(), (LocMemCache, DummyCache)):
+        return getattr(settings, 'REFERENCE_LOCAL_TIMEOUT', 30)
+    return None
+
+
+def _cursos_queryset():
+    # Sempre do banco principal: a cópia vale até a próxima escrita e não
+    # pode ser recarregada de uma réplica que ainda não recebeu essa escrita.
+    return Curso._base_manager.using(DEFAULT_DB_ALIAS).order_by('nome', 'id').defer(*Curso.CONTADORES_ALUNOS.values())
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def get_version():
+    """Versão atual da lista; criada se o cache compartilhado a perdeu"""
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _new_version(), version_timeout())
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def aget_version():
+    cache = get_cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, _new_version(), version_timeout())
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def _store(version, cursos):
+    global _snapshot
+    _snapshot = (version, tuple(cursos))
+    return _snapshot[1]
+
+
+def get_cursos():
+    """Todos os cursos (inclusive inativos) em ordem de nome"""
+    version = get_version()
+    if _snapshot[0] == version:
+        return _snapshot[1]
+    with _lock:
+        # Outra thread pode ter recarregado enquanto esta esperava
+        if _snapshot[0] == version:
+            return _snapshot[1]
+        return _store(version, _cursos_queryset())
+
+
+async def aget_cursos():
+    """Versão assíncrona de ``get_cursos``"""
+    version = await aget_version()
+    if _snapshot[0] == version:
+        return _snapshot[1]
+    return _store(version, [curso async for curso in _cursos_queryset()])
+
+
+def get_cursos_ativos():
+    return [curso for curso in get_cursos() if curso.ativo]
+
+
+async def aget_cursos_ativos():
+    return [curso for curso in await aget_cursos() if curso.ativo]
+
+
+def invalidate_cursos(using=None):
+    """Descarta a cópia local já e troca a versão compartilhada após o commit"""
+    global _snapshot
+    _snapshot = (None, ())
+    transaction.on_commit(lambda: get_cache().set(VERSION_KEY, _new_version(), version_timeout()), using=using)
+
+
+def invalidar_cursos(sender, using=None, **kwargs):
+    """Receptor dos sinais de escrita em Curso (save, delete e ``bulk_change``)"""
+    invalidate_cursos(using)
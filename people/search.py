@@ -0,0 +1,216 @@
+"""
+Índice de busca textual para Aluno e Curso.
+
+No SQLite o índice é uma tabela FTS5 de conteúdo externo mantida por
+triggers, de modo que qualquer escrita (save, delete, ``update()``,
+``bulk_create``) atualiza a busca. Em outros bancos a busca volta para
+``icontains``.
+"""
+import re
+import unicodedata
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_INDEXES = {
+    'people_aluno': ('people_aluno_fts', ('nome', 'email', 'matricula', 'telefone')),
+    'people_curso': ('people_curso_fts', ('nome', 'descricao')),
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_enabled(connection):
+    return connection.vendor == 'sqlite'
+
+
+def _statements(table, fts, columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{col}' for col in columns)
+    old = ', '.join(f'old.{col}' for col in columns)
+    insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+    delete = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, "
+        f"content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def _missing_triggers(cursor, fts):
+    names = [f'{fts}_{suffix}' for suffix in ('ai', 'ad', 'au')]
+    cursor.execute(
+        "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+        names,
+    )
+    return cursor.fetchone()[0] < len(names)
+
+
+def install(connection):
+    """Cria as tabelas FTS e os triggers que ainda não existirem"""
+    if not fts_enabled(connection):
+        return
+    with connection.cursor() as cursor:
+        for table, (fts, columns) in FTS_INDEXES.items():
+            for sql in _statements(table, fts, columns):
+                cursor.execute(sql)
+
+
+def repair(connection):
+    """
+    Recria triggers perdidos e reindexa as tabelas afetadas.
+
+    O SQLite descarta os triggers quando uma migração reconstrói a tabela
+    de origem, e escritas feitas nesse meio tempo não chegam ao índice.
+    """
+    if not fts_enabled(connection):
+        return []
+    tables = set(connection.introspection.table_names())
+    damaged = []
+    with connection.cursor() as cursor:
+        for table, (fts, columns) in FTS_INDEXES.items():
+            if fts in tables and table in tables and _missing_triggers(cursor, fts):
+                for sql in _statements(table, fts, columns):
+                    cursor.execute(sql)
+                damaged.append(fts)
+    return rebuild(connection, damaged) if damaged else []
+
+
+def uninstall(connection):
+    if not fts_enabled(connection):
+        return
+    with connection.cursor() as cursor:
+        for fts, _ in FTS_INDEXES.values():
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+def rebuild(connection, indexes=None):
+    """Reconstrói os índices a partir das tabelas de origem"""
+    if not fts_enabled(connection):
+        return []
+    install(connection)
+    indexes = list(indexes or (fts for fts, _ in FTS_INDEXES.values()))
+    with connection.cursor() as cursor:
+        for fts in indexes:
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    return indexes
+
+
+@contextmanager
+def suspended(connection, tables=None):
+    """
+    Desliga os triggers de ``tables`` durante uma carga em massa.
+
+    Manter o índice linha a linha custa mais que a própria inserção; ao
+    final os triggers voltam e o índice é reconstruído de uma vez.
+    """
+    if not fts_enabled(connection):
+        yield
+        return
+    existing = set(connection.introspection.table_names())
+    indexes = [
+        fts for table, (fts, _) in FTS_INDEXES.items()
+        if (tables is None or table in tables) and fts in existing
+    ]
+    with connection.cursor() as cursor:
+        for fts in indexes:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+    try:
+        yield
+    finally:
+        if indexes:
+            rebuild(connection, indexes)
+
+
+def build_match(term):
+    """
+    Converte o texto digitado em uma expressão MATCH do FTS5.
+
+    Cada palavra vira um prefixo entre aspas e todas precisam casar; os
+    acentos são removidos pelo próprio tokenizer.
+    """
+    return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(term))
+
+
+def _fts_filter(queryset, term, fallback_fields):
+    connection = connections[queryset.db]
+    if not fts_enabled(connection):
+        condition = Q()
+        for field in fallback_fields:
+            condition |= Q(**{f'{field}__icontains': term})
+        return queryset.filter(condition)
+
+    match = build_match(term)
+    if not match:
+        return queryset.none()
+    fts, _ = FTS_INDEXES[queryset.model._meta.db_table]
+    return queryset.filter(
+        pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [match])
+    )
+
+
+def _exact(queryset, term, fields):
+    # Matrícula, email e código não têm espaços; só vale consultar o índice
+    # único quando o termo é uma palavra só.
+    if not term or any(char.isspace() for char in term):
+        return None
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{field: term})
+    exact = queryset.filter(condition)
+    return exact if exact.exists() else None
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def match_names(objects, term, attr='nome'):
+    """
+    Objetos já carregados cujo ``attr`` casa com o termo como no índice:
+    cada palavra é prefixo de alguma palavra do texto, sem acentos.
+    """
+    tokens = TOKEN_RE.findall(_normalize(term))
+    if not tokens:
+        return []
+    matches = []
+    for obj in objects:
+        words = TOKEN_RE.findall(_normalize(getattr(obj, attr)))
+        if all(any(word.startswith(token) for word in words) for token in tokens):
+            matches.append(obj)
+    return matches
+
+
+def search_alunos(queryset, term, cursos=None):
+    """
+    Filtra alunos por nome, email, matrícula ou telefone. Com ``cursos``
+    (a lista do cache de referência), também pelo nome do curso.
+    """
+    term = term.strip()
+    exact = _exact(queryset, term, ['matricula', 'email'])
+    if exact is not None:
+        return exact
+    alunos = _fts_filter(queryset, term, ['nome', 'email', 'matricula', 'telefone'])
+    curso_ids = [curso.pk for curso in match_names(cursos or (), term)]
+    if curso_ids:
+        alunos = alunos | queryset.filter(curso_id__in=curso_ids)
+    return alunos
+
+
+def search_cursos(queryset, term):
+    """Filtra cursos por nome ou descrição (ou código exato)"""
+    term = term.strip()
+    exact = _exact(queryset, term, ['codigo'])
+    if exact is not None:
+        return exact
+    return _fts_filter(queryset, term, ['nome', 'descricao'])
@@ -0,0 +1,134 @@
+"""
+Geração de dados sintéticos para desenvolvimento e benchmarks.
+
+Os nomes são combinações de nomes e sobrenomes brasileiros comuns e o
+tamanho dos cursos segue uma distribuição de Zipf (poucos cursos grandes,
+muitos pequenos), como numa instituição real.
+"""
+import datetime
+import random
+import unicodedata
+import uuid
+from itertools import accumulate
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .counters import recontar
+from .models import Aluno, Curso
+from .search import suspended
+from .signals import bulk_change
+
+PRIMEIROS_NOMES = [
+    'Ana', 'Maria', 'João', 'José', 'Pedro', 'Lucas', 'Gabriel', 'Rafael', 'Mateus', 'Gustavo',
+    'Felipe', 'Bruno', 'Thiago', 'Carlos', 'Paulo', 'Marcos', 'Luiz', 'André', 'Fernando', 'Rodrigo',
+    'Juliana', 'Fernanda', 'Camila', 'Beatriz', 'Larissa', 'Letícia', 'Amanda', 'Bruna', 'Patrícia',
+    'Aline', 'Mariana', 'Gabriela', 'Vitória', 'Júlia', 'Luíza', 'Isabela', 'Sofia', 'Helena',
+    'Valentina', 'Laura', 'Alice', 'Manuela', 'Heitor', 'Arthur', 'Davi', 'Bernardo', 'Samuel',
+    'Enzo', 'Lorena', 'Cecília', 'Antônio', 'Francisco', 'Raimundo', 'Sebastião', 'Conceição',
+]
+SOBRENOMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima',
+    'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes',
+    'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Marques',
+    'Machado', 'Mendes', 'Freitas', 'Cardoso', 'Ramos', 'Gonçalves', 'Santana', 'Teixeira',
+    'Araújo', 'Conceição', 'Magalhães', 'Brandão', 'Guimarães', 'Assunção', 'Falcão',
+]
+AREAS = [
+    'Engenharia Civil', 'Engenharia de Software', 'Direito', 'Medicina', 'Enfermagem', 'Administração',
+    'Ciências Contábeis', 'Arquitetura e Urbanismo', 'Psicologia', 'Pedagogia', 'Letras', 'História',
+    'Geografia', 'Matemática', 'Física', 'Química', 'Biologia', 'Nutrição', 'Fisioterapia',
+    'Jornalismo', 'Publicidade', 'Ciência da Computação', 'Sistemas de Informação', 'Economia',
+]
+# Proporção aproximada de alunos por status
+STATUS_PESOS = [('ativo', 80), ('formado', 10), ('inativo', 6), ('desvinculado', 4)]
+
+
+def _ascii(texto):
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode().lower()
+
+
+def gerar_cursos(quantidade, rng=None, using=DEFAULT_DB_ALIAS):
+    """Cria ``quantidade`` cursos e retorna seus ids"""
+    rng = rng or random.Random()
+    inicio = (Curso._base_manager.using(using).aggregate(maximo=Max('id'))['maximo'] or 0) + 1
+    cursos = [
+        Curso(
+            nome=f'{rng.choice(AREAS)} {n}',
+            codigo=f'SEED{n:05d}',
+            coordenador=f'{rng.choice(PRIMEIROS_NOMES)} {rng.choice(SOBRENOMES)}',
+            descricao=f'Curso de graduação gerado automaticamente (turma {n}).',
+            carga_horaria=rng.choice([2400, 3000, 3200, 3600, 4000, 7200]),
+        )
+        for n in range(inicio, inicio + quantidade)
+    ]
+    Curso._base_manager.using(using).bulk_create(cursos, batch_size=1000)
+    bulk_change.send(sender=Curso, using=using)
+    return list(
+        Curso._base_manager.using(using).filter(id__gte=inicio, codigo__startswith='SEED')
+        .order_by('id').values_list('id', flat=True)
+    )
+
+
+def gerar_alunos(quantidade, curso_ids, rng=None, skew=1.1, batch_size=5000, using=DEFAULT_DB_ALIAS):
+    """
+    Cria ``quantidade`` alunos distribuídos entre ``curso_ids``.
+
+    As linhas vão direto para um ``executemany`` por lote, sem instanciar
+    modelos, o que permite gerar milhões de alunos em poucos minutos. Os
+    contadores dos cursos são recalculados ao final.
+    """
+    if not curso_ids:
+        raise ValueError('É preciso ao menos um curso para gerar alunos.')
+    rng = rng or random.Random()
+    pesos_cursos = list(accumulate(1 / (posicao + 1) ** skew for posicao in range(len(curso_ids))))
+    status, pesos = zip(*STATUS_PESOS)
+    pesos_status = list(accumulate(pesos))
+    hoje = datetime.date.today()
+    inicio = (Aluno._base_manager.using(using).aggregate(maximo=Max('id'))['maximo'] or 0) + 1
+
+    connection = connections[using]
+    ops = connection.ops
+    agora = ops.adapt_datetimefield_value(timezone.now())
+    meta = Aluno._meta
+    colunas = [
+        meta.get_field(name).column for name in (
+            'uuid', 'created_at', 'updated_at', 'nome', 'matricula', 'email', 'telefone',
+            'data_nascimento', 'semestre', 'status', 'ativo', 'curso',
+        )
+    ]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        ops.quote_name(meta.db_table),
+        ', '.join(ops.quote_name(coluna) for coluna in colunas),
+        ', '.join(['%s'] * len(colunas)),
+    )
+
+    # O índice de busca é reconstruído uma vez só, ao final
+    with suspended(connection, ['people_aluno']):
+        for offset in range(inicio, inicio + quantidade, batch_size):
+            lote = []
+            for n in range(offset, min(offset + batch_size, inicio + quantidade)):
+                primeiro, sobrenome = rng.choice(PRIMEIROS_NOMES), rng.choice(SOBRENOMES)
+                nascimento = hoje - datetime.timedelta(days=rng.randint(17 * 365, 45 * 365))
+                telefone = f'(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}' if rng.random() < 0.7 else ''
+                lote.append((
+                    uuid.UUID(int=rng.getrandbits(128), version=4).hex,
+                    agora,
+                    agora,
+                    f'{primeiro} {rng.choice(SOBRENOMES)} {sobrenome}',
+                    f'S{n:09d}',
+                    f'{_ascii(primeiro)}.{_ascii(sobrenome)}.{n}@aluno.escola.br',
+                    telefone,
+                    ops.adapt_datefield_value(nascimento),
+                    rng.randint(1, 10),
+                    rng.choices(status, cum_weights=pesos_status)[0],
+                    True,
+                    rng.choices(curso_ids, cum_weights=pesos_cursos)[0],
+                ))
+            with transaction.atomic(using=using), connection.cursor() as cursor:
+                cursor.executemany(sql, lote)
+
+    recontar(using=using)
+    bulk_change.send(sender=Aluno, using=using)
+    return quantidade
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Enviado após escritas em lote que não passam por save()/delete()
+# (bulk_create, queryset.update(), ...). Argumentos: sender (o modelo) e using.
+bulk_change = Signal()
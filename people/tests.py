@@ -1,3 +1,600 @@
-from django.test import TestCase
+import datetime
+import json
+import re
+import tempfile
+import time
+from collections import Counter
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from escola_project.cache import cache_config
+
+from . import analytics, reference
+from .admin import AlunoAdmin, EstimatedCountPaginator
+from .forms import CursoChoiceField
+from .models import Aluno, AlunoAnalise, Curso, EstadoAnalise, RecorteMatriculas
+from .search import search_alunos, search_cursos
+
+
+class SeedEscolaTests(TestCase):
+    def test_gera_dados_consistentes(self):
+        call_command('seed_escola', cursos=5, alunos=300, seed=1, batch_size=100, stdout=StringIO())
+
+        self.assertEqual(Curso.objects.count(), 5)
+        self.assertEqual(Aluno.objects.count(), 300)
+        # Contadores recalculados após o INSERT direto
+        reais = dict(Aluno.objects.filter(status='ativo').values_list('curso').annotate(n=Count('id')))
+        for curso in Curso.objects.all():
+            self.assertEqual(curso.total_alunos_ativos, reais.get(curso.pk, 0))
+        # Índice de busca reconstruído ao final
+        aluno = Aluno.objects.order_by('id').first()
+        self.assertIn(aluno, search_alunos(Aluno.objects.all(), aluno.nome))
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.curso = Curso.objects.create(
+            nome='Engenharia Elétrica', codigo='ELE', coordenador='C', carga_horaria=3600,
+            descricao='Circuitos e sistemas de potência',
+        )
+        self.jose = self.criar('José Araújo', 'M1')
+        self.criar('Maria Souza', 'M2')
+
+    def criar(self, nome, matricula):
+        return Aluno.objects.create(
+            nome=nome, matricula=matricula, email=f'{matricula.lower()}@escola.test',
+            data_nascimento=datetime.date(2000, 1, 1), curso=self.curso,
+        )
+
+    def buscar(self, termo):
+        return list(search_alunos(Aluno.objects.order_by('id'), termo))
+
+    def test_sem_acentos_e_por_prefixo(self):
+        for termo in ['jose araujo', 'JOSÉ', 'ara', 'jo ar', 'araújo']:
+            with self.subTest(termo=termo):
+                self.assertEqual(self.buscar(termo), [self.jose])
+        self.assertEqual(self.buscar('jose souza'), [])
+        self.assertEqual(self.buscar('m1@escola.test'), [self.jose])
+
+    def test_triggers_mantem_o_indice(self):
+        novo = self.criar('Luíza Gonçalves', 'M3')
+        self.assertEqual(self.buscar('goncalves'), [novo])
+
+        novo.nome = 'Luíza Pereira'
+        novo.save()
+        self.assertEqual(self.buscar('goncalves'), [])
+        self.assertEqual(self.buscar('pereira'), [novo])
+
+        # Coluna fora do índice e update() em lote
+        Aluno.objects.filter(pk=novo.pk).update(semestre=3)
+        self.assertEqual(self.buscar('pereira'), [novo])
+        Aluno.objects.filter(pk=novo.pk).update(nome='Luíza Castro')
+        self.assertEqual(self.buscar('castro'), [novo])
+
+        Aluno.objects.filter(pk=novo.pk).delete()
+        self.assertEqual(self.buscar('castro'), [])
+
+    def test_rebuild_search_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO people_aluno_fts(people_aluno_fts) VALUES ('delete-all')")
+        self.assertEqual(self.buscar('jose'), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Índice people_aluno_fts reconstruído.', out.getvalue())
+        self.assertIn('Índice people_curso_fts reconstruído.', out.getvalue())
+        self.assertEqual(self.buscar('jose'), [self.jose])
+
+    def test_search_cursos(self):
+        Curso.objects.create(nome='Direito', codigo='DIR', coordenador='C', carga_horaria=3000)
+        cursos = Curso.objects.all()
+        self.assertEqual(list(search_cursos(cursos, 'eletrica')), [self.curso])
+        self.assertEqual(list(search_cursos(cursos, 'potencia')), [self.curso])
+        self.assertEqual(list(search_cursos(cursos, 'DIR').values_list('codigo', flat=True)), ['DIR'])
+        self.assertEqual(list(search_cursos(cursos, 'quimica')), [])
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.curso = Curso.objects.create(nome='Engenharia', codigo='ENG', coordenador='C', carga_horaria=3600)
+        self.outro = Curso.objects.create(nome='Direito', codigo='DIR', coordenador='C', carga_horaria=3600)
+        self.aluno = Aluno.objects.create(
+            nome='Ana', matricula='M1', email='m1@escola.test',
+            data_nascimento=datetime.date(2000, 1, 1), curso=self.curso,
+        )
+
+    def contadores(self, curso):
+        curso = Curso.objects.get(pk=curso.pk)
+        return {status: getattr(curso, field) for status, field in Curso.CONTADORES_ALUNOS.items() if getattr(curso, field)}
+
+    def test_transicoes_de_status_ativo_e_curso(self):
+        self.assertEqual(self.contadores(self.curso), {'ativo': 1})
+        self.aluno.status = 'formado'
+        self.aluno.save()
+        self.assertEqual(self.contadores(self.curso), {'formado': 1})
+
+        self.aluno.ativo = False
+        self.aluno.save()
+        self.assertEqual(self.contadores(self.curso), {})
+        self.aluno.ativo = True
+        self.aluno.save()
+        self.assertEqual(self.contadores(self.curso), {'formado': 1})
+
+        # Mudança de curso e de status no mesmo save
+        self.aluno.curso = self.outro
+        self.aluno.status = 'inativo'
+        self.aluno.save()
+        self.assertEqual(self.contadores(self.curso), {})
+        self.assertEqual(self.contadores(self.outro), {'inativo': 1})
+
+        self.aluno.delete()
+        self.assertEqual(self.contadores(self.outro), {})
+
+    def test_save_do_curso_nao_sobrescreve_os_contadores(self):
+        curso = Curso.objects.get(pk=self.curso.pk)  # carregado com 1 ativo
+        Aluno.objects.create(
+            nome='Bia', matricula='M2', email='m2@escola.test',
+            data_nascimento=datetime.date(2000, 1, 1), curso=self.curso,
+        )
+        curso.nome = 'Engenharia Civil'
+        curso.save()
+        self.assertEqual(self.contadores(self.curso), {'ativo': 2})
+        self.assertEqual(Curso.objects.get(pk=self.curso.pk).nome, 'Engenharia Civil')
+
+    def test_reconcile_counters_corrige_desvios(self):
+        Curso.objects.filter(pk=self.curso.pk).update(total_alunos_ativos=7, total_alunos_formados=3)
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn(f'1 curso(s) com contadores corrigidos: {self.curso.pk}', out.getvalue())
+        self.assertEqual(self.contadores(self.curso), {'ativo': 1})
+
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn('Todos os contadores estão corretos.', out.getvalue())
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.curso = Curso.objects.create(nome='Engenharia', codigo='ENG', coordenador='C', carga_horaria=3600)
+        self.outro = Curso.objects.create(nome='Direito', codigo='DIR', coordenador='C', carga_horaria=3600)
+
+    def importar(self, comando, nome, conteudo, **options):
+        path = Path(self.tmp.name) / nome
+        path.write_text(conteudo, encoding='utf-8')
+        out, err = StringIO(), StringIO()
+        call_command(comando, str(path), stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def aluno_jsonl(self, matricula, curso='ENG', **kwargs):
+        row = {
+            'nome': f'Aluno {matricula}', 'matricula': matricula, 'email': f'{matricula.lower()}@escola.test',
+            'data_nascimento': '01/02/2000', 'curso': curso, **kwargs,
+        }
+        return json.dumps(row) + '\n'
+
+    def test_cursos_criados_e_atualizados_com_update(self):
+        csv = 'nome,codigo,coordenador,carga_horaria\nQuímica,QUI,Ana,3000\nEngenharia Civil,ENG,Bia,4000\n'
+        out, err = self.importar('import_cursos', 'cursos.csv', csv)
+        self.assertIn('1 criado(s), 0 atualizado(s), 1 erro(s).', out)
+        self.assertIn('Linha 3: codigo "ENG" já cadastrado.', err)
+        self.assertEqual(Curso.objects.get(codigo='ENG').nome, 'Engenharia')
+
+        out, err = self.importar('import_cursos', 'cursos.csv', csv, update=True)
+        self.assertIn('0 criado(s), 2 atualizado(s), 0 erro(s).', out)
+        self.assertEqual(Curso.objects.get(codigo='ENG').carga_horaria, 4000)
+        self.assertEqual(Curso.objects.count(), 3)
+
+    def test_erros_reportados_por_linha(self):
+        Aluno.objects.create(
+            nome='Existente', matricula='M0', email='m0@escola.test',
+            data_nascimento=datetime.date(2000, 1, 1), curso=self.curso,
+        )
+        jsonl = ''.join([
+            self.aluno_jsonl('N1'),
+            '{"nome": "quebrado"\n',
+            self.aluno_jsonl('N2', curso='XYZ'),
+            self.aluno_jsonl('N1', email='outro@escola.test'),
+            self.aluno_jsonl('N3', email='n1@escola.test'),
+            self.aluno_jsonl('N4', email='m0@escola.test'),
+        ])
+        out, err = self.importar('import_alunos', 'alunos.jsonl', jsonl)
+        self.assertIn('1 criado(s), 0 atualizado(s), 5 erro(s).', out)
+        erros = err.splitlines()
+        self.assertTrue(erros[0].startswith('Linha 2: JSON inválido'))
+        self.assertEqual(erros[1:], [
+            'Linha 3: curso: Curso com código "XYZ" não encontrado.',
+            'Linha 4: matricula "N1" repetido no arquivo.',
+            'Linha 5: email "n1@escola.test" repetido no arquivo.',
+            'Linha 6: email "m0@escola.test" já cadastrado para a matrícula "M0".',
+        ])
+        self.assertEqual(
+            Aluno.objects.get(matricula='N1').data_nascimento, datetime.date(2000, 2, 1),
+        )
+
+    def test_upsert_recalcula_os_contadores(self):
+        jsonl = ''.join(self.aluno_jsonl(f'N{n}') for n in range(3))
+        out, _ = self.importar('import_alunos', 'alunos.jsonl', jsonl, batch_size=2)
+        self.assertIn('3 criado(s)', out)
+        self.curso.refresh_from_db()
+        self.assertEqual(self.curso.total_alunos_ativos, 3)
+
+        # Upsert movendo um aluno de curso e de status: origem e destino ajustados
+        out, _ = self.importar(
+            'import_alunos', 'alunos.jsonl', self.aluno_jsonl('N1', curso='DIR', status='formado'), update=True,
+        )
+        self.assertIn('0 criado(s), 1 atualizado(s)', out)
+        self.curso.refresh_from_db()
+        self.outro.refresh_from_db()
+        self.assertEqual(self.curso.total_alunos_ativos, 2)
+        self.assertEqual((self.outro.total_alunos_ativos, self.outro.total_alunos_formados), (0, 1))
+
+
+class ReferenceCacheTests(TestCase):
+    def setUp(self):
+        reference.get_cache().clear()
+        self.curso = Curso.objects.create(nome='Engenharia', codigo='ENG', coordenador='C', carga_horaria=3600)
+        Curso.objects.create(nome='Antigo', codigo='ANT', coordenador='C', carga_horaria=3600, ativo=False)
+
+    def assertNoCursoQueries(self, func):
+        """Nenhuma consulta da lista de cursos (selects, filtros)"""
+        with CaptureQueriesContext(connection) as ctx:
+            result = func()
+        listas = [q['sql'] for q in ctx.captured_queries if 'ORDER BY "people_curso"."nome"' in q['sql']]
+        self.assertFalse(listas)
+        return result
+
+    def test_leituras_seguintes_nao_consultam(self):
+        self.assertEqual([c.codigo for c in reference.get_cursos_ativos()], ['ENG'])
+        cursos = self.assertNoCursoQueries(reference.get_cursos)
+        self.assertEqual([c.codigo for c in cursos], ['ANT', 'ENG'])
+
+    def test_invalidacao_no_save_e_na_troca_de_versao(self):
+        reference.get_cursos()
+        with self.captureOnCommitCallbacks(execute=True):
+            versao = reference.get_version()
+            self.curso.nome = 'Engenharia Civil'
+            self.curso.save()
+        self.assertNotEqual(reference.get_version(), versao)
+        self.assertEqual(reference.get_cursos_ativos()[0].nome, 'Engenharia Civil')
+
+        # Outro processo trocou a versão: a cópia local é recarregada
+        Curso.objects.filter(pk=self.curso.pk).update(nome='Renomeado')
+        reference.get_cache().set(reference.VERSION_KEY, 'outro-processo')
+        self.assertEqual(reference.get_cursos_ativos()[0].nome, 'Renomeado')
+
+    def test_sem_cache_compartilhado_a_versao_expira(self):
+        reference.get_cursos()
+        # Escrita em outro processo: a troca de versão não chega a este cache
+        Curso.objects.filter(pk=self.curso.pk).update(nome='Renomeado')
+        self.assertEqual(reference.get_cursos_ativos()[0].nome, 'Engenharia')
+        depois = time.time() + reference.version_timeout() + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=depois):
+            self.assertEqual(reference.get_cursos_ativos()[0].nome, 'Renomeado')
+
+    def test_campo_de_formulario_e_paginas_sem_consultas_de_curso(self):
+        field = CursoChoiceField(apenas_ativos=True)
+        reference.get_cursos()
+        choices = self.assertNoCursoQueries(lambda: list(field.choices))
+        self.assertEqual([label for _, label in choices], ['---------', 'Engenharia'])
+
+        aluno = Aluno.objects.create(
+            nome='Ana', matricula='M1', email='m1@escola.test',
+            data_nascimento=datetime.date(2000, 1, 1), curso=self.curso,
+        )
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@escola.test', 'x'))
+        for url in [
+            reverse('aluno_list'), reverse('aluno_create'), reverse('aluno_edit', args=[aluno.pk]),
+            reverse('admin:people_aluno_changelist'), reverse('admin:people_aluno_change', args=[aluno.pk]),
+        ]:
+            with self.subTest(url=url):
+                self.client.get(url)
+                response = self.assertNoCursoQueries(lambda: self.client.get(url))
+                self.assertContains(response, 'Engenharia')
+
+
+@override_settings(ADMIN_PERFORMANCE_MODE=True)
+class AdminPerformanceModeTests(TestCase):
+    def setUp(self):
+        self.curso = Curso.objects.create(nome='Engenharia', codigo='ENG', coordenador='C', carga_horaria=3600)
+        self.alunos = [
+            Aluno.objects.create(
+                nome=f'Aluno {n} Pereira' if n == 3 else f'Aluno {n}', matricula=f'M{n}',
+                email=f'm{n}@escola.test', data_nascimento=datetime.date(2000, 1, 1), curso=self.curso,
+            )
+            for n in range(12)
+        ]
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@escola.test', 'x'))
+        self.url = reverse('admin:people_aluno_changelist')
+
+    def test_sem_distinct_nem_contagem_total(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        sqls = [q['sql'] for q in ctx.captured_queries]
+        self.assertFalse([sql for sql in sqls if 'DISTINCT' in sql])
+        # Uma única contagem (limitada), e não a contagem total extra
+        self.assertEqual(len([sql for sql in sqls if 'COUNT(' in sql]), 1)
+        self.assertNotContains(response, 'Data de Nascimento')
+
+    def test_contagem_limitada_e_estimada(self):
+        with mock.patch.object(EstimatedCountPaginator, 'exact_limit', 5):
+            response = self.client.get(self.url)
+            self.assertEqual(response.context['cl'].result_count, self.alunos[-1].pk)
+            response = self.client.get(f'{self.url}?status__exact=ativo')
+            self.assertEqual(response.context['cl'].result_count, 6)
+
+    def test_paginas_alem_da_contagem_estimada(self):
+        url = f'{self.url}?status__exact=ativo'
+        with mock.patch.object(EstimatedCountPaginator, 'exact_limit', 5), \
+                mock.patch.object(AlunoAdmin, 'list_per_page', 2):
+            response = self.client.get(url)
+            self.assertContains(response, '5+ Alunos')
+            self.assertNotContains(response, 'Selecionar todos')
+            # A estimativa daria 3 páginas; as 6 reais continuam acessíveis
+            response = self.client.get(f'{url}&p=6')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context['cl'].result_list), 2)
+            response = self.client.get(f'{url}&p=7')
+            self.assertEqual(list(response.context['cl'].result_list), [])
+
+    def test_selecionar_todos_recusado_com_contagem_estimada(self):
+        with mock.patch.object(EstimatedCountPaginator, 'exact_limit', 5):
+            response = self.client.post(self.url, {
+                'action': 'desativar_alunos', 'select_across': '1', 'index': '0',
+                '_selected_action': [self.alunos[0].pk],
+            }, follow=True)
+        self.assertContains(response, 'não pode ser selecionada inteira')
+        self.assertEqual(Aluno.objects.filter(ativo=False).count(), 0)
+
+        # Com a contagem exata a seleção de todos funciona
+        self.client.post(self.url, {
+            'action': 'desativar_alunos', 'select_across': '1', 'index': '0',
+            '_selected_action': [self.alunos[0].pk],
+        })
+        self.assertEqual(Aluno.objects.filter(ativo=False).count(), 12)
+
+    def test_busca_pelo_indice(self):
+        response = self.client.get(f'{self.url}?q=pereira')
+        self.assertEqual(list(response.context['cl'].result_list), [self.alunos[3]])
+        response = self.client.get(f'{self.url}?q={self.alunos[5].uuid}')
+        self.assertEqual(list(response.context['cl'].result_list), [self.alunos[5]])
+
+    def test_busca_por_telefone_e_nome_do_curso(self):
+        self.alunos[7].telefone = '(11) 98765-4321'
+        self.alunos[7].save()
+        outro = Curso.objects.create(nome='Física Médica', codigo='FIS', coordenador='C', carga_horaria=3000)
+        Aluno.objects.filter(pk=self.alunos[8].pk).update(curso=outro)
+
+        response = self.client.get(f'{self.url}?q=98765-4321')
+        self.assertEqual(list(response.context['cl'].result_list), [self.alunos[7]])
+        response = self.client.get(f'{self.url}?q=fisica med')
+        self.assertEqual(list(response.context['cl'].result_list), [self.alunos[8]])
+
+    @override_settings(ADMIN_PERFORMANCE_MODE=False)
+    def test_modo_desligado(self):
+        response = self.client.get(self.url)
+        self.assertIsNotNone(response.context['cl'].full_result_count)
+        self.assertContains(response, 'Data de Nascimento')
+
+
+@override_settings(BULK_ACTION_CHUNK_SIZE=2)
+class BulkActionTests(TestCase):
+    def setUp(self):
+        self.curso = Curso.objects.create(nome='Engenharia', codigo='ENG', coordenador='C', carga_horaria=3600)
+        self.alunos = [
+            Aluno.objects.create(
+                nome=f'Aluno {n}', matricula=f'M{n}', email=f'm{n}@escola.test',
+                data_nascimento=datetime.date(2000, 1, 1), curso=self.curso, ativo=n != 0,
+            )
+            for n in range(6)
+        ]
+        self.admin = get_user_model().objects.create_superuser('admin', 'admin@escola.test', 'x')
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:people_aluno_changelist')
+
+    def acao(self, action):
+        return self.client.post(self.url, {
+            'action': action, '_selected_action': [aluno.pk for aluno in self.alunos],
+        }, follow=True)
+
+    def test_partes_auditadas_e_contadores(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.acao('desativar_alunos')
+        self.assertContains(response, '5 aluno(s) desativado(s)')
+        # Só as 5 linhas que mudam, em partes de 2
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "people_aluno"')]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(set(Aluno.objects.exclude(pk=self.alunos[0].pk).values_list('ativo', 'updated_by')),
+                         {(False, self.admin.pk)})
+        self.curso.refresh_from_db()
+        self.assertEqual(self.curso.total_alunos_ativos, 0)
+
+    @override_settings(BULK_ACTION_QUEUE='people.bulk.LocalQueue')
+    def test_fila_de_fundo_com_progresso(self):
+        from .bulk import get_queue
+
+        response = self.acao('desativar_alunos')
+        self.assertContains(response, 'Acompanhar o progresso')
+        self.assertEqual(Aluno.objects.filter(ativo=True).count(), 5)
+        status_url = re.search(r'href="([^"]+)"', str(list(response.context['messages'])[0]))[1]
+        self.assertEqual(self.client.get(status_url).json()['status'], 'pending')
+
+        get_queue().run_pending()
+        self.assertEqual(self.client.get(status_url).json(), {'status': 'done', 'total': 5, 'done': 5})
+        self.assertFalse(Aluno.objects.filter(ativo=True).exists())
+        self.curso.refresh_from_db()
+        self.assertEqual(self.curso.total_alunos_ativos, 0)
+
+    def test_fila_em_thread_exige_cache_compartilhado(self):
+        from .bulk import ThreadQueue
+
+        with self.assertRaises(ImproperlyConfigured):
+            ThreadQueue()
+        with tempfile.TemporaryDirectory() as tmp, override_settings(
+            CACHES={**settings.CACHES, 'shared': cache_config(f'file://{tmp}')},
+        ):
+            self.assertIsNone(ThreadQueue().thread)
+
+
+@override_settings(BULK_ACTION_CHUNK_SIZE=2)
+class SoftDeleteTests(TestCase):
+    def setUp(self):
+        self.curso = Curso.objects.create(nome='Engenharia', codigo='ENG', coordenador='C', carga_horaria=3600)
+        self.outro = Curso.objects.create(nome='Direito', codigo='DIR', coordenador='C', carga_horaria=3600)
+        self.alunos = [
+            Aluno.objects.create(
+                nome=f'Aluno {n}', matricula=f'M{n}', email=f'm{n}@escola.test',
+                data_nascimento=datetime.date(2000, 1, 1), curso=self.curso if n < 5 else self.outro,
+            )
+            for n in range(6)
+        ]
+
+    def test_exclusao_do_curso_desativa_os_alunos_em_partes(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('curso_delete', args=[self.curso.pk]))
+        self.assertRedirects(response, reverse('curso_list'), fetch_redirect_response=False)
+        sqls = [q['sql'] for q in ctx.captured_queries]
+        self.assertFalse([sql for sql in sqls if sql.startswith('DELETE')])
+        self.assertEqual(len([sql for sql in sqls if sql.startswith('UPDATE "people_aluno"')]), 3)
+
+        self.curso.refresh_from_db()
+        self.assertFalse(self.curso.ativo)
+        self.assertEqual(self.curso.total_alunos_ativos, 0)
+        self.assertEqual(Aluno.objects.filter(curso=self.curso, ativo=False).count(), 5)
+        self.assertTrue(Aluno.objects.get(matricula='M5').ativo)
+
+    def test_desativacao_no_admin_desativa_os_alunos(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@escola.test', 'x'))
+        response = self.client.post(reverse('admin:people_curso_changelist'), {
+            'action': 'desativar_cursos', '_selected_action': [self.curso.pk],
+        }, follow=True)
+        self.assertContains(response, '1 curso(s) desativado(s) com sucesso.')
+        self.curso.refresh_from_db()
+        self.assertFalse(self.curso.ativo)
+        self.assertFalse(Aluno.objects.filter(curso=self.curso, ativo=True).exists())
+        self.assertEqual(self.curso.total_alunos_ativos, 0)
+        self.assertTrue(Aluno.objects.get(matricula='M5').ativo)
+
+    def test_exclusao_no_admin_e_logica(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@escola.test', 'x'))
+        self.client.post(reverse('admin:people_aluno_changelist'), {
+            'action': 'delete_selected', '_selected_action': [self.alunos[0].pk, self.alunos[5].pk], 'post': 'yes',
+        })
+        self.assertEqual(Aluno.objects.count(), 6)
+        self.assertEqual(set(Aluno.objects.filter(ativo=False).values_list('matricula', flat=True)), {'M0', 'M5'})
+
+    def test_purge_remove_em_lotes(self):
+        Curso.objects.filter(pk=self.curso.pk).soft_delete()
+        self.alunos[5].ativo = False
+        self.alunos[5].save()
+
+        out = StringIO()
+        call_command('purge_inactive', days=0, dry_run=True, stdout=out)
+        self.assertIn('6 aluno(s) e 1 curso(s)', out.getvalue())
+        call_command('purge_inactive', days=1, stdout=StringIO())
+        self.assertEqual(Aluno.objects.count(), 6)
+
+        call_command('purge_inactive', days=0, batch_size=2, stdout=StringIO())
+        self.assertFalse(Aluno.objects.exists())
+        self.assertEqual(list(Curso.objects.values_list('codigo', flat=True)), ['DIR'])
+
+
+@override_settings(CHANGE_FEED_DELAY=0)
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        self.curso = Curso.objects.create(nome='Engenharia', codigo='ENG', coordenador='C', carga_horaria=3600)
+        self.outro = Curso.objects.create(nome='Direito', codigo='DIR', coordenador='C', carga_horaria=3600)
+        nascimentos = [datetime.date(2010, 5, 1), datetime.date(2005, 1, 1), datetime.date(1990, 7, 7)]
+        for n in range(9):
+            Aluno.objects.create(
+                nome=f'Aluno {n}', matricula=f'M{n}', email=f'm{n}@escola.test',
+                data_nascimento=nascimentos[n % 3], semestre=n % 4 + 1,
+                status=['ativo', 'formado'][n % 2], curso=self.curso if n < 6 else self.outro,
+            )
+
+    def recortes(self):
+        return {(r.recorte, r.chave): r.total for r in RecorteMatriculas.objects.all()}
+
+    def assertIgualReconstrucao(self):
+        incremental = self.recortes()
+        analytics.reconstruir()
+        self.assertEqual(incremental, self.recortes())
+
+    def test_reconstrucao_igual_ao_group_by_direto(self):
+        analytics.reconstruir(batch_size=4)
+        self.assertEqual(AlunoAnalise.objects.count(), 9)
+        esperado = {
+            f'{row["curso_id"]}|{row["status"]}|{row["semestre"]}': row['total']
+            for row in Aluno.objects.order_by().values('curso_id', 'status', 'semestre').annotate(total=Count('id'))
+        }
+        linhas = RecorteMatriculas.objects.filter(recorte='curso_status_semestre')
+        self.assertEqual({linha.chave: linha.total for linha in linhas}, esperado)
+
+        hoje = timezone.localdate()
+        faixas = Counter(analytics.faixa_etaria(a.data_nascimento, hoje) for a in Aluno.objects.all())
+        por_faixa = Counter()
+        for linha in RecorteMatriculas.objects.filter(recorte='curso_faixa_etaria'):
+            por_faixa[linha.faixa_etaria] += linha.total
+        self.assertEqual(por_faixa, faixas)
+        mes = timezone.localdate().replace(day=1)
+        self.assertEqual(
+            {linha.chave: linha.total for linha in RecorteMatriculas.objects.filter(recorte='curso_mes')},
+            {f'{self.curso.pk}|{mes}': 6, f'{self.outro.pk}|{mes}': 3},
+        )
+
+    def test_atualizacao_incremental_igual_a_reconstrucao(self):
+        analytics.atualizar()
+        aluno = Aluno.objects.get(matricula='M0')
+        aluno.status = 'desvinculado'
+        aluno.save()
+        movido = Aluno.objects.get(matricula='M1')
+        movido.curso = self.outro
+        movido.semestre = 9
+        movido.save()
+        Aluno.objects.filter(matricula__in=['M2', 'M7']).soft_delete()
+        Aluno.objects.create(
+            nome='Novo', matricula='M9', email='m9@escola.test', data_nascimento=datetime.date(2001, 2, 3),
+            curso=self.outro,
+        )
+
+        out = StringIO()
+        call_command('refresh_analytics', batch_size=2, stdout=out)
+        self.assertIn('5 aluno(s)', out.getvalue())
+        self.assertEqual(sum(self.recortes()[k] for k in self.recortes() if k[0] == 'curso_mes'), 8)
+        self.assertIgualReconstrucao()
+
+    def test_atualizacao_sem_mudancas_nao_altera_recortes(self):
+        call_command('refresh_analytics', full=True, stdout=StringIO())
+        antes = self.recortes()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(analytics.atualizar(), 0)
+        self.assertEqual(self.recortes(), antes)
+        self.assertFalse([q for q in ctx.captured_queries if 'people_recortematriculas' in q['sql']])
+
+    def test_faixas_etarias_recalculadas_no_dia_seguinte(self):
+        analytics.reconstruir()
+        ontem = timezone.localdate() - datetime.timedelta(days=1)
+        EstadoAnalise.objects.update(data_referencia=ontem)
+        RecorteMatriculas.objects.filter(recorte='curso_faixa_etaria').update(total=0)
+        analytics.atualizar()
+        self.assertEqual(EstadoAnalise.objects.get().data_referencia, timezone.localdate())
+        self.assertIgualReconstrucao()
+
+    def test_faixa_etaria_no_aniversario(self):
+        self.assertEqual(analytics.faixa_etaria(datetime.date(2006, 3, 1), datetime.date(2024, 3, 1)), '18_20')
+        self.assertEqual(analytics.faixa_etaria(datetime.date(2006, 3, 2), datetime.date(2024, 3, 1)), 'ate_17')
+        self.assertEqual(analytics.faixa_etaria(datetime.date(2006, 2, 28), datetime.date(2024, 2, 29)), '18_20')
+        self.assertEqual(analytics.faixa_etaria(datetime.date(1984, 2, 29), datetime.date(2024, 2, 29)), '40_mais')